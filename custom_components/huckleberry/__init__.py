@@ -1,14 +1,30 @@
 """Huckleberry Baby Sleep Tracker integration for Home Assistant."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
-from typing import TypedDict, NotRequired
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from contextlib import AsyncExitStack
+from datetime import datetime
+from functools import partial
+from typing import Any, Literal, TypedDict, NotRequired
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HassJob,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 import voluptuous as vol
 from homeassistant.helpers import config_validation as cv
@@ -21,7 +37,49 @@ from huckleberry_api import (
     GrowthData,
     DiaperDocumentData,
 )
-from .const import DOMAIN
+from .const import (
+    BACKGROUND_SETUP_RETRY,
+    CONF_BACKGROUND_SETUP,
+    CONF_COALESCE_WINDOW,
+    CONF_DEDUPE_WINDOW,
+    CONF_MULTIPLEX_LISTENERS,
+    CONF_NATIVE_WRITES,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_DEDUPE_WINDOW,
+    DOMAIN,
+    FALLBACK_POLL_INTERVAL,
+    IMPORT_CHUNK_SIZE,
+    LISTENER_SETUP_CONCURRENCY,
+    LISTENER_WATCHDOG_INTERVAL,
+    MAX_BATCH_WRITES,
+    OPTIMISTIC_CONFIRM_TIMEOUT,
+    WRITE_REPLAY_BACKOFF,
+    WRITE_REPLAY_BACKOFF_MAX,
+    WRITE_REPLAY_MAX_ATTEMPTS,
+)
+from .batch import OPERATION_SCHEMA, BatchOperation, async_run_batch, build_operation, run_batch
+from .event_cache import EventCache
+from .executor import JobPriority, PriorityExecutor
+from .firestore import FirestoreWriter
+from .history_import import HistoryImporter, async_remove_checkpoints
+from .listeners import (
+    LISTENER_SETUP_METHODS,
+    ListenerHealth,
+    MultiplexedListener,
+    document_listener_active,
+    fetch_documents,
+    restart_document_listener,
+)
+from .optimistic import PendingWrite, predict
+from .session import AuthMethod, SessionRefreshScheduler, TokenStore, entry_stagger
+from .snapshot import CoordinatorSnapshot, SnapshotStore, project
+from .write_queue import (
+    QueuedWrite,
+    WriteJournal,
+    async_replay_write,
+    is_offline_error,
+    replay_write,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +92,12 @@ class HuckleberryEntryData(TypedDict):
     api: HuckleberryAPI
     coordinator: "HuckleberryDataUpdateCoordinator"
     children: list[ChildData]
+    importer: HistoryImporter
+    # Calendar events per child_uid
+    event_caches: dict[str, EventCache]
+    # None until a background setup has connected
+    auth_method: AuthMethod | None
+    auth_duration: float | None
 
 
 class ChildRealtimeData(TypedDict):
@@ -45,6 +109,10 @@ class ChildRealtimeData(TypedDict):
     diaper_data: NotRequired[DiaperDocumentData]
 
 
+# Keys of ChildRealtimeData that are fed by a real-time listener
+RealtimeCategory = Literal["sleep_status", "feed_status", "growth_data", "diaper_data"]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Huckleberry from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -55,50 +123,98 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         timezone=str(hass.config.time_zone),
     )
 
-    # Authenticate
-    try:
-        await hass.async_add_executor_job(api.authenticate)
-    except Exception as err:
-        _LOGGER.error("Failed to authenticate with Huckleberry: %s", err)
-        return False
+    token_store = TokenStore(hass, entry.entry_id)
+    # Blocking library calls run on the integration's own prioritized pool
+    executor = PriorityExecutor(hass)
 
-    # Get children
+    coordinator: HuckleberryDataUpdateCoordinator | None = None
     try:
-        children = await hass.async_add_executor_job(api.get_children)
-        if not children:
-            _LOGGER.error("No children found in Huckleberry account")
+        # Last known state of the previous run, shown until listeners deliver
+        snapshot_store = SnapshotStore(hass, entry.entry_id)
+        cached_data = await snapshot_store.async_load()
+        cached_children = [data["child"] for data in cached_data.values() if "child" in data]
+
+        # Writes acknowledged while Huckleberry was unreachable, replayed once it is back
+        write_journal = WriteJournal(hass, entry.entry_id)
+        await write_journal.async_load()
+
+        # In background mode entities are created from the cached children and
+        # the network handshakes finish after platform setup
+        background = entry.options.get(CONF_BACKGROUND_SETUP, False) and bool(cached_children)
+        if background:
+            auth_method, auth_duration, children = None, None, cached_children
+        elif (connection := await _async_connect(hass, api, token_store, executor)) is not None:
+            auth_method, auth_duration, children = connection
+        else:
+            await executor.async_shutdown()
             return False
-    except Exception as err:
-        _LOGGER.error("Failed to get children from Huckleberry: %s", err)
-        return False
 
-    # Create coordinator for data updates
-    coordinator = HuckleberryDataUpdateCoordinator(hass, api, children)
-    await coordinator.async_config_entry_first_refresh()
-
-    # Set up real-time listeners for instant updates
-    await coordinator.async_setup_listeners()
-
-    entry_data: HuckleberryEntryData = {
-        "api": api,
-        "coordinator": coordinator,
-        "children": children,
-    }
-    hass.data[DOMAIN][entry.entry_id] = entry_data
+        # Create coordinator for data updates
+        coordinator = HuckleberryDataUpdateCoordinator(
+            hass,
+            api,
+            children,
+            coalesce_window=entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+            multiplex_listeners=entry.options.get(CONF_MULTIPLEX_LISTENERS, False),
+            session_stagger=entry_stagger(entry.entry_id),
+            token_store=token_store,
+            executor=executor,
+            snapshot_store=snapshot_store,
+            cached_data=cached_data,
+            write_journal=write_journal,
+            background_setup=background,
+            native_writes=entry.options.get(CONF_NATIVE_WRITES, False),
+            dedupe_window=entry.options.get(CONF_DEDUPE_WINDOW, DEFAULT_DEDUPE_WINDOW),
+        )
+        await coordinator.async_config_entry_first_refresh()
+
+        # Set up real-time listeners for instant updates
+        if not background:
+            await coordinator.async_setup_listeners()
+
+        entry_data: HuckleberryEntryData = {
+            "api": api,
+            "coordinator": coordinator,
+            "children": children,
+            "importer": HistoryImporter(hass, entry, coordinator),
+            "event_caches": {child["uid"]: EventCache() for child in children},
+            "auth_method": auth_method,
+            "auth_duration": auth_duration,
+        }
+        hass.data[DOMAIN][entry.entry_id] = entry_data
+
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        # A retried setup creates a new executor; this one must not linger
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        if coordinator is not None:
+            await coordinator.async_shutdown()
+        else:
+            await executor.async_shutdown()
+        raise
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if background:
+        entry.async_create_background_task(
+            hass,
+            _async_finish_background_setup(hass, entry, entry_data, token_store, snapshot_store),
+            f"{DOMAIN} background setup {entry.entry_id}",
+        )
 
     # Helper to get child_uid from service call (device target or explicit child_uid)
     def _get_child_uid_from_call(call: ServiceCall) -> str | None:
         """Extract child_uid from service call, either from device target or data field."""
+        return _get_child_uid_from_data(call.data)
+
+    def _get_child_uid_from_data(data: Mapping[str, Any]) -> str | None:
+        """Extract child_uid from service data, either from device target or data field."""
         # First check if child_uid explicitly provided
-        if child_uid := call.data.get("child_uid"):
+        if child_uid := data.get("child_uid"):
             return child_uid
 
         # Check if device target provided
-        if "device_id" in call.data:
+        if "device_id" in data:
             device_registry = dr.async_get(hass)
-            device = device_registry.async_get(call.data["device_id"])
+            device = device_registry.async_get(data["device_id"])
             if device:
                 for identifier in device.identifiers:
                     if identifier[0] == DOMAIN:
@@ -109,14 +225,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Register services for advanced control
     async def _call_api(method_name: str, call: ServiceCall) -> None:
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         target_child = _get_child_uid_from_call(call)
         if not target_child:
             _LOGGER.error("No child_uid could be determined from service call")
             return
         _LOGGER.info("Calling %s for child %s", method_name, target_child)
-        method = getattr(api, method_name)
-        await hass.async_add_executor_job(method, target_child)
+        await coordinator.async_write(method_name, target_child)
         _LOGGER.info("Completed %s for child %s", method_name, target_child)
 
     async def handle_start_sleep(call):
@@ -136,27 +250,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Feeding service handlers
     async def handle_start_feeding(call):
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         child_uid = _get_child_uid_from_call(call)
         if not child_uid:
             _LOGGER.error("No child_uid could be determined from service call")
             return
         side = call.data.get("side", "left")
         _LOGGER.info("Starting feeding for child %s on %s side", child_uid, side)
-        await hass.async_add_executor_job(api.start_feeding, child_uid, side)
+        await coordinator.async_write("start_feeding", child_uid, side)
 
     async def handle_pause_feeding(call):
         await _call_api("pause_feeding", call)
 
     async def handle_resume_feeding(call):
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         child_uid = _get_child_uid_from_call(call)
         if not child_uid:
             _LOGGER.error("No child_uid could be determined from service call")
             return
         side = call.data.get("side")  # Optional side parameter
         _LOGGER.info("Resuming feeding for child %s on %s", child_uid, side if side else "current side")
-        await hass.async_add_executor_job(api.resume_feeding, child_uid, side)
+        await coordinator.async_write("resume_feeding", child_uid, side)
 
     async def handle_switch_feeding_side(call):
         await _call_api("switch_feeding_side", call)
@@ -169,7 +281,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Diaper service handlers
     async def handle_log_diaper_pee(call):
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         child_uid = _get_child_uid_from_call(call)
         if not child_uid:
             _LOGGER.error("No child_uid could be determined from service call")
@@ -178,12 +289,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         diaper_rash = call.data.get("diaper_rash", False)
         notes = call.data.get("notes")
         _LOGGER.info("Logging pee diaper for child %s (amount=%s)", child_uid, pee_amount)
-        await hass.async_add_executor_job(
-            api.log_diaper, child_uid, "pee", pee_amount, None, None, None, diaper_rash, notes
+        await coordinator.async_write(
+            "log_diaper", child_uid, "pee", pee_amount, None, None, None, diaper_rash, notes
         )
 
     async def handle_log_diaper_poo(call):
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         child_uid = _get_child_uid_from_call(call)
         if not child_uid:
             _LOGGER.error("No child_uid could be determined from service call")
@@ -195,12 +305,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         notes = call.data.get("notes")
         _LOGGER.info("Logging poo diaper for child %s (amount=%s, color=%s, consistency=%s)",
                      child_uid, poo_amount, color, consistency)
-        await hass.async_add_executor_job(
-            api.log_diaper, child_uid, "poo", None, poo_amount, color, consistency, diaper_rash, notes
+        await coordinator.async_write(
+            "log_diaper", child_uid, "poo", None, poo_amount, color, consistency, diaper_rash, notes
         )
 
     async def handle_log_diaper_both(call):
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         child_uid = _get_child_uid_from_call(call)
         if not child_uid:
             _LOGGER.error("No child_uid could be determined from service call")
@@ -212,12 +321,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         diaper_rash = call.data.get("diaper_rash", False)
         notes = call.data.get("notes")
         _LOGGER.info("Logging both (pee+poo) diaper for child %s", child_uid)
-        await hass.async_add_executor_job(
-            api.log_diaper, child_uid, "both", pee_amount, poo_amount, color, consistency, diaper_rash, notes
+        await coordinator.async_write(
+            "log_diaper", child_uid, "both", pee_amount, poo_amount, color, consistency, diaper_rash, notes
         )
 
     async def handle_log_diaper_dry(call):
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         child_uid = _get_child_uid_from_call(call)
         if not child_uid:
             _LOGGER.error("No child_uid could be determined from service call")
@@ -225,12 +333,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         diaper_rash = call.data.get("diaper_rash", False)
         notes = call.data.get("notes")
         _LOGGER.info("Logging dry diaper check for child %s", child_uid)
-        await hass.async_add_executor_job(
-            api.log_diaper, child_uid, "dry", None, None, None, None, diaper_rash, notes
+        await coordinator.async_write(
+            "log_diaper", child_uid, "dry", None, None, None, None, diaper_rash, notes
         )
 
     async def handle_log_growth(call):
-        api: HuckleberryAPI = hass.data[DOMAIN][entry.entry_id]["api"]
         child_uid = _get_child_uid_from_call(call)
         if not child_uid:
             _LOGGER.error("No child_uid could be determined from service call")
@@ -241,13 +348,47 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         units = call.data.get("units", "metric")
         _LOGGER.info("Logging growth for child %s (weight=%s, height=%s, head=%s, units=%s)",
                      child_uid, weight, height, head, units)
-        await hass.async_add_executor_job(
-            api.log_growth, child_uid, weight, height, head, units
+        await coordinator.async_write(
+            "log_growth", child_uid, weight, height, head, units
         )
         # Refresh coordinator to update growth sensor
-        coordinator: HuckleberryDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
         await coordinator.async_request_refresh()
 
+    async def handle_batch(call: ServiceCall) -> ServiceResponse:
+        operations: list[BatchOperation] = []
+        for data in call.data["operations"]:
+            # Operations without a child of their own use the call's
+            child_uid = _get_child_uid_from_data(
+                data if "child_uid" in data or "device_id" in data else call.data
+            )
+            if not child_uid:
+                _LOGGER.error("No child_uid could be determined for batch operation %s", data)
+                return None
+            operations.append(build_operation(data, child_uid))
+        _LOGGER.info("Running batch of %d operations", len(operations))
+        results = await coordinator.async_write_batch(operations)
+        if any(
+            result["operation"] == "log_growth" and result["status"] == "committed"
+            for result in results
+        ):
+            # Refresh coordinator to update growth sensor
+            await coordinator.async_request_refresh()
+        return {"results": results}
+
+    async def handle_import_history(call: ServiceCall) -> None:
+        child_uid = _get_child_uid_from_call(call)
+        if not child_uid:
+            _LOGGER.error("No child_uid could be determined from service call")
+            return
+        _LOGGER.info("Importing history from %s for child %s", call.data["path"], child_uid)
+        await entry_data["importer"].async_start(
+            call.data["path"],
+            child_uid,
+            call.data.get("format"),
+            call.data["chunk_size"],
+            call.data["restart"],
+        )
+
     service_schema = vol.Schema({
         vol.Required("device_id"): cv.string,
         vol.Optional("child_uid"): cv.string,
@@ -315,6 +456,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         vol.Optional("units"): vol.In(["metric", "imperial"]),
     })
 
+    batch_schema = vol.Schema({
+        vol.Optional("device_id"): cv.string,
+        vol.Optional("child_uid"): cv.string,
+        vol.Required("operations"): vol.All(cv.ensure_list, [OPERATION_SCHEMA], vol.Length(min=1)),
+    })
+
+    import_history_schema = vol.Schema({
+        vol.Optional("device_id"): cv.string,
+        vol.Optional("child_uid"): cv.string,
+        vol.Required("path"): cv.string,
+        vol.Optional("format"): vol.In(["csv", "jsonl"]),
+        vol.Optional("chunk_size", default=IMPORT_CHUNK_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_BATCH_WRITES)
+        ),
+        vol.Optional("restart", default=False): cv.boolean,
+    })
+
     hass.services.async_register(DOMAIN, "start_sleep", handle_start_sleep, schema=service_schema)
     hass.services.async_register(DOMAIN, "pause_sleep", handle_pause_sleep, schema=service_schema)
     hass.services.async_register(DOMAIN, "resume_sleep", handle_resume_sleep, schema=service_schema)
@@ -335,9 +493,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.services.async_register(DOMAIN, "log_growth", handle_log_growth, schema=growth_schema)
 
+    hass.services.async_register(
+        DOMAIN,
+        "batch",
+        handle_batch,
+        schema=batch_schema,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "import_history", handle_import_history, schema=import_history_schema
+    )
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Stop real-time listeners before unloading
@@ -352,7 +528,109 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
-class HuckleberryDataUpdateCoordinator(DataUpdateCoordinator[dict[str, ChildRealtimeData]]):
+async def _async_connect(
+    hass: HomeAssistant, api: HuckleberryAPI, token_store: TokenStore, executor: PriorityExecutor
+) -> tuple[AuthMethod, float, list[ChildData]] | None:
+    """Authenticate and fetch the children, returning None on failure."""
+    # Authenticate, reusing the tokens of the previous run when possible
+    auth_started = time.monotonic()
+    try:
+        auth_method = await token_store.async_restore(api, executor)
+    except Exception as err:
+        _LOGGER.error("Failed to authenticate with Huckleberry: %s", err)
+        return None
+    auth_duration = time.monotonic() - auth_started
+    _LOGGER.info(
+        "Huckleberry session established (%s) in %.0f ms", auth_method, auth_duration * 1000
+    )
+
+    # Get children
+    try:
+        children = await executor.async_run(JobPriority.SESSION, api.get_children)
+        if not children:
+            _LOGGER.error("No children found in Huckleberry account")
+            return None
+    except Exception as err:
+        _LOGGER.error("Failed to get children from Huckleberry: %s", err)
+        return None
+
+    return auth_method, auth_duration, children
+
+
+async def _async_finish_background_setup(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    entry_data: HuckleberryEntryData,
+    token_store: TokenStore,
+    snapshot_store: SnapshotStore,
+) -> None:
+    """Connect and start the listeners of an entry whose entities already exist."""
+    coordinator = entry_data["coordinator"]
+
+    @callback
+    def _async_reload(_now: datetime | None = None) -> None:
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    if (connection := await _async_connect(hass, coordinator.api, token_store, coordinator.executor)) is None:
+        _LOGGER.warning("Retrying Huckleberry setup in %d seconds", BACKGROUND_SETUP_RETRY)
+        entry.async_on_unload(async_call_later(hass, BACKGROUND_SETUP_RETRY, _async_reload))
+        return
+
+    entry_data["auth_method"], entry_data["auth_duration"], children = connection
+    if [child["uid"] for child in children] != [child["uid"] for child in coordinator.children]:
+        # Entities were created for the cached children; store the new list
+        # so the reload sets up the right devices
+        _LOGGER.info("Huckleberry children changed since the last run, reloading")
+        await snapshot_store.async_save(
+            CoordinatorSnapshot({child["uid"]: {"child": child} for child in children})
+        )
+        _async_reload()
+        return
+
+    await coordinator.async_setup_listeners()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored session, snapshot, write queue and import checkpoints of a removed config entry."""
+    await TokenStore(hass, entry.entry_id).async_remove()
+    await SnapshotStore(hass, entry.entry_id).async_remove()
+    await WriteJournal(hass, entry.entry_id).async_remove()
+    await async_remove_checkpoints(hass, entry.entry_id)
+
+
+def _growth_from_health(child_uid: str, data: dict[str, Any]) -> GrowthData:
+    """Extract growth data from a health document's prefs.lastGrowthEntry."""
+    prefs = data.get("prefs", {})
+    last_growth = prefs.get("lastGrowthEntry", {})
+
+    _LOGGER.debug("Health data received for %s: has_prefs=%s, has_lastGrowthEntry=%s",
+                  child_uid, bool(prefs), bool(last_growth))
+
+    if not last_growth:
+        # Set empty growth data if none exists
+        _LOGGER.debug("No growth data found in health document")
+        return {
+            "weight_units": "kg",
+            "height_units": "cm",
+            "head_units": "hcm",
+        }
+
+    growth_data: GrowthData = {
+        "weight": last_growth.get("weight"),
+        "height": last_growth.get("height"),
+        "head": last_growth.get("head"),
+        "weight_units": last_growth.get("weightUnits", "kg"),
+        "height_units": last_growth.get("heightUnits", "cm"),
+        "head_units": last_growth.get("headUnits", "hcm"),
+        "timestamp": last_growth.get("start"),
+    }
+    _LOGGER.debug("Updated growth data: weight=%s, height=%s, head=%s, timestamp=%s",
+                  growth_data.get("weight"), growth_data.get("height"),
+                  growth_data.get("head"), growth_data.get("timestamp"))
+    return growth_data
+
+
+class HuckleberryDataUpdateCoordinator(DataUpdateCoordinator[CoordinatorSnapshot]):
     """Class to manage fetching Huckleberry data."""
 
     def __init__(
@@ -360,153 +638,827 @@ class HuckleberryDataUpdateCoordinator(DataUpdateCoordinator[dict[str, ChildReal
         hass: HomeAssistant,
         api: HuckleberryAPI,
         children: list[ChildData],
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        multiplex_listeners: bool = False,
+        session_stagger: float = 0.0,
+        token_store: TokenStore | None = None,
+        executor: PriorityExecutor | None = None,
+        snapshot_store: SnapshotStore | None = None,
+        cached_data: Mapping[str, Mapping[str, Any]] | None = None,
+        background_setup: bool = False,
+        native_writes: bool = False,
+        write_journal: WriteJournal | None = None,
+        dedupe_window: float = DEFAULT_DEDUPE_WINDOW,
     ) -> None:
-        """Initialize."""
+        """Initialize.
+
+        cached_data holds the documents per child_uid restored from
+        snapshot_store; they are published as stale until live data arrives.
+        With background_setup the coordinator starts out initializing until
+        async_setup_listeners has run. With native_writes, writes are sent
+        over the Firestore REST API instead of the blocking HuckleberryAPI.
+        Writes that cannot reach Huckleberry are queued in write_journal and
+        replayed in order. A write repeating an identical one within
+        dedupe_window seconds is ignored.
+        """
         self.api = api
         self.children = children
-        self._realtime_data: dict[str, ChildRealtimeData] = {}
+        self.executor = executor or PriorityExecutor(hass)
+        self.writer = (
+            FirestoreWriter(hass, api, executor=self.executor) if native_writes else None
+        )
+        self.session = SessionRefreshScheduler(
+            hass,
+            api,
+            self._async_resubscribe_multiplexed_listener,
+            session_stagger,
+            token_store,
+            self.executor,
+        )
+        # Published data is immutable; every update swaps in a new snapshot
+        self._realtime_data = CoordinatorSnapshot(
+            {child["uid"]: {"child": child} for child in children}
+        )
+        cached = {
+            (child_uid, category): document
+            for child_uid, documents in (cached_data or {}).items()
+            if child_uid in self._realtime_data
+            for category, document in documents.items()
+            if category in LISTENER_SETUP_METHODS
+        }
+        self._realtime_data = self._realtime_data.replace(cached)
+        # Restored documents no listener has confirmed yet
+        self.stale_keys: set[tuple[str, RealtimeCategory]] = set(cached)
+        # Entities without data wait for the listeners while this is set
+        self.initializing = background_setup
+        self._snapshot_store = snapshot_store
+        # Entities interested in a single (child_uid, category) pair
+        self._category_listeners: dict[tuple[str, RealtimeCategory], list[CALLBACK_TYPE]] = {}
+        # Listener snapshots waiting for the coalescing window to close
+        self._coalesce_window = coalesce_window
+        self._pending_updates: dict[tuple[str, RealtimeCategory], Any] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        # Consumed fields of the latest accepted snapshot per (child_uid, category)
+        self._projections: dict[tuple[str, RealtimeCategory], Any] = {}
+        # One watch per collection instead of one per (child, category)
+        self._multiplex_listeners = multiplex_listeners
+        self._multiplexer: MultiplexedListener | None = None
+        self._multiplexer_token: str | None = None
+        # Listener registrations that failed, with their error
+        self.listener_errors: dict[tuple[str, RealtimeCategory], str] = {}
+        # Heartbeats of every stream, checked by the watchdog
+        self.listener_health: dict[tuple[str, RealtimeCategory], ListenerHealth] = {}
+        self._unsub_watchdog: CALLBACK_TYPE | None = None
+        # Writes shown optimistically until a listener snapshot confirms them
+        self.pending_writes: dict[tuple[str, RealtimeCategory], PendingWrite] = {}
+        # Writes acknowledged while Huckleberry was unreachable
+        self.write_journal = write_journal
+        # Optimistic state of queued writes, per write_id
+        self._queued_pending: dict[str, PendingWrite] = {}
+        self._unsub_replay: CALLBACK_TYPE | None = None
+        self._replay_task: asyncio.Task[None] | None = None
+        self._replay_backoff = WRITE_REPLAY_BACKOFF
+        self._replay_attempts = 0
+        # One lock per child, so its writes land in call order
+        self._write_lanes: dict[str, asyncio.Lock] = {}
+        # Method, arguments and accepted time of the last write of every child
+        self._dedupe_window = dedupe_window
+        self._recent_writes: dict[str, tuple[str, tuple[Any, ...], float]] = {}
+        self.write_stats: dict[str, float] = {
+            "deduplicated": 0,
+            "confirmed": 0,
+            "rolled_back": 0,
+            "last_confirm_ms": 0.0,
+            "max_confirm_ms": 0.0,
+        }
+        self.update_stats: dict[str, int] = {
+            "received": 0,
+            "suppressed": 0,
+            "coalesced": 0,
+            "published": 0,
+        }
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=60),  # Fallback polling, listeners are primary
+            # Push only; polling is switched on while a listener is degraded
+            update_interval=None,
+            # Polls that return unchanged data must not re-render every entity
+            always_update=False,
         )
 
-    async def async_setup_listeners(self) -> None:
-        """Set up real-time listeners for instant updates."""
-        _LOGGER.info("Setting up real-time Firestore listeners")
+    @callback
+    def async_add_category_listener(
+        self,
+        child_uid: str,
+        category: RealtimeCategory,
+        update_callback: CALLBACK_TYPE,
+    ) -> Callable[[], None]:
+        """Listen for real-time updates of one category of one child."""
+        key = (child_uid, category)
+        self._category_listeners.setdefault(key, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove update listener."""
+            listeners = self._category_listeners.get(key)
+            if listeners and update_callback in listeners:
+                listeners.remove(update_callback)
+                if not listeners:
+                    del self._category_listeners[key]
+
+        return remove_listener
+
+    @callback
+    def async_update_category_listeners(self, child_uid: str, category: RealtimeCategory) -> None:
+        """Notify only the entities subscribed to a child's category."""
+        for update_callback in list(self._category_listeners.get((child_uid, category), ())):
+            update_callback()
+
+    @callback
+    def _async_queue_update(
+        self,
+        child_uid: str,
+        category: RealtimeCategory,
+        value: Any,
+        from_stream: bool = True,
+    ) -> None:
+        """Queue a listener snapshot, merging bursts within the coalescing window.
+
+        Snapshots that leave every consumed field unchanged are dropped. Only
+        the latest document per (child_uid, category) is kept; everything
+        queued within one window is published together. Only snapshots
+        from_stream are heartbeats of the stream; polled documents are not.
+        """
+        key = (child_uid, category)
+        self.update_stats["received"] += 1
+        if from_stream and (health := self.listener_health.get(key)) is not None:
+            health.record_snapshot(time.monotonic())
+        self.stale_keys.discard(key)
+
+        if (pending := self.pending_writes.get(key)) is not None:
+            # The prediction stays published; the snapshot is the fallback
+            pending.fallback = value
+            if pending.committed:
+                self._async_reconcile(pending)
+            else:
+                pending.in_flight_snapshot = True
+            return
 
-        for child in self.children:
-            child_uid = child["uid"]
-
-            # Set up sleep listener
-            def make_sleep_callback(uid):
-                def callback(data):
-                    """Handle real-time sleep updates."""
-                    if uid not in self._realtime_data:
-                        self._realtime_data[uid] = {"child": child}
-                    self._realtime_data[uid]["sleep_status"] = data
-                    # Trigger coordinator update
-                    self.hass.loop.call_soon_threadsafe(
-                        self.async_set_updated_data, dict(self._realtime_data)
-                    )
-                return callback
+        # Drop snapshots that only touch fields no entity renders
+        projection = project(category, value)
+        if key in self._projections and self._projections[key] == projection:
+            self.update_stats["suppressed"] += 1
+            _LOGGER.debug("Ignoring %s update for %s, no consumed field changed", category, child_uid)
+            return
+        self._projections[key] = projection
+
+        if key in self._pending_updates:
+            self.update_stats["coalesced"] += 1
+        self._pending_updates[key] = value
 
-            await self.hass.async_add_executor_job(
-                self.api.setup_realtime_listener, child_uid, make_sleep_callback(child_uid)
+        if self._coalesce_window <= 0:
+            self._async_flush_updates()
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, self._coalesce_window, self._async_flush_updates
             )
 
-            # Set up feed listener (for feeding tracking)
-            def make_feed_callback(uid):
-                def callback(data):
-                    """Handle real-time feed updates."""
-                    if uid not in self._realtime_data:
-                        self._realtime_data[uid] = {"child": child}
-                    self._realtime_data[uid]["feed_status"] = data
-                    # Trigger coordinator update
-                    self.hass.loop.call_soon_threadsafe(
-                        self.async_set_updated_data, dict(self._realtime_data)
-                    )
-                return callback
+    @callback
+    def _async_flush_updates(self, _now: datetime | None = None) -> None:
+        """Publish all queued snapshots as a single coordinator update.
+
+        Unlike async_set_updated_data this does not broadcast to every entity
+        of every child, only to the listeners of the changed (child_uid, category) pairs.
+        """
+        self._unsub_flush = None
+        pending, self._pending_updates = self._pending_updates, {}
+        if pending:
+            self._async_publish(pending)
+
+    @callback
+    def _async_publish(self, changes: dict[tuple[str, RealtimeCategory], Any]) -> None:
+        """Publish new documents and notify their entities."""
+        self._realtime_data = CoordinatorSnapshot.of(self._realtime_data).replace(changes)
+        self.data = self._realtime_data
+        self.last_update_success = True
+        self.update_stats["published"] += 1
+        if self._snapshot_store is not None:
+            self._snapshot_store.async_schedule_save(self._realtime_data)
+
+        for child_uid, category in changes:
+            self.async_update_category_listeners(child_uid, category)
+
+    def _on_document(self, child_uid: str, category: RealtimeCategory, data: dict[str, Any]) -> None:
+        """Handle a real-time document update (runs in a Firestore thread)."""
+        value = _growth_from_health(child_uid, data) if category == "growth_data" else data
+        self.hass.loop.call_soon_threadsafe(self._async_queue_update, child_uid, category, value)
 
-            await self.hass.async_add_executor_job(
-                self.api.setup_feed_listener, child_uid, make_feed_callback(child_uid)
-            )
+    async def async_setup_listeners(self) -> None:
+        """Set up real-time listeners for instant updates.
 
-            # Set up health listener (for growth tracking)
-            def make_health_callback(uid):
-                def callback(data):
-                    """Handle real-time health updates."""
-                    if uid not in self._realtime_data:
-                        self._realtime_data[uid] = {"child": child}
-
-                    # Extract growth data from prefs.lastGrowthEntry
-                    prefs = data.get("prefs", {})
-                    last_growth = prefs.get("lastGrowthEntry", {})
-
-                    _LOGGER.debug("Health data received for %s: has_prefs=%s, has_lastGrowthEntry=%s",
-                                  uid, bool(prefs), bool(last_growth))
-
-                    if last_growth:
-                        growth_data: GrowthData = {
-                            "weight": last_growth.get("weight"),
-                            "height": last_growth.get("height"),
-                            "head": last_growth.get("head"),
-                            "weight_units": last_growth.get("weightUnits", "kg"),
-                            "height_units": last_growth.get("heightUnits", "cm"),
-                            "head_units": last_growth.get("headUnits", "hcm"),
-                            "timestamp": last_growth.get("start"),
-                        }
-                        self._realtime_data[uid]["growth_data"] = growth_data
-                        _LOGGER.debug("Updated growth data: weight=%s, height=%s, head=%s, timestamp=%s",
-                                      growth_data.get("weight"), growth_data.get("height"),
-                                      growth_data.get("head"), growth_data.get("timestamp"))
-                    else:
-                        # Set empty growth data if none exists
-                        empty_growth: GrowthData = {
-                            "weight_units": "kg",
-                            "height_units": "cm",
-                            "head_units": "hcm",
-                        }
-                        self._realtime_data[uid]["growth_data"] = empty_growth
-                        _LOGGER.debug("No growth data found in health document")
-
-                    # Trigger coordinator update
-                    self.hass.loop.call_soon_threadsafe(
-                        self.async_set_updated_data, dict(self._realtime_data)
-                    )
-                return callback
+        Failing registrations are recorded in listener_errors per (child,
+        category) instead of aborting the others. If all of them fail the
+        setup is retried, except during a background setup where the entry
+        is already loaded and the watchdog retries them instead.
+        """
+        _LOGGER.info("Setting up real-time Firestore listeners")
 
-            await self.hass.async_add_executor_job(
-                self.api.setup_health_listener, child_uid, make_health_callback(child_uid)
+        keys = [
+            (child["uid"], category)
+            for child in self.children
+            for category in LISTENER_SETUP_METHODS
+        ]
+        # Created first, as listeners deliver their initial snapshots while
+        # the others register. Failed streams count as stalled, the watchdog
+        # retries them.
+        now = time.monotonic()
+        self.listener_health = {key: ListenerHealth(subscribed_at=now) for key in keys}
+        if self._multiplex_listeners:
+            errors = await self._async_setup_multiplexed_listener()
+        else:
+            errors = await self._async_setup_document_listeners(keys)
+
+        self.listener_errors = {}
+        for (child_uid, category), err in errors.items():
+            self.listener_errors[(child_uid, category)] = str(err)
+            _LOGGER.error("Failed to set up %s listener for child %s: %s", category, child_uid, err)
+
+        if len(self.listener_errors) == len(keys) and not self.initializing:
+            raise ConfigEntryNotReady("None of the real-time listeners could be set up")
+
+        if self._unsub_watchdog is None:
+            self._unsub_watchdog = async_track_time_interval(
+                self.hass, self._async_check_listeners, LISTENER_WATCHDOG_INTERVAL
+            )
+        self._async_update_polling()
+        self.session.async_start()
+        if self.write_journal and self._unsub_replay is None and self._replay_task is None:
+            # Writes queued by the previous run
+            self._async_schedule_replay(0)
+
+        if self.initializing:
+            # Entities of categories without a document become available
+            self.initializing = False
+            self.async_update_listeners()
+
+        if self.listener_errors:
+            _LOGGER.warning(
+                "Real-time listeners active for %d of %d streams",
+                len(keys) - len(self.listener_errors),
+                len(keys),
             )
+            return
+
+        _LOGGER.info("Real-time listeners active - updates will be instant!")
+
+    async def _async_setup_document_listeners(
+        self, keys: list[tuple[str, RealtimeCategory]]
+    ) -> dict[tuple[str, RealtimeCategory], Exception]:
+        """Register one document listener per (child, category).
+
+        Registrations run concurrently, bounded by LISTENER_SETUP_CONCURRENCY.
+        """
+        semaphore = asyncio.Semaphore(LISTENER_SETUP_CONCURRENCY)
+
+        async def setup_listener(child_uid: str, category: RealtimeCategory) -> None:
+            setup = getattr(self.api, LISTENER_SETUP_METHODS[category])
+            async with semaphore:
+                await self.executor.async_run(
+                    JobPriority.SESSION,
+                    setup,
+                    child_uid,
+                    partial(self._on_document, child_uid, category),
+                )
+
+        results = await asyncio.gather(
+            *(setup_listener(child_uid, category) for child_uid, category in keys),
+            return_exceptions=True,
+        )
+        return {
+            key: result
+            for key, result in zip(keys, results)
+            if isinstance(result, Exception)
+        }
+
+    async def _async_setup_multiplexed_listener(
+        self,
+    ) -> dict[tuple[str, RealtimeCategory], Exception]:
+        """Watch every collection once for all children."""
+        self._multiplexer = MultiplexedListener(
+            self.api, [child["uid"] for child in self.children], self._on_document
+        )
+        self._multiplexer_token = self.api.id_token
+        return await self.executor.async_run(JobPriority.SESSION, self._multiplexer.start)
+
+    async def _async_resubscribe_multiplexed_listener(self) -> None:
+        """Reopen the multiplexed streams after the ID token was refreshed.
+
+        HuckleberryAPI only recreates the listeners it registered itself, the
+        multiplexed streams would die with the old token.
+        """
+        if self._multiplexer is None or self.api.id_token == self._multiplexer_token:
+            return
 
-            # Set up diaper listener (for diaper tracking)
-            def make_diaper_callback(uid):
-                def callback(data):
-                    """Handle real-time diaper updates."""
-                    if uid not in self._realtime_data:
-                        self._realtime_data[uid] = {"child": child}
-                    self._realtime_data[uid]["diaper_data"] = data
-                    # Trigger coordinator update
-                    self.hass.loop.call_soon_threadsafe(
-                        self.async_set_updated_data, dict(self._realtime_data)
+        _LOGGER.debug("ID token refreshed, reopening multiplexed listeners")
+        await self.executor.async_run(JobPriority.SESSION, self._multiplexer.stop)
+        errors = await self._async_setup_multiplexed_listener()
+        self.listener_errors = {key: str(err) for key, err in errors.items()}
+
+    def _listener_active(self, child_uid: str, category: RealtimeCategory) -> bool:
+        """Return True if the stream of a child's category is open."""
+        if self._multiplexer is not None:
+            return self._multiplexer.is_active(child_uid, category)
+        return document_listener_active(self.api, child_uid, category)
+
+    async def _async_check_listeners(self, _now: datetime | None = None) -> None:
+        """Resubscribe the streams that died or went silent.
+
+        Only the stalled (child, category) stream is reopened - in multiplexed
+        mode the one stream carrying it - so a single stuck listener never
+        forces a reload of the integration. A stream that still delivers
+        nothing after being reopened is retried with exponential backoff.
+        """
+        now = time.monotonic()
+        stalled = [
+            key
+            for key, health in self.listener_health.items()
+            if health.is_stalled(now, self._listener_active(*key))
+        ]
+
+        if self._multiplexer is not None:
+            streams: dict[tuple[str, int], list[tuple[str, RealtimeCategory]]] = {}
+            for child_uid, category in stalled:
+                stream_key = self._multiplexer.stream_key(child_uid, category)
+                streams[stream_key] = [
+                    (uid, category) for uid in self._multiplexer.stream_children(stream_key)
+                ]
+            for stream_key, keys in streams.items():
+                await self._async_resubscribe(keys, self._multiplexer.restart, stream_key)
+        else:
+            for child_uid, category in stalled:
+                await self._async_resubscribe(
+                    [(child_uid, category)],
+                    restart_document_listener,
+                    self.api,
+                    child_uid,
+                    category,
+                    partial(self._on_document, child_uid, category),
+                )
+
+        self._async_update_polling()
+
+    async def _async_resubscribe(
+        self,
+        keys: list[tuple[str, RealtimeCategory]],
+        restart: Callable[..., None],
+        *args: Any,
+    ) -> None:
+        """Reopen one stream and record the attempt for every key it carries."""
+        _LOGGER.warning("Resubscribing stalled real-time listener for %s", keys)
+        try:
+            await self.executor.async_run(JobPriority.SESSION, restart, *args)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Failed to resubscribe listener for %s: %s", keys, err)
+            succeeded = False
+            for key in keys:
+                self.listener_errors[key] = str(err)
+        else:
+            succeeded = True
+            for key in keys:
+                self.listener_errors.pop(key, None)
+
+        now = time.monotonic()
+        for key in keys:
+            if (health := self.listener_health.get(key)) is not None:
+                health.record_resubscribe(now, succeeded)
+
+    def _degraded_keys(self) -> list[tuple[str, RealtimeCategory]]:
+        """Return the (child, category) pairs without a working stream."""
+        return [
+            key
+            for key in self.listener_health
+            if key in self.listener_errors or not self._listener_active(*key)
+        ]
+
+    @callback
+    def _async_update_polling(self) -> None:
+        """Poll only while at least one stream is degraded."""
+        degraded = self._degraded_keys()
+        interval = FALLBACK_POLL_INTERVAL if degraded else None
+        if interval == self.update_interval:
+            return
+
+        self.update_interval = interval
+        if degraded:
+            _LOGGER.warning("Polling %d degraded real-time streams", len(degraded))
+            self._schedule_refresh()
+        else:
+            _LOGGER.info("All real-time listeners healthy, polling stopped")
+            self._async_unsub_refresh()
+
+    async def _async_update_data(self) -> CoordinatorSnapshot:
+        """Poll the documents of degraded streams.
+
+        Healthy streams are push only; with every listener healthy the
+        coordinator has no update interval and this only runs once at setup.
+        """
+        if keys := self._degraded_keys():
+            try:
+                documents = await self.executor.async_run(
+                    JobPriority.SESSION, fetch_documents, self.api, keys
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Failed to poll %d degraded streams: %s", len(keys), err)
+            else:
+                for (child_uid, category), data in documents.items():
+                    if category == "growth_data":
+                        data = _growth_from_health(child_uid, data)
+                    # The stream is still down, so its backoff is kept
+                    self._async_queue_update(child_uid, category, data, from_stream=False)
+
+        # The current snapshot is immutable, so it is handed out as is
+        return self._realtime_data
+
+    async def async_write(self, method: str, child_uid: str, *args: Any) -> None:
+        """Perform a HuckleberryAPI write method for a child.
+
+        The predicted document is published right away and replaced by the
+        listener snapshot that confirms the write. It is rolled back if the
+        write fails or no snapshot arrives within OPTIMISTIC_CONFIRM_TIMEOUT.
+
+        The write goes over the async REST writer when native writes are
+        enabled and through the executor otherwise. Writes of a child are
+        performed one at a time in call order. If Huckleberry cannot be
+        reached, or earlier writes of the child are still queued, the write is
+        journaled and acknowledged; it is replayed in order with its original
+        time.
+
+        A call identical to the child's last write, accepted within the
+        dedupe window, such as a double-tapped button, is ignored without
+        touching the network.
+        """
+        if self._async_is_duplicate(method, child_uid, args):
+            _LOGGER.debug("Ignoring duplicate %s for %s", method, child_uid)
+            self.write_stats["deduplicated"] += 1
+            return
+        called = time.time()
+        pending = self._async_apply_optimistic(method, child_uid, args)
+        queued = QueuedWrite(
+            pending.write_id if pending is not None else uuid.uuid4().hex[:12],
+            called,
+            method,
+            child_uid,
+            args,
+        )
+        # Waits for the earlier writes of the child; other children's writes
+        # run in parallel
+        async with self._write_lane(child_uid):
+            if self.write_journal is not None and self.write_journal.has_child(child_uid):
+                # Writes must not overtake the child's writes waiting for
+                # Huckleberry, which may be reachable again
+                await self._async_enqueue(queued, pending)
+                self._async_replay_now()
+                return
+            try:
+                if self.writer is not None:
+                    await self.writer.async_call(method, child_uid, *args)
+                else:
+                    await self.executor.async_run(
+                        JobPriority.WRITE, getattr(self.api, method), child_uid, *args
+                    )
+            except Exception as err:
+                if self.write_journal is not None and is_offline_error(err):
+                    _LOGGER.warning(
+                        "Huckleberry unreachable, queueing %s for %s: %s", method, child_uid, err
                     )
-                return callback
+                    await self._async_enqueue(queued, pending)
+                    return
+                # A retry of a failed write is not a duplicate
+                if self._recent_writes.get(child_uid, ())[:2] == (method, args):
+                    del self._recent_writes[child_uid]
+                if pending is not None and self._is_current(pending):
+                    self._async_rollback(pending, str(err))
+                raise
+
+        if pending is not None and self._is_current(pending):
+            pending.committed = True
+            if pending.in_flight_snapshot:
+                # The confirming snapshot overtook the API response
+                self._async_reconcile(pending)
+
+    async def async_write_batch(self, operations: list[BatchOperation]) -> list[dict[str, Any]]:
+        """Perform a batch of write methods in as few Firestore commits as possible.
+
+        Returns the result of every operation, in order. Like single writes,
+        a batch is journaled while earlier writes of its children are queued
+        or Huckleberry cannot be reached; its operations are then replayed one by one.
+        """
+        called = time.time()
+        async with AsyncExitStack() as lanes:
+            # Sorted, so concurrent batches cannot wait for each other's lanes
+            for child_uid in sorted({operation.child_uid for operation in operations}):
+                await lanes.enter_async_context(self._write_lane(child_uid))
+            if self.write_journal is not None and any(
+                self.write_journal.has_child(operation.child_uid) for operation in operations
+            ):
+                # Batches must not overtake the writes waiting for Huckleberry
+                results = await self._async_enqueue_batch(operations, called)
+                self._async_replay_now()
+                return results
+            try:
+                if self.writer is not None:
+                    return await async_run_batch(self.writer, operations, called)
+                return await self.executor.async_run(
+                    JobPriority.WRITE, run_batch, self.api, operations, called
+                )
+            except Exception as err:
+                # Raised before anything was committed
+                if self.write_journal is not None and is_offline_error(err):
+                    _LOGGER.warning(
+                        "Huckleberry unreachable, queueing batch of %d operations: %s",
+                        len(operations),
+                        err,
+                    )
+                    return await self._async_enqueue_batch(operations, called)
+                raise
 
-            await self.hass.async_add_executor_job(
-                self.api.setup_diaper_listener, child_uid, make_diaper_callback(child_uid)
-            )
+    def _write_lane(self, child_uid: str) -> asyncio.Lock:
+        """Return the lock that orders the writes of a child.
 
-        _LOGGER.info("Real-time listeners active - updates will be instant!")
+        asyncio.Lock wakes its waiters first in, first out.
+        """
+        return self._write_lanes.setdefault(child_uid, asyncio.Lock())
+
+    @callback
+    def _async_is_duplicate(self, method: str, child_uid: str, args: tuple[Any, ...]) -> bool:
+        """Return True if the last write of the child was identical and recent.
 
-    async def _async_update_data(self) -> dict[str, ChildRealtimeData]:
-        """Update data via library (fallback when listeners aren't active)."""
-        # Ensure session is valid (refresh token if needed) to keep listeners alive
+        Only the last accepted write counts, so toggling back within the
+        dedupe window (start, complete, start) performs every write.
+        Otherwise the write is remembered as the child's last one.
+        """
+        if self._dedupe_window <= 0:
+            return False
+        now = time.monotonic()
+        if (last := self._recent_writes.get(child_uid)) is not None:
+            last_method, last_args, accepted = last
+            if (
+                last_method == method
+                and last_args == args
+                and now - accepted < self._dedupe_window
+            ):
+                return True
+        self._recent_writes[child_uid] = (method, args, now)
+        return False
+
+    @callback
+    def _async_apply_optimistic(
+        self, method: str, child_uid: str, args: tuple[Any, ...]
+    ) -> PendingWrite | None:
+        """Publish the predicted result of a write, returning its pending write."""
+        if (entry := self._realtime_data.get(child_uid)) is None:
+            return None
         try:
-            await self.hass.async_add_executor_job(self.api.maintain_session)
-        except Exception as err:
-            _LOGGER.error("Failed to maintain Huckleberry session: %s", err)
-
-        # If we have real-time data, return it (listeners populate sleep, feed, health, diaper)
-        if self._realtime_data:
-            return dict(self._realtime_data)
-
-        # Initial data structure - listeners will populate it
-        # Don't fetch growth data here - the health listener handles it
-        data: dict[str, ChildRealtimeData] = {}
-        for child in self.children:
-            child_uid = child["uid"]
-            data[child_uid] = {
-                "child": child,
-                "sleep_status": {},
-                # growth_data will be populated by health listener
-            }
-
-        return data
+            prediction = predict(method, child_uid, entry, time.time(), *args)
+        except ValueError:
+            # Invalid arguments, the write itself reports them
+            return None
+        if prediction is None:
+            return None
+
+        category, document = prediction
+        key = (child_uid, category)
+        if (previous := self.pending_writes.get(key)) is not None:
+            # Superseded; the new prediction builds on it and inherits its fallback
+            self._async_finish_pending(previous)
+            fallback = previous.fallback
+        else:
+            fallback = entry.get(category, {})
+        # A snapshot still waiting for the coalescing window predates the write
+        fallback = self._pending_updates.pop(key, fallback)
+
+        pending = PendingWrite(child_uid, category, document, fallback, time.monotonic())
+        self._async_start_confirm_timeout(pending)
+        self.pending_writes[key] = pending
+        _LOGGER.debug("Optimistic %s for %s (write %s)", method, child_uid, pending.write_id)
+        self._async_publish({key: document})
+        return pending
+
+    @callback
+    def _async_start_confirm_timeout(self, pending: PendingWrite) -> None:
+        """Roll a write back unless a snapshot confirms it in time."""
+        pending.unsub_timeout = async_call_later(
+            self.hass,
+            OPTIMISTIC_CONFIRM_TIMEOUT,
+            HassJob(
+                partial(self._async_confirm_timeout, pending),
+                "huckleberry optimistic write timeout",
+                cancel_on_shutdown=True,
+            ),
+        )
+
+    def _is_current(self, pending: PendingWrite) -> bool:
+        """Return True if pending is still the write shown for its key."""
+        return self.pending_writes.get((pending.child_uid, pending.category)) is pending
+
+    @callback
+    def _async_finish_pending(self, pending: PendingWrite) -> None:
+        """Stop tracking a pending write."""
+        if pending.unsub_timeout is not None:
+            pending.unsub_timeout()
+            pending.unsub_timeout = None
+        if self._is_current(pending):
+            del self.pending_writes[(pending.child_uid, pending.category)]
+
+    @callback
+    def _async_reconcile(self, pending: PendingWrite) -> None:
+        """Replace a prediction with the snapshot that confirmed it."""
+        self._async_finish_pending(pending)
+        latency_ms = round((time.monotonic() - pending.started) * 1000, 1)
+        self.write_stats["confirmed"] += 1
+        self.write_stats["last_confirm_ms"] = latency_ms
+        self.write_stats["max_confirm_ms"] = max(self.write_stats["max_confirm_ms"], latency_ms)
+        _LOGGER.debug("Write %s confirmed after %.0f ms", pending.write_id, latency_ms)
+
+        key = (pending.child_uid, pending.category)
+        self._projections[key] = project(pending.category, pending.fallback)
+        self._async_publish({key: pending.fallback})
+
+    @callback
+    def _async_rollback(self, pending: PendingWrite, reason: str) -> None:
+        """Withdraw a prediction, publishing the latest known document again."""
+        self._async_finish_pending(pending)
+        self.write_stats["rolled_back"] += 1
+        _LOGGER.warning(
+            "Rolling back optimistic state of %s for %s (write %s): %s",
+            pending.category,
+            pending.child_uid,
+            pending.write_id,
+            reason,
+        )
+        key = (pending.child_uid, pending.category)
+        self._projections[key] = project(pending.category, pending.fallback)
+        self._async_publish({key: pending.fallback})
+
+    @callback
+    def _async_confirm_timeout(self, pending: PendingWrite, _now: datetime) -> None:
+        """Roll back a write no listener snapshot has confirmed in time."""
+        pending.unsub_timeout = None
+        if self._is_current(pending):
+            self._async_rollback(pending, "not confirmed in time")
+
+    async def _async_enqueue(self, queued: QueuedWrite, pending: PendingWrite | None) -> None:
+        """Journal a write for replay, keeping its optimistic state until then."""
+        assert self.write_journal is not None
+        if pending is not None:
+            # The confirmation can only come after the replay
+            if pending.unsub_timeout is not None:
+                pending.unsub_timeout()
+                pending.unsub_timeout = None
+            self._queued_pending[queued.write_id] = pending
+        await self.write_journal.async_append(queued)
+        if self._unsub_replay is None and self._replay_task is None:
+            self._async_schedule_replay(self._replay_backoff)
+
+    async def _async_enqueue_batch(
+        self, operations: list[BatchOperation], called: float
+    ) -> list[dict[str, Any]]:
+        """Journal the operations of a batch for replay, returning their results."""
+        assert self.write_journal is not None
+        await self.write_journal.async_extend(
+            [
+                QueuedWrite(
+                    uuid.uuid4().hex[:12],
+                    called,
+                    operation.method,
+                    operation.child_uid,
+                    operation.args,
+                )
+                for operation in operations
+            ]
+        )
+        if self._unsub_replay is None and self._replay_task is None:
+            self._async_schedule_replay(self._replay_backoff)
+        return [
+            {"operation": operation.operation, "child_uid": operation.child_uid, "status": "queued"}
+            for operation in operations
+        ]
+
+    @callback
+    def _async_replay_now(self) -> None:
+        """Replay the queued writes now instead of after the backoff."""
+        if self._replay_task is not None:
+            # Picks up the new writes
+            return
+        if self._unsub_replay is not None:
+            self._unsub_replay()
+            self._unsub_replay = None
+        self._replay_task = self.hass.async_create_task(
+            self._async_replay(), f"{DOMAIN} write replay"
+        )
+
+    @callback
+    def _async_schedule_replay(self, delay: float) -> None:
+        """Replay the queued writes after delay seconds."""
+        self._unsub_replay = async_call_later(
+            self.hass,
+            delay,
+            HassJob(self._async_start_replay, "huckleberry write replay", cancel_on_shutdown=True),
+        )
+
+    @callback
+    def _async_start_replay(self, _now: datetime) -> None:
+        """Start replaying the queued writes."""
+        self._unsub_replay = None
+        self._replay_task = self.hass.async_create_task(
+            self._async_replay(), f"{DOMAIN} write replay"
+        )
+
+    async def _async_replay(self) -> None:
+        """Replay the queued writes in order until Huckleberry cannot be reached."""
+        assert self.write_journal is not None
+        try:
+            while (queued := self.write_journal.head) is not None:
+                try:
+                    async with self._write_lane(queued.child_uid):
+                        if self.writer is not None:
+                            await async_replay_write(self.writer, queued)
+                        else:
+                            await self.executor.async_run(
+                                JobPriority.WRITE, replay_write, self.api, queued
+                            )
+                except Exception as err:  # pylint: disable=broad-except
+                    # A ValueError means the write is no longer possible
+                    retry = is_offline_error(err)
+                    if not retry and not isinstance(err, ValueError):
+                        self._replay_attempts += 1
+                        retry = self._replay_attempts < WRITE_REPLAY_MAX_ATTEMPTS
+                    if retry:
+                        _LOGGER.debug(
+                            "Replay of %d queued writes failed, retrying in %d seconds: %s",
+                            len(self.write_journal),
+                            self._replay_backoff,
+                            err,
+                        )
+                        self._async_schedule_replay(self._replay_backoff)
+                        self._replay_backoff = min(
+                            self._replay_backoff * 2, WRITE_REPLAY_BACKOFF_MAX
+                        )
+                        return
+                    _LOGGER.error(
+                        "Dropping queued %s for %s: %s", queued.method, queued.child_uid, err
+                    )
+                    self._async_finish_queued(queued, str(err))
+                else:
+                    _LOGGER.info(
+                        "Replayed %s for %s queued %.0f seconds ago",
+                        queued.method,
+                        queued.child_uid,
+                        time.time() - queued.time,
+                    )
+                    self._async_finish_queued(queued, None)
+                self._replay_attempts = 0
+                await self.write_journal.async_pop()
+            self._replay_backoff = WRITE_REPLAY_BACKOFF
+        finally:
+            self._replay_task = None
+
+    @callback
+    def _async_finish_queued(self, queued: QueuedWrite, error: str | None) -> None:
+        """Wait for the confirmation of a replayed write, or roll back a dropped one."""
+        pending = self._queued_pending.pop(queued.write_id, None)
+        if pending is None or not self._is_current(pending):
+            return
+        if error is not None:
+            self._async_rollback(pending, error)
+            return
+        pending.committed = True
+        self._async_start_confirm_timeout(pending)
 
     async def async_shutdown(self) -> None:
         """Shutdown coordinator and stop listeners."""
         _LOGGER.info("Shutting down Huckleberry coordinator")
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if self._unsub_watchdog is not None:
+            self._unsub_watchdog()
+            self._unsub_watchdog = None
+        self.session.async_stop()
+        # Queued writes stay in the journal for the next run
+        if self._unsub_replay is not None:
+            self._unsub_replay()
+            self._unsub_replay = None
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+        self._queued_pending.clear()
+        for pending in list(self.pending_writes.values()):
+            self._async_finish_pending(pending)
+        # Teardown does not need the priority queue; stop it first so no new
+        # job waits behind a write
+        await self.executor.async_shutdown()
+        if self._multiplexer is not None:
+            await self.hass.async_add_executor_job(self._multiplexer.stop)
         await self.hass.async_add_executor_job(self.api.stop_all_listeners)
@@ -0,0 +1,245 @@
+"""Batched Huckleberry operations committed together."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from google.cloud.firestore_v1 import DELETE_FIELD as FIRESTORE_DELETE_FIELD
+import voluptuous as vol
+
+from homeassistant.helpers import config_validation as cv
+
+from huckleberry_api import HuckleberryAPI
+
+from .const import MAX_BATCH_WRITES
+from .firestore import DELETE_FIELD, PLANNERS, FirestoreWriter, Write
+from .optimistic import apply_writes
+
+DIAPER_AMOUNTS = ["little", "medium", "big"]
+DIAPER_COLORS = ["yellow", "brown", "black", "green", "red", "gray"]
+DIAPER_CONSISTENCIES = ["solid", "loose", "runny", "mucousy", "hard", "pebbles", "diarrhea"]
+
+# Service-level operation names and the HuckleberryAPI method each one calls
+OPERATION_METHODS: dict[str, str] = {
+    "start_sleep": "start_sleep",
+    "pause_sleep": "pause_sleep",
+    "resume_sleep": "resume_sleep",
+    "cancel_sleep": "cancel_sleep",
+    "complete_sleep": "complete_sleep",
+    "start_feeding": "start_feeding",
+    "pause_feeding": "pause_feeding",
+    "resume_feeding": "resume_feeding",
+    "switch_feeding_side": "switch_feeding_side",
+    "cancel_feeding": "cancel_feeding",
+    "complete_feeding": "complete_feeding",
+    "log_diaper_pee": "log_diaper",
+    "log_diaper_poo": "log_diaper",
+    "log_diaper_both": "log_diaper",
+    "log_diaper_dry": "log_diaper",
+    "log_growth": "log_growth",
+}
+
+OPERATION_SCHEMA = vol.Schema({
+    vol.Required("operation"): vol.In(list(OPERATION_METHODS)),
+    vol.Optional("device_id"): cv.string,
+    vol.Optional("child_uid"): cv.string,
+    vol.Optional("side"): vol.In(["left", "right"]),
+    vol.Optional("pee_amount"): vol.In(DIAPER_AMOUNTS),
+    vol.Optional("poo_amount"): vol.In(DIAPER_AMOUNTS),
+    vol.Optional("color"): vol.In(DIAPER_COLORS),
+    vol.Optional("consistency"): vol.In(DIAPER_CONSISTENCIES),
+    vol.Optional("diaper_rash"): cv.boolean,
+    vol.Optional("notes"): cv.string,
+    vol.Optional("weight"): vol.Coerce(float),
+    vol.Optional("height"): vol.Coerce(float),
+    vol.Optional("head"): vol.Coerce(float),
+    vol.Optional("units"): vol.In(["metric", "imperial"]),
+})
+
+
+@dataclass(frozen=True)
+class BatchOperation:
+    """One operation of a batch, resolved to a HuckleberryAPI method call."""
+
+    operation: str
+    child_uid: str
+    method: str
+    args: tuple[Any, ...]
+
+
+def build_operation(data: Mapping[str, Any], child_uid: str) -> BatchOperation:
+    """Return the method call of a validated operation, with the same defaults as the services."""
+    operation = data["operation"]
+    diaper_rash = data.get("diaper_rash", False)
+    notes = data.get("notes")
+    args: tuple[Any, ...] = ()
+    if operation == "start_feeding":
+        args = (data.get("side", "left"),)
+    elif operation == "resume_feeding":
+        args = (data.get("side"),)
+    elif operation == "log_diaper_pee":
+        args = ("pee", data.get("pee_amount"), None, None, None, diaper_rash, notes)
+    elif operation == "log_diaper_poo":
+        args = (
+            "poo", None, data.get("poo_amount"), data.get("color"),
+            data.get("consistency"), diaper_rash, notes,
+        )
+    elif operation == "log_diaper_both":
+        args = (
+            "both", data.get("pee_amount"), data.get("poo_amount"), data.get("color"),
+            data.get("consistency"), diaper_rash, notes,
+        )
+    elif operation == "log_diaper_dry":
+        args = ("dry", None, None, None, None, diaper_rash, notes)
+    elif operation == "log_growth":
+        args = (data.get("weight"), data.get("height"), data.get("head"), data.get("units", "metric"))
+    return BatchOperation(operation, child_uid, OPERATION_METHODS[operation], args)
+
+
+def read_paths(operations: list[BatchOperation]) -> list[str]:
+    """Return the paths of the documents the operations read, in order."""
+    paths: dict[str, None] = {}
+    for operation in operations:
+        if (collection := PLANNERS[operation.method][1]) is not None:
+            paths[f"{collection}/{operation.child_uid}"] = None
+    return list(paths)
+
+
+def plan_batch(
+    operations: list[BatchOperation], documents: dict[str, Any], now: float
+) -> tuple[list[list[Write]], list[dict[str, Any]]]:
+    """Plan every operation, returning the writes and result of each.
+
+    Operations see the writes of the operations before them: documents maps
+    paths to current data and is updated as the batch is planned.
+    """
+    planned: list[list[Write]] = []
+    results: list[dict[str, Any]] = []
+    for operation in operations:
+        result: dict[str, Any] = {
+            "operation": operation.operation,
+            "child_uid": operation.child_uid,
+        }
+        results.append(result)
+        planner, collection = PLANNERS[operation.method]
+        document = documents.get(f"{collection}/{operation.child_uid}") if collection else None
+        try:
+            writes = planner(operation.child_uid, document, now, *operation.args)
+        except ValueError as err:
+            planned.append([])
+            result.update(status="failed", error=str(err))
+            continue
+
+        planned.append(writes)
+        result.update(status="committed" if writes else "skipped", writes=len(writes))
+        for write in writes:
+            # Child documents are what later operations read
+            if write.path.count("/") == 1:
+                documents[write.path] = apply_writes(documents.get(write.path), [write], write.path)
+    return planned, results
+
+
+@dataclass
+class CommitGroup:
+    """The writes of consecutive operations committed together."""
+
+    # Indices of the operations in the batch
+    operations: list[int]
+    writes: list[Write]
+
+
+def commit_groups(planned: list[list[Write]]) -> list[CommitGroup]:
+    """Group the writes of consecutive operations into as few commits as possible.
+
+    The writes of one operation always share a commit.
+    """
+    groups: list[CommitGroup] = []
+    for index, writes in enumerate(planned):
+        if not writes:
+            continue
+        if not groups or len(groups[-1].writes) + len(writes) > MAX_BATCH_WRITES:
+            groups.append(CommitGroup([], []))
+        groups[-1].operations.append(index)
+        groups[-1].writes.extend(writes)
+    return groups
+
+
+def mark_uncommitted(
+    results: list[dict[str, Any]], groups: list[CommitGroup], failed: int, err: Exception
+) -> None:
+    """Record that group failed did not commit, and the groups after it were not attempted."""
+    for number, group in enumerate(groups[failed:]):
+        for index in group.operations:
+            if number == 0:
+                results[index].update(status="failed", error=str(err))
+            else:
+                results[index]["status"] = "not_attempted"
+
+
+def run_batch(
+    api: HuckleberryAPI, operations: list[BatchOperation], now: float
+) -> list[dict[str, Any]]:
+    """Read, plan and commit a batch with the Firestore client (blocking).
+
+    If the first commit fails nothing was written and the error is raised.
+    A later failing commit is reported in the results instead, as the
+    operations of the earlier commits are written.
+    """
+    client = api._get_firestore_client()  # pylint: disable=protected-access
+    refs = [client.document(path) for path in read_paths(operations)]
+    documents = {
+        snapshot.reference.path: snapshot.to_dict()
+        for snapshot in (client.get_all(refs) if refs else [])
+        if snapshot.exists
+    }
+    planned, results = plan_batch(operations, documents, now)
+    groups = commit_groups(planned)
+    for number, group in enumerate(groups):
+        try:
+            commit_writes(api, group.writes)
+        except Exception as err:  # pylint: disable=broad-except
+            if number == 0:
+                raise
+            mark_uncommitted(results, groups, number, err)
+            break
+    return results
+
+
+def commit_writes(api: HuckleberryAPI, writes: list[Write]) -> None:
+    """Commit writes atomically with the Firestore client (blocking)."""
+    client = api._get_firestore_client()  # pylint: disable=protected-access
+    batch = client.batch()
+    for write in writes:
+        ref = client.document(write.path)
+        if write.mode == "update":
+            batch.update(ref, {
+                path: FIRESTORE_DELETE_FIELD if value is DELETE_FIELD else value
+                for path, value in write.data.items()
+            })
+        else:
+            batch.set(ref, write.data, merge=write.mode == "merge")
+    batch.commit()
+
+
+async def async_run_batch(
+    writer: FirestoreWriter, operations: list[BatchOperation], now: float
+) -> list[dict[str, Any]]:
+    """Read, plan and commit a batch over the Firestore REST API.
+
+    Commit failures are handled like in run_batch.
+    """
+    paths = read_paths(operations)
+    documents = dict(zip(paths, await asyncio.gather(*map(writer.async_get, paths))))
+    planned, results = plan_batch(operations, documents, now)
+    groups = commit_groups(planned)
+    for number, group in enumerate(groups):
+        try:
+            await writer.async_commit(group.writes)
+        except Exception as err:  # pylint: disable=broad-except
+            if number == 0:
+                raise
+            mark_uncommitted(results, groups, number, err)
+            break
+    return results
@@ -1,22 +1,42 @@
 """Calendar platform for Huckleberry integration."""
 from __future__ import annotations
 
+import asyncio
+import heapq
 import logging
+import time
+from collections.abc import Mapping
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Any
 
+from google.cloud.firestore_v1 import FieldFilter
+
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.util import dt as dt_util
 
+from huckleberry_api import HuckleberryAPI
+
 from . import HuckleberryEntryData
-from .const import DOMAIN
+from .const import CALENDAR_RECONCILE_INTERVAL, CALENDAR_RECONCILE_LOOKBACK, DOMAIN
 from .entity import HuckleberryBaseEntity
+from .event_cache import EventCache
+from .executor import JobPriority
 
 _LOGGER = logging.getLogger(__name__)
 
+# Real-time categories whose documents carry the last completed session,
+# and the calendar category of those sessions
+REALTIME_EVENT_CATEGORIES = {
+    "sleep_status": "sleep",
+    "feed_status": "feed",
+    "diaper_data": "diaper",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -31,30 +51,267 @@ async def async_setup_entry(
 
     entities = []
     for child in children:
-        entities.append(HuckleberryCalendar(coordinator, child, api))
+        entities.append(
+            HuckleberryCalendar(coordinator, child, api, data["event_caches"][child["uid"]])
+        )
 
     async_add_entities(entities)
 
 
+def fetch_intervals(
+    api: HuckleberryAPI, collection: str, child_uid: str, start: int, end: int
+) -> list[dict[str, Any]]:
+    """Return the entries of a child's history collection starting in [start, end) (blocking).
+
+    Runs the same two queries as HuckleberryAPI.get_sleep_intervals and its
+    siblings, which catch every error and return what they have so far.
+    Here errors propagate, so an incomplete range is never cached. Entries
+    batched in multi-entry documents are marked with is_multi_entry.
+    """
+    client = api._get_firestore_client()  # pylint: disable=protected-access
+    # Growth entries live in "data", the other collections in "intervals"
+    entries_ref = (
+        client.collection(collection)
+        .document(child_uid)
+        .collection("data" if collection == "health" else "intervals")
+    )
+    entries: list[dict[str, Any]] = []
+    for doc in (
+        entries_ref.where(filter=FieldFilter("start", ">=", start))
+        .where(filter=FieldFilter("start", "<", end))
+        .order_by("start")
+        .stream()
+    ):
+        data = doc.to_dict()
+        if data and not data.get("multi") and "start" in data:
+            entries.append({**data, "is_multi_entry": False})
+
+    # The start of batched entries is nested, so their documents cannot be
+    # filtered by it
+    for doc in entries_ref.where(filter=FieldFilter("multi", "==", True)).stream():
+        data = doc.to_dict()
+        if not data or not isinstance(data.get("data"), dict):
+            continue
+        for entry in data["data"].values():
+            if isinstance(entry, dict) and "start" in entry and start <= entry["start"] < end:
+                entries.append({**entry, "is_multi_entry": True})
+    return entries
+
+
+def sleep_event(start: float, duration_seconds: float) -> CalendarEvent:
+    """Return the calendar event of a sleep session."""
+    start_time = datetime.fromtimestamp(start, tz=dt_util.DEFAULT_TIME_ZONE)
+    duration_minutes = int(duration_seconds / 60)
+    end_time = start_time + timedelta(minutes=duration_minutes)
+
+    # Format duration as hours and minutes
+    if duration_minutes >= 60:
+        hours = duration_minutes // 60
+        mins = duration_minutes % 60
+        duration_str = f"{hours}h {mins}m" if mins > 0 else f"{hours}h"
+    else:
+        duration_str = f"{duration_minutes}m"
+
+    return CalendarEvent(
+        start=start_time,
+        end=end_time,
+        summary=f"💤 Sleep ({duration_str})",
+        description=f"Sleep duration: {duration_str}",
+    )
+
+
+def feed_event(start: float, left_duration: int, right_duration: int) -> CalendarEvent:
+    """Return the calendar event of a feeding session, durations in minutes."""
+    start_time = datetime.fromtimestamp(start, tz=dt_util.DEFAULT_TIME_ZONE)
+    total_duration = left_duration + right_duration
+    end_time = start_time + timedelta(minutes=total_duration)
+
+    # Build summary based on sides used
+    sides = []
+    if left_duration > 0:
+        sides.append(f"L:{left_duration}m")
+    if right_duration > 0:
+        sides.append(f"R:{right_duration}m")
+
+    sides_str = " ".join(sides) if sides else f"{total_duration}m"
+    description = f"Feeding - Total: {total_duration} minutes"
+    if left_duration > 0:
+        description += f"\nLeft: {left_duration} minutes"
+    if right_duration > 0:
+        description += f"\nRight: {right_duration} minutes"
+
+    return CalendarEvent(
+        start=start_time,
+        end=end_time,
+        summary=f"🍼 Feed ({sides_str})",
+        description=description,
+    )
+
+
+def diaper_event(interval: Mapping[str, Any]) -> CalendarEvent:
+    """Return the calendar event of a diaper change."""
+    event_time = datetime.fromtimestamp(interval["start"], tz=dt_util.DEFAULT_TIME_ZONE)
+
+    # Diaper change is an instant event (same start/end)
+    mode = interval.get("mode", "unknown")
+    mode_emoji = {
+        "pee": "💧",
+        "poo": "💩",
+        "both": "💧💩",
+        "dry": "✅",
+    }.get(mode, "🩲")
+
+    description = f"Diaper change: {mode}"
+
+    # Add details if available
+    if "pooColor" in interval:
+        description += f"\nColor: {interval['pooColor']}"
+    if "pooConsistency" in interval:
+        description += f"\nConsistency: {interval['pooConsistency']}"
+    if "amount" in interval:
+        description += f"\nAmount: {interval['amount']}"
+
+    return CalendarEvent(
+        start=event_time,
+        end=event_time,
+        summary=f"{mode_emoji} Diaper ({mode.capitalize()})",
+        description=description,
+    )
+
+
+def health_event(entry: Mapping[str, Any]) -> CalendarEvent:
+    """Return the calendar event of a growth measurement."""
+    event_time = datetime.fromtimestamp(entry["start"], tz=dt_util.DEFAULT_TIME_ZONE)
+
+    # Growth entry is an instant event
+    description = "Growth tracking:"
+
+    # Build description from available measurements
+    measurements = []
+    if "weight" in entry:
+        measurements.append(f"Weight: {entry['weight']}")
+    if "height" in entry:
+        measurements.append(f"Height: {entry['height']}")
+    if "head" in entry:
+        measurements.append(f"Head: {entry['head']}")
+
+    if measurements:
+        description += "\n" + "\n".join(measurements)
+
+    return CalendarEvent(
+        start=event_time,
+        end=event_time,
+        summary="📏 Growth Measurement",
+        description=description,
+    )
+
+
+def realtime_event(category: str, document: Mapping[str, Any] | None) -> CalendarEvent | None:
+    """Return the event of the last session completed in a real-time document."""
+    prefs = (document or {}).get("prefs") or {}
+    if category == "sleep_status":
+        if last_sleep := prefs.get("lastSleep"):
+            return sleep_event(last_sleep["start"], last_sleep.get("duration", 0))
+    elif category == "feed_status":
+        # The durations of the latest feed are in seconds
+        if last_nursing := prefs.get("lastNursing"):
+            return feed_event(
+                last_nursing["start"],
+                round(last_nursing.get("leftDuration", 0) / 60),
+                round(last_nursing.get("rightDuration", 0) / 60),
+            )
+    elif category == "diaper_data":
+        if last_diaper := prefs.get("lastDiaper"):
+            return diaper_event(last_diaper)
+    return None
+
+
 class HuckleberryCalendar(HuckleberryBaseEntity, CalendarEntity):
     """Calendar entity for Huckleberry events."""
 
     _attr_has_entity_name = True
     _attr_name = "Events"
 
-    def __init__(self, coordinator, child, api) -> None:
+    def __init__(self, coordinator, child, api, cache: EventCache | None = None) -> None:
         """Initialize the calendar."""
         super().__init__(coordinator, child)
         self._api = api
         self._attr_unique_id = f"{child['uid']}_calendar"
-        self._events: list[CalendarEvent] = []
+        # Fetched ranges, served from memory until they expire, and the
+        # time-ordered index of the entity state
+        self._cache = cache or EventCache()
+        # Background fetches of the windows next to viewed ranges
+        self._prefetches: dict[tuple[float, float], asyncio.Task[None]] = {}
+
+    async def async_added_to_hass(self) -> None:
+        """Feed completed sessions into the cache and reconcile it periodically."""
+        await super().async_added_to_hass()
+        for category in REALTIME_EVENT_CATEGORIES:
+            self.async_on_remove(
+                self.coordinator.async_add_category_listener(
+                    self.child_uid,
+                    category,
+                    partial(self._async_add_realtime_event, category),
+                )
+            )
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_reconcile, CALENDAR_RECONCILE_INTERVAL
+            )
+        )
+        # The entity state does not wait for the first interval or a view
+        self.async_on_remove(
+            self.hass.async_create_background_task(
+                self._async_reconcile(), f"{DOMAIN} calendar reconcile {self.child_uid}"
+            ).cancel
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the running prefetches."""
+        await super().async_will_remove_from_hass()
+        for task in self._prefetches.values():
+            task.cancel()
+
+    @callback
+    def _async_add_realtime_event(self, category: str) -> None:
+        """Add the last session of a real-time document to the cached ranges."""
+        if (self.child_uid, category) in self.coordinator.pending_writes:
+            # Optimistic documents may still be rolled back
+            return
+        child_data = (self.coordinator.data or {}).get(self.child_uid) or {}
+        if (event := realtime_event(category, child_data.get(category))) is not None:
+            if self._cache.add(REALTIME_EVENT_CATEGORIES[category], event):
+                self.async_write_ha_state()
+
+    async def _async_reconcile(self, _now: datetime | None = None) -> None:
+        """Fetch the recent cached ranges again, for entries edited elsewhere.
+
+        Only ranges read within the cache age are fetched, so ranges nobody
+        views any more still expire. The days around now, where the entity
+        state is looked up, are always kept cached.
+        """
+        today = dt_util.start_of_local_day()
+        window = ((today - timedelta(days=1)).timestamp(), (today + timedelta(days=1)).timestamp())
+        ranges = self._cache.recent(time.time() - CALENDAR_RECONCILE_LOOKBACK, window)
+        for covered in ranges:
+            fetched, complete = await self._async_fetch_range(covered.start, covered.end)
+            if complete:
+                # Not a read, so the range keeps its place in the eviction order
+                self._cache.store(covered.start, covered.end, fetched, used=covered.used)
+        for gap_start, gap_end in self._cache.gaps(*window):
+            fetched, complete = await self._async_fetch_range(gap_start, gap_end)
+            if complete:
+                # Unread until the calendar is viewed
+                self._cache.store(gap_start, gap_end, fetched, used=0.0)
+        # Sessions completed while fetching may be missing from the results
+        for category in REALTIME_EVENT_CATEGORIES:
+            self._async_add_realtime_event(category)
+        self.async_write_ha_state()
 
     @property
     def event(self) -> CalendarEvent | None:
-        """Return the next upcoming event."""
-        now = dt_util.now()
-        upcoming = [e for e in self._events if e.start > now]
-        return min(upcoming, key=lambda e: e.start) if upcoming else None
+        """Return the cached event in progress, or else the next upcoming one."""
+        return self._cache.current_or_next(time.time())
 
     async def async_get_events(
         self,
@@ -70,264 +327,199 @@ class HuckleberryCalendar(HuckleberryBaseEntity, CalendarEntity):
             end_date,
         )
 
-        events: list[CalendarEvent] = []
-
-        # Fetch sleep intervals
-        events.extend(
-            await self.hass.async_add_executor_job(
-                self._fetch_sleep_events, start_date, end_date
+        start, end = start_date.timestamp(), end_date.timestamp()
+        if prefetches := [
+            task
+            for (prefetch_start, prefetch_end), task in self._prefetches.items()
+            if prefetch_start < end and prefetch_end > start
+        ]:
+            # Reuse the running prefetches instead of fetching their ranges again;
+            # shielded, as a cancelled view must not cancel them
+            await asyncio.wait([asyncio.shield(task) for task in prefetches])
+        gaps = self._cache.missing(start, end)
+        # Events of sub-ranges that could not be fetched completely, so are not cached
+        uncached: list[list[CalendarEvent]] = []
+        for (gap_start, gap_end), (fetched, complete) in zip(
+            gaps,
+            await asyncio.gather(
+                *(self._async_fetch_range(gap_start, gap_end) for gap_start, gap_end in gaps)
+            ),
+        ):
+            if complete:
+                self._cache.store(gap_start, gap_end, fetched)
+            else:
+                uncached.extend(fetched.values())
+
+        # Every stream is in start order, so a k-way merge orders the result
+        events = list(
+            heapq.merge(
+                *self._cache.events(start, end).values(),
+                *uncached,
+                key=lambda event: event.start,
             )
         )
 
-        # Fetch feeding intervals
-        events.extend(
-            await self.hass.async_add_executor_job(
-                self._fetch_feed_events, start_date, end_date
-            )
-        )
+        _LOGGER.debug("Found %d events for %s", len(events), self._child["name"])
 
-        # Fetch diaper intervals
-        events.extend(
-            await self.hass.async_add_executor_job(
-                self._fetch_diaper_events, start_date, end_date
-            )
-        )
+        self._async_schedule_prefetch(start, end)
+        return events
 
-        # Fetch health/growth entries
-        events.extend(
-            await self.hass.async_add_executor_job(
-                self._fetch_health_events, start_date, end_date
+    @callback
+    def _async_schedule_prefetch(self, start: float, end: float) -> None:
+        """Prefetch the windows before and after a viewed range in the background.
+
+        Navigating the calendar by week or month then hits the cache. The
+        prefetches run at PREFETCH priority, behind the fetches of viewed
+        ranges. The window after the range is skipped once it is in the
+        future, where no entries exist yet.
+        """
+        window = end - start
+        windows = [(start - window, start)]
+        if end < time.time():
+            windows.append((end, end + window))
+        for window_range in windows:
+            if window_range in self._prefetches or not self._cache.can_prefetch:
+                continue
+            self._prefetches[window_range] = self.hass.async_create_background_task(
+                self._async_prefetch(*window_range),
+                f"{DOMAIN} calendar prefetch {self.child_uid}",
             )
-        )
 
-        # Sort by start time
-        events.sort(key=lambda e: e.start)
-
-        self._events = events
-        _LOGGER.debug("Found %d events for %s", len(events), self._child["name"])
-
-        return events
+    async def _async_prefetch(self, start: float, end: float) -> None:
+        """Cache the missing parts of a window, while the cache has room."""
+        try:
+            for gap_start, gap_end in self._cache.gaps(start, end):
+                if not self._cache.can_prefetch:
+                    break
+                fetched, complete = await self._async_fetch_range(
+                    gap_start, gap_end, JobPriority.PREFETCH
+                )
+                if complete:
+                    self._cache.store(gap_start, gap_end, fetched, prefetched=True)
+        finally:
+            del self._prefetches[(start, end)]
+
+    async def _async_fetch_range(
+        self, start: float, end: float, priority: JobPriority = JobPriority.HISTORY
+    ) -> tuple[dict[str, list[CalendarEvent]], bool]:
+        """Fetch the events of every category starting in [start, end).
+
+        Returns the events per category, each in start order, and whether
+        every category was fetched. The categories are fetched concurrently
+        at priority.
+        """
+        fetchers = {
+            "sleep": self._fetch_sleep_events,
+            "feed": self._fetch_feed_events,
+            "diaper": self._fetch_diaper_events,
+            "health": self._fetch_health_events,
+        }
+        start_date = dt_util.utc_from_timestamp(start)
+        end_date = dt_util.utc_from_timestamp(end)
+
+        async def fetch_category(category: str) -> list[CalendarEvent]:
+            started = time.monotonic()
+            try:
+                events = await self.coordinator.executor.async_run(
+                    priority, fetchers[category], start_date, end_date
+                )
+            finally:
+                self._cache.record_fetch(category, (time.monotonic() - started) * 1000)
+            # Nearly always sorted already, which makes this linear
+            return sorted(events, key=lambda event: event.start)
+
+        events: dict[str, list[CalendarEvent]] = {}
+        for category, result in zip(
+            fetchers,
+            await asyncio.gather(*map(fetch_category, fetchers), return_exceptions=True),
+        ):
+            if isinstance(result, BaseException):
+                _LOGGER.error("Error fetching %s events: %s", category, result)
+            else:
+                events[category] = result
+        return events, len(events) == len(fetchers)
 
     def _fetch_sleep_events(
         self, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
-        """Fetch sleep intervals using API."""
-        events = []
+        """Fetch sleep intervals, raising if the query fails."""
         child_uid = self._child["uid"]
 
-        try:
-            # Convert to timestamps (seconds)
-            start_s = int(start_date.timestamp())
-            end_s = int(end_date.timestamp())
-
-            # Fetch intervals from API
-            intervals = self._api.get_sleep_intervals(child_uid, start_s, end_s)
+        # Convert to timestamps (seconds)
+        start_s = int(start_date.timestamp())
+        end_s = int(end_date.timestamp())
 
-            for interval in intervals:
-                start_time = datetime.fromtimestamp(
-                    interval["start"], tz=dt_util.DEFAULT_TIME_ZONE
-                )
-
-                duration_seconds = interval.get("duration", 0)
-                duration_minutes = int(duration_seconds / 60)
-                end_time = start_time + timedelta(minutes=duration_minutes)
-
-                # Format duration as hours and minutes
-                if duration_minutes >= 60:
-                    hours = duration_minutes // 60
-                    mins = duration_minutes % 60
-                    duration_str = f"{hours}h {mins}m" if mins > 0 else f"{hours}h"
-                else:
-                    duration_str = f"{duration_minutes}m"
-
-                summary = f"💤 Sleep ({duration_str})"
-                description = f"Sleep duration: {duration_str}"
-
-                events.append(
-                    CalendarEvent(
-                        start=start_time,
-                        end=end_time,
-                        summary=summary,
-                        description=description,
-                    )
-                )
+        intervals = fetch_intervals(self._api, "sleep", child_uid, start_s, end_s)
+        events = [
+            sleep_event(interval["start"], interval.get("duration", 0))
+            for interval in intervals
+        ]
 
-            _LOGGER.debug("Found %d sleep events", len(events))
-
-        except Exception as err:
-            _LOGGER.error("Error fetching sleep events: %s", err)
+        _LOGGER.debug("Found %d sleep events", len(events))
 
         return events
 
     def _fetch_feed_events(
         self, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
-        """Fetch feeding intervals using API."""
+        """Fetch feeding intervals, raising if the query fails."""
         events = []
         child_uid = self._child["uid"]
 
-        try:
-            # Convert to timestamps (seconds)
-            start_s = int(start_date.timestamp())
-            end_s = int(end_date.timestamp())
-
-            # Fetch intervals from API
-            intervals = self._api.get_feed_intervals(child_uid, start_s, end_s)
+        # Convert to timestamps (seconds)
+        start_s = int(start_date.timestamp())
+        end_s = int(end_date.timestamp())
 
-            for interval in intervals:
-                start_time = datetime.fromtimestamp(
-                    interval["start"], tz=dt_util.DEFAULT_TIME_ZONE
-                )
+        intervals = fetch_intervals(self._api, "feed", child_uid, start_s, end_s)
 
-                # Check if this is a multi-entry document (durations in seconds)
-                # or regular document (durations in minutes)
-                if interval.get("is_multi_entry"):
-                    # Multi-entry: durations are in SECONDS, convert to minutes
-                    left_duration = round(interval.get("leftDuration", 0) / 60)
-                    right_duration = round(interval.get("rightDuration", 0) / 60)
-                else:
-                    # Regular doc: durations are in minutes
-                    left_duration = int(interval.get("leftDuration", 0))
-                    right_duration = int(interval.get("rightDuration", 0))
-
-                total_duration = left_duration + right_duration
-                end_time = start_time + timedelta(minutes=total_duration)
-
-                # Build summary based on sides used
-                sides = []
-                if left_duration > 0:
-                    sides.append(f"L:{left_duration}m")
-                if right_duration > 0:
-                    sides.append(f"R:{right_duration}m")
-
-                sides_str = " ".join(sides) if sides else f"{total_duration}m"
-                summary = f"🍼 Feed ({sides_str})"
-                description = f"Feeding - Total: {total_duration} minutes"
-                if left_duration > 0:
-                    description += f"\nLeft: {left_duration} minutes"
-                if right_duration > 0:
-                    description += f"\nRight: {right_duration} minutes"
-
-                events.append(
-                    CalendarEvent(
-                        start=start_time,
-                        end=end_time,
-                        summary=summary,
-                        description=description,
-                    )
-                )
+        for interval in intervals:
+            # Check if this is a multi-entry document (durations in seconds)
+            # or regular document (durations in minutes)
+            if interval.get("is_multi_entry"):
+                # Multi-entry: durations are in SECONDS, convert to minutes
+                left_duration = round(interval.get("leftDuration", 0) / 60)
+                right_duration = round(interval.get("rightDuration", 0) / 60)
+            else:
+                # Regular doc: durations are in minutes
+                left_duration = int(interval.get("leftDuration", 0))
+                right_duration = int(interval.get("rightDuration", 0))
 
-            _LOGGER.debug("Found %d feed events", len(events))
+            events.append(feed_event(interval["start"], left_duration, right_duration))
 
-        except Exception as err:
-            _LOGGER.error("Error fetching feed events: %s", err)
+        _LOGGER.debug("Found %d feed events", len(events))
 
         return events
 
     def _fetch_diaper_events(
         self, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
-        """Fetch diaper intervals using API."""
-        events = []
+        """Fetch diaper intervals, raising if the query fails."""
         child_uid = self._child["uid"]
 
-        try:
-            # Convert to timestamps (seconds)
-            start_s = int(start_date.timestamp())
-            end_s = int(end_date.timestamp())
-
-            # Fetch intervals from API
-            intervals = self._api.get_diaper_intervals(child_uid, start_s, end_s)
+        # Convert to timestamps (seconds)
+        start_s = int(start_date.timestamp())
+        end_s = int(end_date.timestamp())
 
-            for interval in intervals:
-                event_time = datetime.fromtimestamp(
-                    interval["start"], tz=dt_util.DEFAULT_TIME_ZONE
-                )
+        intervals = fetch_intervals(self._api, "diaper", child_uid, start_s, end_s)
+        events = [diaper_event(interval) for interval in intervals]
 
-                # Diaper change is an instant event (same start/end)
-                mode = interval.get("mode", "unknown")
-                mode_emoji = {
-                    "pee": "💧",
-                    "poo": "💩",
-                    "both": "💧💩",
-                    "dry": "✅",
-                }.get(mode, "🩲")
-
-                summary = f"{mode_emoji} Diaper ({mode.capitalize()})"
-                description = f"Diaper change: {mode}"
-
-                # Add details if available
-                if "pooColor" in interval:
-                    description += f"\nColor: {interval['pooColor']}"
-                if "pooConsistency" in interval:
-                    description += f"\nConsistency: {interval['pooConsistency']}"
-                if "amount" in interval:
-                    description += f"\nAmount: {interval['amount']}"
-
-                events.append(
-                    CalendarEvent(
-                        start=event_time,
-                        end=event_time,
-                        summary=summary,
-                        description=description,
-                    )
-                )
-
-            _LOGGER.debug("Found %d diaper events", len(events))
-
-        except Exception as err:
-            _LOGGER.error("Error fetching diaper events: %s", err)
+        _LOGGER.debug("Found %d diaper events", len(events))
 
         return events
 
     def _fetch_health_events(
         self, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
-        """Fetch health/growth entries using API."""
-        events = []
+        """Fetch health/growth entries, raising if the query fails."""
         child_uid = self._child["uid"]
 
-        try:
-            # Convert to timestamps (seconds)
-            start_s = int(start_date.timestamp())
-            end_s = int(end_date.timestamp())
-
-            # Fetch entries from API
-            entries = self._api.get_health_entries(child_uid, start_s, end_s)
-
-            for entry in entries:
-                event_time = datetime.fromtimestamp(
-                    entry["start"], tz=dt_util.DEFAULT_TIME_ZONE
-                )
-
-                # Growth entry is an instant event
-                summary = "📏 Growth Measurement"
-                description = "Growth tracking:"
-
-                # Build description from available measurements
-                measurements = []
-                if "weight" in entry:
-                    measurements.append(f"Weight: {entry['weight']}")
-                if "height" in entry:
-                    measurements.append(f"Height: {entry['height']}")
-                if "head" in entry:
-                    measurements.append(f"Head: {entry['head']}")
-
-                if measurements:
-                    description += "\n" + "\n".join(measurements)
-
-                events.append(
-                    CalendarEvent(
-                        start=event_time,
-                        end=event_time,
-                        summary=summary,
-                        description=description,
-                    )
-                )
+        # Convert to timestamps (seconds)
+        start_s = int(start_date.timestamp())
+        end_s = int(end_date.timestamp())
 
-            _LOGGER.debug("Found %d health events", len(events))
+        entries = fetch_intervals(self._api, "health", child_uid, start_s, end_s)
+        events = [health_event(entry) for entry in entries]
 
-        except Exception as err:
-            _LOGGER.error("Error fetching health events: %s", err)
+        _LOGGER.debug("Found %d health events", len(events))
 
         return events
@@ -9,11 +9,21 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.util import dt as dt_util
 
 from huckleberry_api import HuckleberryAPI
-from .const import DOMAIN
+from .const import (
+    CONF_BACKGROUND_SETUP,
+    CONF_COALESCE_WINDOW,
+    CONF_DEDUPE_WINDOW,
+    CONF_MULTIPLEX_LISTENERS,
+    CONF_NATIVE_WRITES,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_DEDUPE_WINDOW,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +40,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -77,3 +95,47 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
         )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Huckleberry options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_COALESCE_WINDOW,
+                        default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                    vol.Optional(
+                        CONF_DEDUPE_WINDOW,
+                        default=options.get(CONF_DEDUPE_WINDOW, DEFAULT_DEDUPE_WINDOW),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=30)),
+                    vol.Optional(
+                        CONF_MULTIPLEX_LISTENERS,
+                        default=options.get(CONF_MULTIPLEX_LISTENERS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_BACKGROUND_SETUP,
+                        default=options.get(CONF_BACKGROUND_SETUP, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_NATIVE_WRITES,
+                        default=options.get(CONF_NATIVE_WRITES, False),
+                    ): bool,
+                }
+            ),
+        )
@@ -1,4 +1,92 @@
 """Constants for the Huckleberry integration."""
+from datetime import timedelta
 from typing import Final
 
 DOMAIN: Final = "huckleberry"
+
+CONF_COALESCE_WINDOW: Final = "coalesce_window"
+CONF_MULTIPLEX_LISTENERS: Final = "multiplex_listeners"
+CONF_BACKGROUND_SETUP: Final = "background_setup"
+CONF_NATIVE_WRITES: Final = "native_writes"
+CONF_DEDUPE_WINDOW: Final = "dedupe_window"
+
+# Seconds to merge bursts of listener snapshots into a single publish
+DEFAULT_COALESCE_WINDOW: Final = 0.25
+
+# Seconds in which a repeated identical write is ignored
+DEFAULT_DEDUPE_WINDOW: Final = 2.0
+
+# Seconds to wait before writing the last known snapshot to disk
+SNAPSHOT_SAVE_DELAY: Final = 30
+
+# Firestore accepts at most this many writes per commit
+MAX_BATCH_WRITES: Final = 500
+
+# Records per commit of a history import, and seconds between commits
+IMPORT_CHUNK_SIZE: Final = 100
+IMPORT_CHUNK_INTERVAL: Final = 1.0
+
+# Record errors kept in the progress of a history import
+IMPORT_MAX_ERRORS: Final = 20
+
+# Seconds an optimistic write may wait for its confirming snapshot
+OPTIMISTIC_CONFIRM_TIMEOUT: Final = 30
+
+# Backoff between replays of queued writes while Huckleberry is unreachable (seconds)
+WRITE_REPLAY_BACKOFF: Final = 15
+WRITE_REPLAY_BACKOFF_MAX: Final = 10 * 60
+
+# Failed replays of a queued write before it is dropped, not counting
+# failures to reach Huckleberry
+WRITE_REPLAY_MAX_ATTEMPTS: Final = 5
+
+# Seconds fetched calendar ranges are served from memory
+CALENDAR_CACHE_MAX_AGE: Final = 30 * 60
+
+# How often cached calendar ranges of the last CALENDAR_RECONCILE_LOOKBACK
+# seconds are fetched again, to pick up entries edited on other devices
+CALENDAR_RECONCILE_INTERVAL: Final = timedelta(minutes=15)
+CALENDAR_RECONCILE_LOOKBACK: Final = 24 * 60 * 60
+
+# Bytes of calendar events cached per child
+CALENDAR_CACHE_MAX_BYTES: Final = 1024 * 1024
+
+# Bytes of cached calendar events up to which the windows next to a viewed
+# range are prefetched, leaving the rest of the cache to viewed ranges
+CALENDAR_PREFETCH_MAX_BYTES: Final = 512 * 1024
+
+# Seconds before a failed background setup reloads the config entry
+BACKGROUND_SETUP_RETRY: Final = 60
+
+# Worker threads of the integration's own executor
+EXECUTOR_MAX_WORKERS: Final = 4
+
+# Listener registrations allowed to run at the same time during setup
+LISTENER_SETUP_CONCURRENCY: Final = 4
+
+# How often the listener watchdog looks for stalled streams
+LISTENER_WATCHDOG_INTERVAL: Final = timedelta(minutes=2)
+
+# Polling interval while at least one listener stream is down
+FALLBACK_POLL_INTERVAL: Final = timedelta(seconds=30)
+
+# Seconds before ID token expiry the session is refreshed, plus up to
+# SESSION_REFRESH_JITTER random and SESSION_REFRESH_STAGGER per-entry seconds
+SESSION_REFRESH_LEAD: Final = 10 * 60
+SESSION_REFRESH_JITTER: Final = 60
+SESSION_REFRESH_STAGGER: Final = 5 * 60
+
+# Seconds of validity a write needs left on the ID token; tokens closer to
+# expiry, because a scheduled refresh was missed, are refreshed first
+SESSION_TOKEN_MIN_VALIDITY: Final = 5 * 60
+
+# Backoff between failed session refreshes (seconds)
+SESSION_RETRY_BACKOFF: Final = 15
+SESSION_RETRY_BACKOFF_MAX: Final = 10 * 60
+
+# Seconds a stream may stay silent before it is resubscribed as a precaution
+LISTENER_STALE_AFTER: Final = 2 * 60 * 60
+
+# Backoff between resubscriptions of a stream that delivers nothing (seconds)
+LISTENER_RESUBSCRIBE_BACKOFF: Final = 30
+LISTENER_RESUBSCRIBE_BACKOFF_MAX: Final = 60 * 60
@@ -0,0 +1,104 @@
+"""Diagnostics support for Huckleberry."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from . import HuckleberryEntryData
+from .const import DOMAIN
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: HuckleberryEntryData = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    update_stats = coordinator.update_stats
+    now = time.monotonic()
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "children": [child["uid"] for child in data["children"]],
+        "initializing": coordinator.initializing,
+        "listener_errors": [
+            {"child_uid": child_uid, "category": category, "error": error}
+            for (child_uid, category), error in coordinator.listener_errors.items()
+        ],
+        "stale": [
+            {"child_uid": child_uid, "category": category}
+            for child_uid, category in sorted(coordinator.stale_keys)
+        ],
+        "listener_health": [
+            {
+                "child_uid": child_uid,
+                "category": category,
+                "seconds_since_snapshot": (
+                    round(now - health.last_snapshot)
+                    if health.last_snapshot is not None
+                    else None
+                ),
+                "reconnects": health.reconnects,
+                "failures": health.failures,
+            }
+            for (child_uid, category), health in coordinator.listener_health.items()
+        ],
+        "session": {
+            "auth_method": data["auth_method"],
+            "auth_duration_ms": (
+                round(data["auth_duration"] * 1000)
+                if data["auth_duration"] is not None
+                else None
+            ),
+            "next_refresh": (
+                coordinator.session.next_refresh.isoformat()
+                if coordinator.session.next_refresh
+                else None
+            ),
+            "refresh_failures": coordinator.session.failures,
+        },
+        "pending_writes": [
+            {
+                "write_id": pending.write_id,
+                "child_uid": pending.child_uid,
+                "category": pending.category,
+                "committed": pending.committed,
+                "age_ms": round((now - pending.started) * 1000),
+            }
+            for pending in coordinator.pending_writes.values()
+        ],
+        "write_stats": coordinator.write_stats,
+        "write_queue": [
+            {
+                "write_id": queued.write_id,
+                "method": queued.method,
+                "child_uid": queued.child_uid,
+                "age_s": round(time.time() - queued.time),
+            }
+            for queued in coordinator.write_journal or ()
+        ],
+        "imports": list(data["importer"].progress.values()),
+        "calendar_cache": {
+            child_uid: cache.stats for child_uid, cache in data["event_caches"].items()
+        },
+        "executor": {
+            "running": coordinator.executor.running,
+            "queue_depth": coordinator.executor.queue_depth(),
+            "stats": coordinator.executor.stats,
+        },
+        "update_stats": {
+            **update_stats,
+            "suppression_rate": (
+                round(update_stats["suppressed"] / update_stats["received"], 3)
+                if update_stats["received"]
+                else 0.0
+            ),
+        },
+    }
@@ -11,6 +11,9 @@ from .const import DOMAIN
 class HuckleberryBaseEntity(CoordinatorEntity):
     """Base entity for Huckleberry."""
 
+    # Real-time categories of ChildRealtimeData this entity renders
+    _categories: tuple[str, ...] = ()
+
     def __init__(self, coordinator, child: dict[str, Any]) -> None:
         """Initialize the entity."""
         super().__init__(coordinator)
@@ -19,6 +22,16 @@ class HuckleberryBaseEntity(CoordinatorEntity):
         self.child_name = child["name"]
         self._attr_has_entity_name = True
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the real-time categories this entity reads."""
+        await super().async_added_to_hass()
+        for category in self._categories:
+            self.async_on_remove(
+                self.coordinator.async_add_category_listener(
+                    self.child_uid, category, self._handle_coordinator_update
+                )
+            )
+
     @property
     def device_info(self) -> dict[str, Any]:
         """Return device information."""
@@ -34,8 +47,17 @@ class HuckleberryBaseEntity(CoordinatorEntity):
 
     @property
     def available(self) -> bool:
-        """Return True if entity is available."""
-        return (
+        """Return True if entity is available.
+
+        During a background setup, entities stay unavailable until their
+        categories have data, cached or live.
+        """
+        if not (
             self.coordinator.last_update_success
             and self.child_uid in self.coordinator.data
-        )
+        ):
+            return False
+        if self.coordinator.initializing:
+            child_data = self.coordinator.data[self.child_uid]
+            return all(category in child_data for category in self._categories)
+        return True
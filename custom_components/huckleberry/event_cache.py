@@ -0,0 +1,309 @@
+"""Cache of fetched calendar events per child."""
+from __future__ import annotations
+
+import bisect
+import sys
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.calendar import CalendarEvent
+
+from .const import (
+    CALENDAR_CACHE_MAX_AGE,
+    CALENDAR_CACHE_MAX_BYTES,
+    CALENDAR_PREFETCH_MAX_BYTES,
+)
+
+# History collections shown in the calendar, in display order
+EVENT_CATEGORIES = ("sleep", "feed", "diaper", "health")
+
+# Rough memory of a CalendarEvent besides its strings
+_EVENT_OVERHEAD = 200
+
+
+def event_size(event: CalendarEvent) -> int:
+    """Return the approximate memory held by an event, in bytes."""
+    return (
+        _EVENT_OVERHEAD
+        + sys.getsizeof(event.summary)
+        + sys.getsizeof(event.description or "")
+    )
+
+
+@dataclass
+class CoveredRange:
+    """A fetched time range, half-open [start, end) in Unix seconds.
+
+    fetched and used are time.monotonic() seconds.
+    """
+
+    start: float
+    end: float
+    fetched: float
+    used: float
+    size: int = 0
+
+
+class EventCache:
+    """Calendar events of one child, with an index of the time ranges they cover.
+
+    Every range in the index was fetched for all categories at once, so
+    the events starting inside it are complete. Ranges never overlap.
+    Sessions completed later are added from the real-time documents.
+    Ranges expire after max_age, and the least recently used ones are
+    evicted once the events take more than max_bytes. Prefetched ranges
+    count as never used until they are read, so they are evicted first.
+    """
+
+    def __init__(
+        self,
+        max_age: float = CALENDAR_CACHE_MAX_AGE,
+        max_bytes: int = CALENDAR_CACHE_MAX_BYTES,
+        prefetch_bytes: int = CALENDAR_PREFETCH_MAX_BYTES,
+    ) -> None:
+        """Initialize the cache."""
+        self._max_age = max_age
+        self._max_bytes = max_bytes
+        self._prefetch_bytes = prefetch_bytes
+        # Covered ranges ordered by start, with their starts for bisection
+        self._ranges: list[CoveredRange] = []
+        self._range_starts: list[float] = []
+        # Events per category ordered by start, with their starts for bisection
+        self._events: dict[str, list[CalendarEvent]] = {
+            category: [] for category in EVENT_CATEGORIES
+        }
+        self._event_starts: dict[str, list[float]] = {
+            category: [] for category in EVENT_CATEGORIES
+        }
+        # Longest event per category, bounding how far back an event in progress starts
+        self._max_durations: dict[str, float] = dict.fromkeys(EVENT_CATEGORIES, 0.0)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Events added from the real-time documents instead of a fetch
+        self.appended = 0
+        self.prefetched = 0
+        # Durations of the fetches of every category
+        self.fetch_stats: dict[str, dict[str, float]] = {
+            category: {"fetches": 0, "last_ms": 0.0, "max_ms": 0.0}
+            for category in EVENT_CATEGORIES
+        }
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "ranges": len(self._ranges),
+            "events": sum(len(events) for events in self._events.values()),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "appended": self.appended,
+            "prefetched": self.prefetched,
+            "fetches": self.fetch_stats,
+        }
+
+    @property
+    def can_prefetch(self) -> bool:
+        """Return True if the cached events leave room for prefetched ranges."""
+        return self.bytes < self._prefetch_bytes
+
+    def record_fetch(self, category: str, duration_ms: float) -> None:
+        """Record the duration of a category fetch."""
+        stats = self.fetch_stats[category]
+        stats["fetches"] += 1
+        stats["last_ms"] = round(duration_ms, 1)
+        stats["max_ms"] = max(stats["max_ms"], stats["last_ms"])
+
+    def missing(self, start: float, end: float) -> list[tuple[float, float]]:
+        """Return the sub-ranges of [start, end) that are not cached, in order.
+
+        Counts a hit if nothing is missing and a miss otherwise.
+        """
+        if gaps := self.gaps(start, end):
+            self.misses += 1
+        else:
+            self.hits += 1
+        return gaps
+
+    def gaps(self, start: float, end: float) -> list[tuple[float, float]]:
+        """Return the sub-ranges of [start, end) that are not cached, without counting."""
+        self._evict_expired()
+        gaps: list[tuple[float, float]] = []
+        position = start
+        for covered in self._overlapping(start, end):
+            if covered.start > position:
+                gaps.append((position, covered.start))
+            position = max(position, covered.end)
+        if position < end:
+            gaps.append((position, end))
+        return gaps
+
+    def store(
+        self,
+        start: float,
+        end: float,
+        events: Mapping[str, list[CalendarEvent]],
+        prefetched: bool = False,
+        used: float | None = None,
+    ) -> None:
+        """Cache the events of every category fetched for [start, end).
+
+        Events starting outside [start, end) are dropped. Cached ranges
+        overlapping it, stored by a concurrent fetch, are replaced. A range
+        fetched again without being read is passed the used time it had.
+        """
+        for covered in self._overlapping(start, end):
+            self._remove(covered)
+        now = time.monotonic()
+        if used is None:
+            used = 0.0 if prefetched else now
+        covered = CoveredRange(start, end, now, used)
+        if prefetched:
+            self.prefetched += 1
+        for category in EVENT_CATEGORIES:
+            for event in events.get(category, ()):
+                timestamp = event.start.timestamp()
+                if start <= timestamp < end:
+                    self._insert(category, timestamp, event)
+                    covered.size += event_size(event)
+        index = bisect.bisect(self._range_starts, start)
+        self._ranges.insert(index, covered)
+        self._range_starts.insert(index, start)
+        self.bytes += covered.size
+        self._evict_oversize(keep=covered)
+
+    def add(self, category: str, event: CalendarEvent) -> bool:
+        """Add an event that completed after its range was fetched.
+
+        An event with the same start is already cached, from a fetch with
+        more details than the real-time documents carry, and is kept; edits
+        are picked up by fetching the range again. Events outside every
+        cached range are left for the fetch of their range. Returns True if
+        the cache changed.
+        """
+        timestamp = event.start.timestamp()
+        index = bisect.bisect_right(self._range_starts, timestamp) - 1
+        if index < 0 or timestamp >= (covered := self._ranges[index]).end:
+            return False
+        starts = self._event_starts[category]
+        position = bisect.bisect_left(starts, timestamp)
+        if position < len(starts) and starts[position] == timestamp:
+            return False
+        self._insert(category, timestamp, event)
+        covered.size += event_size(event)
+        self.bytes += event_size(event)
+        self.appended += 1
+        self._evict_oversize(keep=covered)
+        return True
+
+    def recent(
+        self, since: float, window: tuple[float, float] | None = None
+    ) -> list[CoveredRange]:
+        """Return the cached ranges to fetch again, in order.
+
+        These end after since and were read within max_age, or overlap window.
+        """
+        now = time.monotonic()
+        kept = self._overlapping(*window) if window else []
+        return [
+            covered
+            for covered in self._ranges
+            if covered in kept or (covered.end > since and now - covered.used < self._max_age)
+        ]
+
+    def events(self, start: float, end: float) -> dict[str, list[CalendarEvent]]:
+        """Return the cached events per category starting in [start, end), each in order."""
+        now = time.monotonic()
+        for covered in self._overlapping(start, end):
+            covered.used = now
+        result: dict[str, list[CalendarEvent]] = {}
+        for category in EVENT_CATEGORIES:
+            starts = self._event_starts[category]
+            result[category] = self._events[category][
+                bisect.bisect_left(starts, start) : bisect.bisect_left(starts, end)
+            ]
+        return result
+
+    def current_or_next(self, now: float) -> CalendarEvent | None:
+        """Return the earliest cached event in progress at now, else the next to start.
+
+        Only the events starting within the longest duration of their
+        category before now can be in progress, so a lookup takes
+        O(log n + k) for the k events in that window. Expired ranges are
+        dropped first.
+        """
+        self._evict_expired()
+        current: CalendarEvent | None = None
+        upcoming: CalendarEvent | None = None
+        for category in EVENT_CATEGORIES:
+            starts = self._event_starts[category]
+            events = self._events[category]
+            first = bisect.bisect_left(starts, now - self._max_durations[category])
+            last = bisect.bisect_right(starts, now)
+            for index in range(first, last):
+                event = events[index]
+                if event.end.timestamp() > now:
+                    if current is None or event.start < current.start:
+                        current = event
+                    break
+            if last < len(events) and (upcoming is None or events[last].start < upcoming.start):
+                upcoming = events[last]
+        return current or upcoming
+
+    def clear(self) -> None:
+        """Drop every cached range."""
+        for covered in list(self._ranges):
+            self._remove(covered)
+
+    def _overlapping(self, start: float, end: float) -> list[CoveredRange]:
+        """Return the covered ranges overlapping [start, end), in order."""
+        # The range before the first one starting at or after start may reach into it
+        first = max(bisect.bisect_right(self._range_starts, start) - 1, 0)
+        last = bisect.bisect_left(self._range_starts, end)
+        return [covered for covered in self._ranges[first:last] if covered.end > start]
+
+    def _insert(self, category: str, timestamp: float, event: CalendarEvent) -> None:
+        """Insert an event, keeping the category in order."""
+        index = bisect.bisect(self._event_starts[category], timestamp)
+        self._max_durations[category] = max(
+            self._max_durations[category], event.end.timestamp() - timestamp
+        )
+        self._event_starts[category].insert(index, timestamp)
+        self._events[category].insert(index, event)
+
+    def _remove(self, covered: CoveredRange) -> None:
+        """Drop a covered range and its events."""
+        index = self._ranges.index(covered)
+        del self._ranges[index]
+        del self._range_starts[index]
+        for category in EVENT_CATEGORIES:
+            starts = self._event_starts[category]
+            first = bisect.bisect_left(starts, covered.start)
+            last = bisect.bisect_left(starts, covered.end)
+            del starts[first:last]
+            del self._events[category][first:last]
+        self.bytes -= covered.size
+
+    def _evict_expired(self) -> None:
+        """Drop the ranges older than max_age."""
+        now = time.monotonic()
+        for covered in list(self._ranges):
+            if now - covered.fetched >= self._max_age:
+                self._remove(covered)
+                self.evictions += 1
+
+    def _evict_oversize(self, keep: CoveredRange) -> None:
+        """Drop the least recently used ranges until the events fit in max_bytes."""
+        for covered in sorted(self._ranges, key=lambda covered: covered.used):
+            if self.bytes <= self._max_bytes:
+                return
+            if covered is not keep:
+                self._remove(covered)
+                self.evictions += 1
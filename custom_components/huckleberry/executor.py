@@ -0,0 +1,139 @@
+"""Dedicated executor for blocking Huckleberry calls."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from functools import partial
+from typing import Any, TypeVar
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import DOMAIN, EXECUTOR_MAX_WORKERS
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class JobPriority(IntEnum):
+    """Priority of a blocking job, lower runs first."""
+
+    # Timer and log writes the user is waiting for
+    WRITE = 0
+    # Authentication, token refresh and listener maintenance
+    SESSION = 1
+    # Calendar history reads
+    HISTORY = 2
+    # Speculative calendar reads of ranges next to the viewed one
+    PREFETCH = 3
+
+
+class PriorityExecutor:
+    """Bounded thread pool running blocking calls in priority order.
+
+    Jobs wait in a priority queue until a worker is free. A priority may only
+    occupy the workers left after reserving one for each higher priority, so
+    a burst of history reads never takes the last worker from a write.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_workers: int = EXECUTOR_MAX_WORKERS) -> None:
+        """Initialize the executor."""
+        self._hass = hass
+        self._max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix=DOMAIN)
+        self._queue: list[tuple[int, int, float, asyncio.Future, Callable[..., Any], tuple]] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._closed = False
+        self.stats: dict[str, dict[str, float]] = {
+            priority.name.lower(): {"completed": 0, "peak_queued": 0, "max_wait_ms": 0.0}
+            for priority in JobPriority
+        }
+        self._unsub_stop: CALLBACK_TYPE | None = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+        )
+
+    @property
+    def running(self) -> int:
+        """Return the number of jobs running on a worker."""
+        return self._running
+
+    def queue_depth(self) -> dict[str, int]:
+        """Return the number of jobs waiting for a worker, per priority."""
+        depth = {priority.name.lower(): 0 for priority in JobPriority}
+        for priority, *_ in self._queue:
+            depth[JobPriority(priority).name.lower()] += 1
+        return depth
+
+    async def async_run(
+        self, priority: JobPriority, target: Callable[..., _T], *args: Any
+    ) -> _T:
+        """Run target(*args) on a worker and return its result."""
+        if self._closed:
+            raise RuntimeError("Huckleberry executor is shut down")
+        future: asyncio.Future[_T] = self._hass.loop.create_future()
+        heapq.heappush(
+            self._queue,
+            (priority, next(self._sequence), time.monotonic(), future, target, args),
+        )
+        stats = self.stats[priority.name.lower()]
+        stats["peak_queued"] = max(stats["peak_queued"], self.queue_depth()[priority.name.lower()])
+        self._async_dispatch()
+        return await future
+
+    @callback
+    def _async_dispatch(self) -> None:
+        """Start queued jobs while their priority has a worker available."""
+        while self._queue and self._running < max(1, self._max_workers - self._queue[0][0]):
+            priority, _, queued_at, future, target, args = heapq.heappop(self._queue)
+            if future.done():
+                # The caller gave up while the job was queued
+                continue
+            stats = self.stats[JobPriority(priority).name.lower()]
+            stats["max_wait_ms"] = max(
+                stats["max_wait_ms"], round((time.monotonic() - queued_at) * 1000, 1)
+            )
+            self._running += 1
+            job = self._hass.loop.run_in_executor(self._pool, target, *args)
+            job.add_done_callback(partial(self._async_job_done, stats, future))
+
+    @callback
+    def _async_job_done(
+        self, stats: dict[str, float], future: asyncio.Future, job: asyncio.Future
+    ) -> None:
+        """Hand a finished job's outcome to its caller and start the next job."""
+        self._running -= 1
+        stats["completed"] += 1
+        if not future.done():
+            if job.cancelled():
+                future.cancel()
+            elif (err := job.exception()) is not None:
+                future.set_exception(err)
+            else:
+                future.set_result(job.result())
+        self._async_dispatch()
+
+    async def _async_on_stop(self, _event: Event) -> None:
+        """Shut down with Home Assistant."""
+        self._unsub_stop = None
+        await self.async_shutdown()
+
+    async def async_shutdown(self) -> None:
+        """Cancel queued jobs and wait for the workers to exit."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        while self._queue:
+            heapq.heappop(self._queue)[3].cancel()
+        _LOGGER.debug("Shutting down Huckleberry executor")
+        await self._hass.async_add_executor_job(self._pool.shutdown)
@@ -0,0 +1,808 @@
+"""Async Firestore REST client for Huckleberry writes.
+
+The write methods of HuckleberryAPI block on the google-cloud-firestore
+client and have to run in the executor. This module performs the same
+document writes over the Firestore REST API on Home Assistant's shared
+aiohttp session instead.
+
+Planning and committing are separate: a planner turns an operation, the
+current document and the time of the operation into a list of Write, which
+FirestoreWriter commits in a single atomic request.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from huckleberry_api import HuckleberryAPI
+from huckleberry_api.const import FIRESTORE_BASE_URL
+
+from .const import SESSION_TOKEN_MIN_VALIDITY
+from .executor import JobPriority, PriorityExecutor
+from .session import refresh_session
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+# Marks a field an update removes from the document
+DELETE_FIELD: Any = object()
+
+_SIMPLE_FIELD = re.compile(r"^[A-Za-z_][A-Za-z_0-9]*$")
+
+
+@dataclass(frozen=True)
+class Write:
+    """One document write of a commit.
+
+    mode "set" replaces the document with data, "merge" only sets the leaf
+    fields of data and "update" sets the (dotted) field paths of data on an
+    existing document.
+    """
+
+    path: str
+    data: dict[str, Any]
+    mode: Literal["set", "merge", "update"]
+
+
+def encode_value(value: Any) -> dict[str, Any]:
+    """Return value as a Firestore REST Value."""
+    if value is None:
+        return {"nullValue": None}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"integerValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    if isinstance(value, dict):
+        return {"mapValue": {"fields": encode_fields(value)}}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [encode_value(item) for item in value]}}
+    raise TypeError(f"Cannot encode {type(value).__name__} for Firestore")
+
+
+def encode_fields(data: dict[str, Any]) -> dict[str, Any]:
+    """Return a mapping as Firestore REST fields."""
+    return {key: encode_value(value) for key, value in data.items()}
+
+
+def decode_value(value: dict[str, Any]) -> Any:
+    """Return the Python value of a Firestore REST Value."""
+    kind, raw = next(iter(value.items()))
+    if kind == "integerValue":
+        return int(raw)
+    if kind == "doubleValue":
+        return float(raw)
+    if kind == "mapValue":
+        return decode_fields(raw.get("fields", {}))
+    if kind == "arrayValue":
+        return [decode_value(item) for item in raw.get("values", [])]
+    # nullValue, booleanValue, stringValue, timestampValue, referenceValue, ...
+    return raw
+
+
+def decode_fields(fields: dict[str, Any]) -> dict[str, Any]:
+    """Return Firestore REST fields as a mapping."""
+    return {key: decode_value(value) for key, value in fields.items()}
+
+
+def field_path(*segments: str) -> str:
+    """Return a field path, quoting segments that are not plain identifiers."""
+    return ".".join(
+        segment if _SIMPLE_FIELD.match(segment) else "`{}`".format(
+            segment.replace("\\", "\\\\").replace("`", "\\`")
+        )
+        for segment in segments
+    )
+
+
+def _leaf_paths(data: dict[str, Any], parents: tuple[str, ...] = ()) -> list[str]:
+    """Return the field paths of the leaves of nested data."""
+    paths: list[str] = []
+    for key, value in data.items():
+        if isinstance(value, dict) and value:
+            paths.extend(_leaf_paths(value, (*parents, key)))
+        else:
+            paths.append(field_path(*parents, key))
+    return paths
+
+
+def _nest(updates: dict[str, Any]) -> dict[str, Any]:
+    """Return dotted updates as nested data, leaving out deleted fields."""
+    nested: dict[str, Any] = {}
+    for path, value in updates.items():
+        if value is DELETE_FIELD:
+            continue
+        *parents, leaf = path.split(".")
+        target = nested
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return nested
+
+
+def offset_minutes(now: float) -> float:
+    """Return the Huckleberry timezone offset at now, negative east of UTC."""
+    offset = dt_util.as_local(dt_util.utc_from_timestamp(now)).utcoffset()
+    return -offset.total_seconds() / 60 if offset else 0.0
+
+
+def _session_uuid(timer: dict[str, Any]) -> str:
+    """Return the session UUID of a timer, or a new one."""
+    return timer.get("uuid") or uuid.uuid4().hex[:16]
+
+
+def _interval_id(now: float) -> str:
+    """Return a new interval document ID (timestamp in ms plus random suffix)."""
+    return f"{int(now * 1000)}-{uuid.uuid4().hex[:20]}"
+
+
+# Interval documents, as the app stores them
+
+
+def sleep_interval(
+    interval_id: str,
+    start: int,
+    duration: int,
+    offset: float,
+    details: dict[str, Any],
+    now: float,
+) -> dict[str, Any]:
+    """Return a sleep interval document."""
+    return {
+        "_id": interval_id,
+        "start": start,
+        "duration": duration,
+        "offset": offset,
+        "end_offset": offset,
+        "details": details,
+        "lastUpdated": now,
+    }
+
+
+def feed_interval(
+    start: float,
+    left_duration: float,
+    right_duration: float,
+    last_side: str,
+    offset: float,
+    now: float,
+) -> dict[str, Any]:
+    """Return a breast feeding interval document."""
+    return {
+        "mode": "breast",
+        "start": start,
+        "lastSide": last_side,
+        "lastUpdated": now,
+        "leftDuration": left_duration,
+        "rightDuration": right_duration,
+        "offset": offset,
+        "end_offset": offset,
+    }
+
+
+def diaper_interval(
+    start: float,
+    mode: str,
+    pee_amount: str | None = None,
+    poo_amount: str | None = None,
+    color: str | None = None,
+    consistency: str | None = None,
+    diaper_rash: bool = False,
+    notes: str | None = None,
+) -> dict[str, Any]:
+    """Return a diaper interval document."""
+    interval: dict[str, Any] = {
+        "start": start,
+        "lastUpdated": start,
+        "mode": mode,
+        "offset": offset_minutes(start),
+    }
+    # The app stores amounts as 0 (little), 50 (medium) and 100 (big)
+    amount_map = {"little": 0.0, "medium": 50.0, "big": 100.0}
+    quantity = {}
+    if pee_amount in amount_map:
+        quantity["pee"] = amount_map[pee_amount]
+    if poo_amount in amount_map:
+        quantity["poo"] = amount_map[poo_amount]
+    if quantity:
+        interval["quantity"] = quantity
+    if color:
+        interval["color"] = color
+    if consistency:
+        interval["consistency"] = consistency
+    if diaper_rash:
+        interval["diaperRash"] = True
+    if notes:
+        interval["notes"] = notes
+    return interval
+
+
+def growth_entry(
+    entry_id: str,
+    start: float,
+    weight: float | None = None,
+    height: float | None = None,
+    head: float | None = None,
+    units: str = "metric",
+) -> dict[str, Any]:
+    """Return a growth entry of the health data collection."""
+    if not any([weight, height, head]):
+        raise ValueError("At least one measurement (weight, height, or head) is required")
+
+    entry: dict[str, Any] = {
+        "_id": entry_id,
+        "type": "health",
+        "mode": "growth",
+        "start": start,
+        "lastUpdated": start,
+        "offset": offset_minutes(start),
+        "isNight": False,
+        "multientry_key": None,
+    }
+    unit_names = (
+        ("kg", "cm", "hcm") if units == "metric" else ("lbs", "in", "hin")
+    )
+    for name, value, unit in zip(("weight", "height", "head"), (weight, height, head), unit_names):
+        if value is not None:
+            entry[name] = float(value)
+            entry[f"{name}Units"] = unit
+    return entry
+
+
+# Planners mirror the write methods of HuckleberryAPI. Each one gets the
+# child uid, the current document of the operation's collection (None if it
+# does not exist or is not needed) and the time of the operation.
+
+
+def plan_start_sleep(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.start_sleep."""
+    no = False
+    return [
+        Write(
+            f"sleep/{child_uid}",
+            {
+                "timer": {
+                    "active": True,
+                    "paused": False,
+                    "timestamp": {"seconds": now},
+                    "local_timestamp": now,
+                    "timerStartTime": now * 1000,
+                    "uuid": uuid.uuid4().hex[:16],
+                    "details": {
+                        "startSleepCondition": {
+                            "happy": no,
+                            "longTimeToFallAsleep": no,
+                            "10-20_minutes": no,
+                            "upset": no,
+                            "under_10_minutes": no,
+                        },
+                        "sleepLocations": {
+                            "car": no,
+                            "nursing": no,
+                            "wornOrHeld": no,
+                            "stroller": no,
+                            "coSleep": no,
+                            "nextToCarer": no,
+                            "onOwnInBed": no,
+                            "bottle": no,
+                            "swing": no,
+                        },
+                        "endSleepCondition": {
+                            "happy": no,
+                            "wokeUpChild": no,
+                            "upset": no,
+                        },
+                    },
+                }
+            },
+            "merge",
+        )
+    ]
+
+
+def plan_pause_sleep(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.pause_sleep."""
+    timer = (document or {}).get("timer", {})
+    if document is None or not timer.get("active", False) or timer.get("paused", False):
+        return []
+    return [
+        Write(
+            f"sleep/{child_uid}",
+            {
+                "timer.paused": True,
+                "timer.active": True,
+                "timer.timerEndTime": now * 1000,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+            },
+            "update",
+        )
+    ]
+
+
+def plan_resume_sleep(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.resume_sleep."""
+    timer = (document or {}).get("timer", {})
+    if document is None or not timer.get("active", False) or not timer.get("paused", False):
+        return []
+    return [
+        Write(
+            f"sleep/{child_uid}",
+            {
+                "timer.paused": False,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+            },
+            "update",
+        )
+    ]
+
+
+def _inactive_sleep_timer(timer: dict[str, Any], now: float) -> dict[str, Any]:
+    """Return the timer of a sleep that is no longer tracked."""
+    return {
+        "active": False,
+        "paused": False,
+        "timestamp": {"seconds": now},
+        "timerStartTime": None,
+        "uuid": _session_uuid(timer),
+        "local_timestamp": now,
+    }
+
+
+def plan_cancel_sleep(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.cancel_sleep."""
+    timer = (document or {}).get("timer") or {}
+    return [
+        Write(f"sleep/{child_uid}", {"timer": _inactive_sleep_timer(timer, now)}, "update")
+    ]
+
+
+def plan_complete_sleep(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.complete_sleep."""
+    if document is None:
+        return []
+    timer = document.get("timer") or {}
+    if not timer.get("active", False):
+        return []
+
+    timer_start_ms = timer.get("timerStartTime")
+    if not timer_start_ms:
+        if ts_seconds := (timer.get("timestamp") or {}).get("seconds"):
+            timer_start_ms = int(float(ts_seconds) * 1000)
+        else:
+            return [Write(f"sleep/{child_uid}", {"timer": DELETE_FIELD}, "update")]
+
+    if timer.get("paused", False) and "timerEndTime" in timer:
+        end_ms = timer["timerEndTime"]
+    else:
+        end_ms = now * 1000
+    duration_sec = int((end_ms - float(timer_start_ms)) / 1000)
+    start_sec = int(float(timer_start_ms) / 1000)
+    offset = offset_minutes(now)
+    interval_id = uuid.uuid4().hex[:16]
+
+    return [
+        Write(
+            f"sleep/{child_uid}/intervals/{interval_id}",
+            sleep_interval(interval_id, start_sec, duration_sec, offset, timer.get("details", {}), now),
+            "set",
+        ),
+        Write(
+            f"sleep/{child_uid}",
+            {
+                "timer": _inactive_sleep_timer(timer, now),
+                "prefs.lastSleep": {"start": start_sec, "duration": duration_sec, "offset": offset},
+                "prefs.timestamp": {"seconds": now},
+                "prefs.local_timestamp": now,
+            },
+            "update",
+        ),
+    ]
+
+
+def plan_start_feeding(
+    child_uid: str, document: dict | None, now: float, side: str = "left"
+) -> list[Write]:
+    """Plan HuckleberryAPI.start_feeding."""
+    return [
+        Write(
+            f"feed/{child_uid}",
+            {
+                "timer": {
+                    "active": True,
+                    "paused": False,
+                    "timestamp": {"seconds": now},
+                    "local_timestamp": now,
+                    "feedStartTime": now,
+                    "timerStartTime": now,
+                    "uuid": uuid.uuid4().hex[:16],
+                    "leftDuration": 0.0,
+                    "rightDuration": 0.0,
+                    "lastSide": "left",
+                    "activeSide": side,
+                }
+            },
+            "merge",
+        )
+    ]
+
+
+def _accumulated_durations(timer: dict[str, Any], now: float) -> tuple[float, float]:
+    """Return the side durations including the running stretch of the active side."""
+    left_duration = timer.get("leftDuration", 0.0)
+    right_duration = timer.get("rightDuration", 0.0)
+    if not timer.get("paused", False):
+        elapsed = now - timer.get("timerStartTime", now)
+        if timer.get("activeSide", timer.get("lastSide", "left")) == "left":
+            left_duration += elapsed
+        else:
+            right_duration += elapsed
+    return left_duration, right_duration
+
+
+def plan_pause_feeding(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.pause_feeding."""
+    timer = (document or {}).get("timer", {})
+    if not document or not timer.get("active", False) or timer.get("paused", False):
+        return []
+    left_duration, right_duration = _accumulated_durations(timer, now)
+    return [
+        Write(
+            f"feed/{child_uid}",
+            {
+                "timer.paused": True,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.leftDuration": left_duration,
+                "timer.rightDuration": right_duration,
+                "timer.lastSide": timer.get("activeSide", timer.get("lastSide", "left")),
+                "timer.activeSide": DELETE_FIELD,
+            },
+            "update",
+        )
+    ]
+
+
+def plan_resume_feeding(
+    child_uid: str, document: dict | None, now: float, side: str | None = None
+) -> list[Write]:
+    """Plan HuckleberryAPI.resume_feeding."""
+    timer = (document or {}).get("timer", {})
+    if not document or not timer.get("active", False) or not timer.get("paused", False):
+        return []
+    return [
+        Write(
+            f"feed/{child_uid}",
+            {
+                "timer.paused": False,
+                "timer.active": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.timerStartTime": now,
+                "timer.activeSide": side or timer.get("lastSide", "left"),
+                "timer.lastSide": "none",
+            },
+            "update",
+        )
+    ]
+
+
+def plan_switch_feeding_side(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.switch_feeding_side."""
+    timer = (document or {}).get("timer", {})
+    if not document or not timer.get("active", False):
+        return []
+    current_side = timer.get("activeSide", timer.get("lastSide", "left"))
+    left_duration, right_duration = _accumulated_durations(timer, now)
+    return [
+        Write(
+            f"feed/{child_uid}",
+            {
+                "timer.paused": False,
+                "timer.lastSide": "none",
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.timerStartTime": now,
+                "timer.activeSide": "right" if current_side == "left" else "left",
+                "timer.leftDuration": left_duration,
+                "timer.rightDuration": right_duration,
+            },
+            "update",
+        )
+    ]
+
+
+def plan_cancel_feeding(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.cancel_feeding."""
+    timer = (document or {}).get("timer") or {}
+    return [
+        Write(
+            f"feed/{child_uid}",
+            {
+                "timer": {
+                    "active": False,
+                    "paused": False,
+                    "timestamp": {"seconds": now},
+                    "timerStartTime": None,
+                    "uuid": _session_uuid(timer),
+                    "local_timestamp": now,
+                    "leftDuration": 0.0,
+                    "rightDuration": 0.0,
+                    "lastSide": "left",
+                }
+            },
+            "update",
+        )
+    ]
+
+
+def plan_complete_feeding(child_uid: str, document: dict | None, now: float) -> list[Write]:
+    """Plan HuckleberryAPI.complete_feeding."""
+    if document is None:
+        return []
+    timer = document.get("timer") or {}
+    if not timer.get("active", False) or not timer.get("timerStartTime"):
+        return []
+
+    left_duration, right_duration = _accumulated_durations(timer, now)
+    feed_start_time = timer.get("feedStartTime", float(timer["timerStartTime"]))
+    last_side = timer.get("activeSide", timer.get("lastSide", "right"))
+    if last_side == "none":
+        last_side = "right" if right_duration >= left_duration else "left"
+    offset = offset_minutes(now)
+
+    return [
+        Write(
+            f"feed/{child_uid}/intervals/{_interval_id(now)}",
+            feed_interval(feed_start_time, left_duration, right_duration, last_side, offset, now),
+            "set",
+        ),
+        Write(
+            f"feed/{child_uid}",
+            {
+                "timer.active": False,
+                "timer.paused": True,
+                "timer.timestamp": {"seconds": now},
+                "timer.local_timestamp": now,
+                "timer.lastSide": last_side,
+                "timer.leftDuration": DELETE_FIELD,
+                "timer.rightDuration": DELETE_FIELD,
+                "timer.activeSide": DELETE_FIELD,
+                "prefs.lastNursing": {
+                    "mode": "breast",
+                    "start": feed_start_time,
+                    "duration": left_duration + right_duration,
+                    "leftDuration": left_duration,
+                    "rightDuration": right_duration,
+                    "offset": offset,
+                },
+                "prefs.lastSide": {"start": feed_start_time, "lastSide": last_side},
+                "prefs.timestamp": {"seconds": now},
+                "prefs.local_timestamp": now,
+            },
+            "update",
+        ),
+    ]
+
+
+def plan_log_diaper(
+    child_uid: str,
+    document: dict | None,
+    now: float,
+    mode: str,
+    pee_amount: str | None = None,
+    poo_amount: str | None = None,
+    color: str | None = None,
+    consistency: str | None = None,
+    diaper_rash: bool = False,
+    notes: str | None = None,
+) -> list[Write]:
+    """Plan HuckleberryAPI.log_diaper."""
+    interval = diaper_interval(
+        now, mode, pee_amount, poo_amount, color, consistency, diaper_rash, notes
+    )
+    return [
+        Write(f"diaper/{child_uid}/intervals/{_interval_id(now)}", interval, "set"),
+        Write(
+            f"diaper/{child_uid}",
+            {
+                "prefs.lastDiaper": {"start": now, "mode": mode, "offset": interval["offset"]},
+                "prefs.timestamp": {"seconds": now},
+                "prefs.local_timestamp": now,
+            },
+            "update",
+        ),
+    ]
+
+
+def plan_log_growth(
+    child_uid: str,
+    document: dict | None,
+    now: float,
+    weight: float | None = None,
+    height: float | None = None,
+    head: float | None = None,
+    units: str = "metric",
+) -> list[Write]:
+    """Plan HuckleberryAPI.log_growth."""
+    interval_id = _interval_id(now)
+    entry = growth_entry(interval_id, now, weight, height, head, units)
+    return [
+        Write(f"health/{child_uid}/data/{interval_id}", entry, "set"),
+        Write(
+            f"health/{child_uid}",
+            {
+                "prefs.lastGrowthEntry": entry,
+                "prefs.timestamp": {"seconds": now},
+                "prefs.local_timestamp": now,
+            },
+            "update",
+        ),
+    ]
+
+
+# Planner and the collection whose current document it needs, per method
+PLANNERS: dict[str, tuple[Callable[..., list[Write]], str | None]] = {
+    "start_sleep": (plan_start_sleep, None),
+    "pause_sleep": (plan_pause_sleep, "sleep"),
+    "resume_sleep": (plan_resume_sleep, "sleep"),
+    "cancel_sleep": (plan_cancel_sleep, "sleep"),
+    "complete_sleep": (plan_complete_sleep, "sleep"),
+    "start_feeding": (plan_start_feeding, None),
+    "pause_feeding": (plan_pause_feeding, "feed"),
+    "resume_feeding": (plan_resume_feeding, "feed"),
+    "switch_feeding_side": (plan_switch_feeding_side, "feed"),
+    "cancel_feeding": (plan_cancel_feeding, "feed"),
+    "complete_feeding": (plan_complete_feeding, "feed"),
+    "log_diaper": (plan_log_diaper, None),
+    "log_growth": (plan_log_growth, None),
+}
+
+
+class FirestoreWriter:
+    """Perform HuckleberryAPI writes over the Firestore REST API.
+
+    Requests share Home Assistant's aiohttp session, so connections are
+    kept alive between writes. Like HuckleberryAPI, the writer refreshes
+    the ID token when it is missing or about to expire, and once more when
+    a request is rejected as unauthorized; only the refresh uses a thread.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: HuckleberryAPI,
+        base_url: str | None = None,
+        executor: PriorityExecutor | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        base_url is the documents URL of the Firestore database, it defaults
+        to the one of Huckleberry. Token refreshes run on executor, or on
+        Home Assistant's executor if there is none.
+        """
+        self._hass = hass
+        self._api = api
+        self._executor = executor
+        # Concurrent writes wait for a single refresh
+        self._refresh_lock = asyncio.Lock()
+        self._session = async_get_clientsession(hass)
+        self._base_url = base_url or FIRESTORE_BASE_URL
+        # Resource name prefix of documents, as used in request bodies
+        self._database_path = self._base_url.split("/v1/", 1)[1]
+
+    async def async_call(
+        self, method: str, child_uid: str, *args: Any, now: float | None = None
+    ) -> list[Write]:
+        """Perform a HuckleberryAPI write method, returning the committed writes.
+
+        now is the time of the operation and defaults to the current time.
+        """
+        planner, collection = PLANNERS[method]
+        document = (
+            await self.async_get(f"{collection}/{child_uid}") if collection else None
+        )
+        writes = planner(child_uid, document, time.time() if now is None else now, *args)
+        if writes:
+            await self.async_commit(writes)
+        return writes
+
+    async def async_get(self, path: str) -> dict[str, Any] | None:
+        """Return the data of a document, or None if it does not exist."""
+        document = await self._async_request(
+            "GET", f"{self._base_url}/{path}", missing_ok=True
+        )
+        if document is None:
+            return None
+        return decode_fields(document.get("fields", {}))
+
+    async def async_commit(self, writes: list[Write]) -> None:
+        """Commit writes atomically in a single request."""
+        await self._async_request(
+            "POST",
+            f"{self._base_url}:commit",
+            json={"writes": [self._encode_write(write) for write in writes]},
+        )
+
+    async def _async_request(
+        self, method: str, url: str, missing_ok: bool = False, **kwargs: Any
+    ) -> Any:
+        """Send an authorized request and return its JSON body.
+
+        Returns None for a missing document if missing_ok. A request
+        rejected as unauthorized is sent again once after a token refresh.
+        """
+        token = await self._async_token()
+        for attempt in range(2):
+            async with self._session.request(
+                method,
+                url,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=REQUEST_TIMEOUT,
+                **kwargs,
+            ) as response:
+                if response.status == 401 and attempt == 0:
+                    token = await self._async_token(rejected=token)
+                    continue
+                if response.status == 404 and missing_ok:
+                    return None
+                response.raise_for_status()
+                return await response.json()
+        return None
+
+    async def _async_token(self, rejected: str | None = None) -> str:
+        """Return a usable ID token, refreshing it if needed.
+
+        The token is refreshed when it is missing, expires within
+        SESSION_TOKEN_MIN_VALIDITY seconds or is the rejected one.
+        """
+        async with self._refresh_lock:
+            api = self._api
+            expires_at = api.token_expires_at
+            if (
+                api.id_token
+                and api.id_token != rejected
+                and not (
+                    isinstance(expires_at, (int, float))
+                    and expires_at - time.time() < SESSION_TOKEN_MIN_VALIDITY
+                )
+            ):
+                return api.id_token
+            if self._executor is not None:
+                await self._executor.async_run(JobPriority.SESSION, refresh_session, api)
+            else:
+                await self._hass.async_add_executor_job(refresh_session, api)
+            return api.id_token
+
+    def _encode_write(self, write: Write) -> dict[str, Any]:
+        """Return write as a Firestore REST Write."""
+        name = f"{self._database_path}/{write.path}"
+        if write.mode == "set":
+            return {"update": {"name": name, "fields": encode_fields(write.data)}}
+        if write.mode == "merge":
+            return {
+                "update": {"name": name, "fields": encode_fields(write.data)},
+                "updateMask": {"fieldPaths": _leaf_paths(write.data)},
+            }
+        return {
+            "update": {"name": name, "fields": encode_fields(_nest(write.data))},
+            "updateMask": {
+                "fieldPaths": [field_path(*path.split(".")) for path in write.data]
+            },
+            "currentDocument": {"exists": True},
+        }
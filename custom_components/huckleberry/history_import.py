@@ -0,0 +1,387 @@
+"""Bulk import of historical Huckleberry entries."""
+from __future__ import annotations
+
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+from collections import deque
+from collections.abc import Collection, Iterator, Mapping
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .batch import commit_writes
+from .const import DOMAIN, IMPORT_CHUNK_INTERVAL, IMPORT_MAX_ERRORS
+from .executor import JobPriority
+from .firestore import (
+    Write,
+    diaper_interval,
+    feed_interval,
+    growth_entry,
+    offset_minutes,
+    sleep_interval,
+)
+
+if TYPE_CHECKING:
+    from . import HuckleberryDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Fired after every committed chunk and when an import ends
+EVENT_IMPORT_PROGRESS = f"{DOMAIN}_import_progress"
+
+RECORD_TYPES = ("sleep", "feed", "diaper", "growth")
+
+GROWTH_UNITS = vol.In(["metric", "imperial"])
+
+
+@dataclass(frozen=True)
+class HistoryRecord:
+    """One validated entry of an import file."""
+
+    kind: str
+    child_uid: str
+    start: float
+    data: Mapping[str, Any]
+
+
+def parse_time(value: Any) -> float:
+    """Return a Unix timestamp from epoch seconds or an ISO 8601 string.
+
+    Times without a timezone are taken as Home Assistant's local time.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    if (parsed := dt_util.parse_datetime(text)) is None:
+        raise ValueError(f"invalid time {text!r}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return parsed.timestamp()
+
+
+def _number(data: Mapping[str, Any], key: str) -> float | None:
+    """Return a numeric field, None if it is missing or empty."""
+    value = data.get(key)
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _text(data: Mapping[str, Any], key: str) -> str | None:
+    """Return a text field, None if it is missing or empty."""
+    value = data.get(key)
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def parse_record(
+    raw: Mapping[str, Any] | str, default_child_uid: str, child_uids: Collection[str]
+) -> HistoryRecord:
+    """Return the record of a CSV row or JSONL line, raising ValueError if it is invalid.
+
+    The child must be one of child_uids, the children of the account.
+    """
+    data: Any = json.loads(raw) if isinstance(raw, str) else raw
+    if not isinstance(data, Mapping):
+        raise ValueError("record is not an object")
+    kind = _text(data, "type")
+    if kind not in RECORD_TYPES:
+        raise ValueError(f"unknown type {kind!r}")
+    if (start := data.get("start")) in (None, ""):
+        raise ValueError("missing start")
+    if (child_uid := _text(data, "child_uid") or default_child_uid) not in child_uids:
+        raise ValueError(f"unknown child {child_uid!r}")
+    return HistoryRecord(kind, child_uid, parse_time(start), data)
+
+
+def _record_id(record: HistoryRecord) -> str:
+    """Return a digest identifying the record, so a re-import overwrites it."""
+    return hashlib.sha1(
+        f"{record.child_uid}:{record.kind}:{record.start}".encode()
+    ).hexdigest()
+
+
+def record_write(record: HistoryRecord) -> Write:
+    """Return the write storing a record as an interval of its collection.
+
+    Document IDs derive from the record, which makes imports idempotent.
+    Historical entries do not touch the prefs of the child documents, so
+    the latest entries shown by the app are left alone.
+    """
+    data = record.data
+    digest = _record_id(record)
+    interval_id = f"{int(record.start * 1000)}-{digest[:20]}"
+    offset = offset_minutes(record.start)
+
+    if record.kind == "sleep":
+        if (duration := _number(data, "duration")) is None:
+            if (end := data.get("end")) in (None, ""):
+                raise ValueError("sleep needs an end or a duration")
+            duration = parse_time(end) - record.start
+        if duration <= 0:
+            raise ValueError("sleep duration must be positive")
+        return Write(
+            f"sleep/{record.child_uid}/intervals/{digest[:16]}",
+            sleep_interval(
+                digest[:16], int(record.start), int(duration), offset, {}, record.start
+            ),
+            "set",
+        )
+
+    if record.kind == "feed":
+        left = _number(data, "left_duration") or 0.0
+        right = _number(data, "right_duration") or 0.0
+        if left <= 0 and right <= 0:
+            raise ValueError("feed needs a left_duration or right_duration")
+        last_side = _text(data, "last_side") or ("left" if left >= right else "right")
+        return Write(
+            f"feed/{record.child_uid}/intervals/{interval_id}",
+            feed_interval(record.start, left, right, last_side, offset, record.start),
+            "set",
+        )
+
+    if record.kind == "diaper":
+        if (mode := _text(data, "mode")) not in ("pee", "poo", "both", "dry"):
+            raise ValueError(f"unknown diaper mode {mode!r}")
+        return Write(
+            f"diaper/{record.child_uid}/intervals/{interval_id}",
+            diaper_interval(
+                record.start,
+                mode,
+                _text(data, "pee_amount"),
+                _text(data, "poo_amount"),
+                _text(data, "color"),
+                _text(data, "consistency"),
+                str(data.get("diaper_rash", "")).lower() in ("1", "true", "yes"),
+                _text(data, "notes"),
+            ),
+            "set",
+        )
+
+    try:
+        units = GROWTH_UNITS(_text(data, "units") or "metric")
+    except vol.Invalid as err:
+        raise ValueError(f"units {err}") from err
+    return Write(
+        f"health/{record.child_uid}/data/{interval_id}",
+        growth_entry(
+            interval_id,
+            record.start,
+            _number(data, "weight"),
+            _number(data, "height"),
+            _number(data, "head"),
+            units,
+        ),
+        "set",
+    )
+
+
+def read_records(path: Path, file_format: str) -> Iterator[Mapping[str, Any] | str]:
+    """Stream the rows of a CSV file or the non-blank lines of a JSONL file (blocking)."""
+    with path.open(encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            yield from (line for line in file if line.strip())
+
+
+def _checkpoint_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, dict[str, Any]]]:
+    """Return the store of an entry's import checkpoints."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.import")
+
+
+async def async_remove_checkpoints(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the import checkpoints of a config entry."""
+    await _checkpoint_store(hass, entry_id).async_remove()
+
+
+def _fingerprint(path: Path) -> str:
+    """Return a value that changes when the file is modified (blocking)."""
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _skip(records: Iterator[Any], count: int) -> None:
+    """Consume count records (blocking)."""
+    deque(islice(records, count), maxlen=0)
+
+
+def _next_chunk(records: Iterator[Any], size: int) -> list[Any]:
+    """Return up to size records (blocking)."""
+    return list(islice(records, size))
+
+
+class HistoryImporter:
+    """Import history files of a config entry in rate-limited chunks.
+
+    Each chunk is one Firestore commit. After every commit the number of
+    processed records is checkpointed per file, so an interrupted import
+    resumes after the last committed chunk.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: HuckleberryDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the importer."""
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._store = _checkpoint_store(hass, entry.entry_id)
+        # Progress of every import of this run, per path
+        self.progress: dict[str, dict[str, Any]] = {}
+
+    async def async_start(
+        self,
+        path: str,
+        child_uid: str,
+        file_format: str | None = None,
+        chunk_size: int = 100,
+        restart: bool = False,
+    ) -> None:
+        """Validate an import and run it in the background.
+
+        path is relative to the configuration directory.
+        """
+        config_dir = Path(self._hass.config.config_dir).resolve()
+        full_path = (config_dir / path).resolve()
+        if not full_path.is_relative_to(config_dir):
+            raise HomeAssistantError(f"{path} is outside the configuration directory")
+        if not await self._hass.async_add_executor_job(full_path.is_file):
+            raise HomeAssistantError(f"{path} does not exist")
+        file_format = file_format or full_path.suffix.lstrip(".").lower()
+        if file_format not in ("csv", "jsonl"):
+            raise HomeAssistantError(f"Unsupported import format {file_format!r}")
+        if child_uid not in self._child_uids():
+            raise HomeAssistantError(f"Unknown child {child_uid}")
+        if self.progress.get(path, {}).get("status") == "running":
+            raise HomeAssistantError(f"{path} is already being imported")
+
+        self.progress[path] = {"path": path, "status": "running"}
+        self._entry.async_create_background_task(
+            self._hass,
+            self._async_import(path, full_path, child_uid, file_format, chunk_size, restart),
+            f"{DOMAIN} import {path}",
+        )
+
+    async def _async_import(
+        self,
+        path: str,
+        full_path: Path,
+        child_uid: str,
+        file_format: str,
+        chunk_size: int,
+        restart: bool,
+    ) -> None:
+        """Import a file, resuming from its checkpoint."""
+        progress = self.progress[path]
+        child_uids = self._child_uids()
+        records: Iterator[Mapping[str, Any] | str] | None = None
+        try:
+            fingerprint = await self._hass.async_add_executor_job(_fingerprint, full_path)
+            checkpoints = await self._store.async_load() or {}
+            checkpoint = checkpoints.get(path)
+            if restart or checkpoint is None or checkpoint["fingerprint"] != fingerprint:
+                checkpoint = {
+                    "fingerprint": fingerprint,
+                    "processed": 0,
+                    "imported": 0,
+                    "failed": 0,
+                }
+            progress = self.progress[path] = {
+                "path": path,
+                "status": "running",
+                "processed": checkpoint["processed"],
+                "imported": checkpoint["imported"],
+                "failed": checkpoint["failed"],
+                "errors": [],
+                "started": dt_util.utcnow().isoformat(),
+            }
+            if checkpoint["processed"]:
+                _LOGGER.info(
+                    "Resuming import of %s after %d records", path, checkpoint["processed"]
+                )
+
+            records = read_records(full_path, file_format)
+            await self._hass.async_add_executor_job(_skip, records, checkpoint["processed"])
+            while chunk := await self._hass.async_add_executor_job(
+                _next_chunk, records, chunk_size
+            ):
+                writes: list[Write] = []
+                for number, raw in enumerate(chunk, checkpoint["processed"] + 1):
+                    try:
+                        writes.append(record_write(parse_record(raw, child_uid, child_uids)))
+                    except (ValueError, TypeError) as err:
+                        checkpoint["failed"] += 1
+                        if len(progress["errors"]) < IMPORT_MAX_ERRORS:
+                            progress["errors"].append(f"record {number}: {err}")
+                if writes:
+                    await self._async_commit(writes)
+
+                checkpoint["processed"] += len(chunk)
+                checkpoint["imported"] += len(writes)
+                checkpoints[path] = checkpoint
+                await self._store.async_save(checkpoints)
+                progress.update(
+                    processed=checkpoint["processed"],
+                    imported=checkpoint["imported"],
+                    failed=checkpoint["failed"],
+                )
+                self._hass.bus.async_fire(EVENT_IMPORT_PROGRESS, dict(progress))
+                # Rate limit the commits
+                await asyncio.sleep(IMPORT_CHUNK_INTERVAL)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error(
+                "Import of %s failed after %d records: %s",
+                path,
+                progress.get("processed", 0),
+                err,
+            )
+            progress.update(status="failed", error=str(err))
+        else:
+            _LOGGER.info(
+                "Imported %d of %d records from %s",
+                checkpoint["imported"],
+                checkpoint["processed"],
+                path,
+            )
+            progress["status"] = "completed"
+        finally:
+            if records is not None:
+                await self._hass.async_add_executor_job(records.close)
+        self._hass.bus.async_fire(EVENT_IMPORT_PROGRESS, dict(progress))
+
+    def _child_uids(self) -> set[str]:
+        """Return the children of the account."""
+        return {child["uid"] for child in self._coordinator.children}
+
+    async def _async_commit(self, writes: list[Write]) -> None:
+        """Commit one chunk behind every live write."""
+        coordinator = self._coordinator
+        if coordinator.writer is not None:
+            await coordinator.writer.async_commit(writes)
+        else:
+            await coordinator.executor.async_run(
+                JobPriority.HISTORY, commit_writes, coordinator.api, writes
+            )
@@ -0,0 +1,243 @@
+"""Firestore listener management for Huckleberry."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from google.cloud.firestore_v1 import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
+from google.cloud.firestore_v1.watch import ChangeType
+from huckleberry_api import HuckleberryAPI
+
+from .const import (
+    LISTENER_RESUBSCRIBE_BACKOFF,
+    LISTENER_RESUBSCRIBE_BACKOFF_MAX,
+    LISTENER_STALE_AFTER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Firestore collection holding the document of each real-time category
+CATEGORY_COLLECTIONS: dict[str, str] = {
+    "sleep_status": "sleep",
+    "feed_status": "feed",
+    "growth_data": "health",
+    "diaper_data": "diaper",
+}
+
+# HuckleberryAPI method registering the document listener of each category
+LISTENER_SETUP_METHODS: dict[str, str] = {
+    "sleep_status": "setup_realtime_listener",
+    "feed_status": "setup_feed_listener",
+    "growth_data": "setup_health_listener",
+    "diaper_data": "setup_diaper_listener",
+}
+
+# Firestore rejects "in" filters with more values than this
+MAX_IN_FILTER_VALUES = 30
+
+
+@dataclass
+class ListenerHealth:
+    """Heartbeat and reconnect bookkeeping of one (child, category) stream.
+
+    Times are time.monotonic() seconds.
+    """
+
+    subscribed_at: float
+    last_snapshot: float | None = None
+    reconnects: int = 0
+    # Resubscriptions since the last snapshot, drives the backoff
+    failures: int = 0
+    retry_at: float = 0.0
+
+    def is_stalled(self, now: float, active: bool) -> bool:
+        """Return True if the stream should be resubscribed now."""
+        if now < self.retry_at:
+            return False
+        if not active:
+            return True
+        return now - (self.last_snapshot or self.subscribed_at) > LISTENER_STALE_AFTER
+
+    def record_snapshot(self, now: float) -> None:
+        """Record a snapshot delivered by the stream."""
+        self.last_snapshot = now
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def record_resubscribe(self, now: float, succeeded: bool) -> None:
+        """Record a resubscription attempt and back off until the next one."""
+        self.failures += 1
+        self.retry_at = now + min(
+            LISTENER_RESUBSCRIBE_BACKOFF * 2 ** (self.failures - 1),
+            LISTENER_RESUBSCRIBE_BACKOFF_MAX,
+        )
+        if succeeded:
+            self.reconnects += 1
+            self.subscribed_at = now
+
+
+def document_listener_active(api: HuckleberryAPI, child_uid: str, category: str) -> bool:
+    """Return True if HuckleberryAPI's document listener is still streaming."""
+    key = f"{CATEGORY_COLLECTIONS[category]}_{child_uid}"
+    watch = api._listeners.get(key)  # pylint: disable=protected-access
+    return watch is not None and bool(getattr(watch, "is_active", True))
+
+
+def restart_document_listener(
+    api: HuckleberryAPI,
+    child_uid: str,
+    category: str,
+    callback: Callable[[dict[str, Any]], None],
+) -> None:
+    """Close a child's document listener, if any, and register it again."""
+    key = f"{CATEGORY_COLLECTIONS[category]}_{child_uid}"
+    watch = api._listeners.pop(key, None)  # pylint: disable=protected-access
+    if watch is not None:
+        try:
+            watch.unsubscribe()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Error closing stalled listener %s: %s", key, err)
+    getattr(api, LISTENER_SETUP_METHODS[category])(child_uid, callback)
+
+
+def fetch_documents(
+    api: HuckleberryAPI, keys: list[tuple[str, str]]
+) -> dict[tuple[str, str], dict[str, Any]]:
+    """Read the current documents of (child, category) pairs in one request."""
+    client = api._get_firestore_client()  # pylint: disable=protected-access
+    refs = [
+        client.collection(CATEGORY_COLLECTIONS[category]).document(child_uid)
+        for child_uid, category in keys
+    ]
+    key_by_path = {ref.path: key for ref, key in zip(refs, keys)}
+    return {
+        key_by_path[snapshot.reference.path]: snapshot.to_dict()
+        for snapshot in client.get_all(refs)
+        if snapshot.exists and snapshot.reference.path in key_by_path
+    }
+
+
+class MultiplexedListener:
+    """Watch each collection once for every child of the account.
+
+    Instead of one document listener per (child, category), a single query
+    per collection selects the documents of all children by ID. Snapshots
+    are demultiplexed by document ID, so the number of open streams and
+    watch threads stays constant as children are added.
+
+    All methods are blocking and must run in an executor.
+    """
+
+    def __init__(
+        self,
+        api: HuckleberryAPI,
+        child_uids: list[str],
+        on_document: Callable[[str, str, dict[str, Any]], None],
+    ) -> None:
+        """Initialize the listener.
+
+        on_document is called from a Firestore thread with the child uid,
+        the real-time category and the document data.
+        """
+        self._api = api
+        self._child_uids = list(child_uids)
+        self._on_document = on_document
+        self._watches: dict[tuple[str, int], Any] = {}
+
+    @property
+    def stream_count(self) -> int:
+        """Return the number of open watch streams."""
+        return len(self._watches)
+
+    def start(self) -> dict[tuple[str, str], Exception]:
+        """Open one watch per collection, returning failures per (child, category)."""
+        client = self._api._get_firestore_client()  # pylint: disable=protected-access
+        errors: dict[tuple[str, str], Exception] = {}
+
+        for category in CATEGORY_COLLECTIONS:
+            for offset in range(0, len(self._child_uids), MAX_IN_FILTER_VALUES):
+                try:
+                    self._open(client, category, offset)
+                except Exception as err:  # pylint: disable=broad-except
+                    for child_uid in self._chunk(offset):
+                        errors[(child_uid, category)] = err
+
+        _LOGGER.info(
+            "Multiplexed listeners active: %d streams for %d children",
+            len(self._watches),
+            len(self._child_uids),
+        )
+        return errors
+
+    def is_active(self, child_uid: str, category: str) -> bool:
+        """Return True if the stream carrying a child's category is streaming."""
+        watch = self._watches.get(self.stream_key(child_uid, category))
+        return watch is not None and bool(getattr(watch, "is_active", True))
+
+    def stream_key(self, child_uid: str, category: str) -> tuple[str, int]:
+        """Return the key of the stream carrying a child's category."""
+        index = self._child_uids.index(child_uid)
+        return (category, index - index % MAX_IN_FILTER_VALUES)
+
+    def stream_children(self, stream_key: tuple[str, int]) -> list[str]:
+        """Return the children whose documents a stream carries."""
+        return self._chunk(stream_key[1])
+
+    def restart(self, stream_key: tuple[str, int]) -> None:
+        """Close a single stream and open it again."""
+        if (watch := self._watches.pop(stream_key, None)) is not None:
+            try:
+                watch.unsubscribe()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Error closing stalled stream %s: %s", stream_key, err)
+        client = self._api._get_firestore_client()  # pylint: disable=protected-access
+        self._open(client, *stream_key)
+
+    def stop(self) -> None:
+        """Close every watch stream."""
+        for key, watch in self._watches.items():
+            try:
+                watch.unsubscribe()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error stopping multiplexed listener %s: %s", key, err)
+        self._watches.clear()
+
+    def _chunk(self, offset: int) -> list[str]:
+        """Return the children of the stream starting at offset."""
+        return self._child_uids[offset:offset + MAX_IN_FILTER_VALUES]
+
+    def _open(self, client: Any, category: str, offset: int) -> None:
+        """Start the watch of one category for the children at offset."""
+        self._watches[(category, offset)] = self._watch(
+            client, category, CATEGORY_COLLECTIONS[category], self._chunk(offset)
+        )
+
+    def _watch(
+        self, client: Any, category: str, collection: str, child_uids: list[str]
+    ) -> Any:
+        """Start a watch on the documents of child_uids in a collection."""
+        collection_ref = client.collection(collection)
+        query = collection_ref.where(
+            filter=FieldFilter(
+                FieldPath.document_id(),
+                "in",
+                [collection_ref.document(child_uid) for child_uid in child_uids],
+            )
+        )
+
+        def on_snapshot(docs, changes, read_time):
+            """Route changed documents to their child."""
+            for change in changes:
+                if change.type == ChangeType.REMOVED or not change.document.exists:
+                    continue
+                _LOGGER.debug(
+                    "Multiplexed %s update received for child %s",
+                    collection,
+                    change.document.id,
+                )
+                self._on_document(change.document.id, category, change.document.to_dict())
+
+        return query.on_snapshot(on_snapshot)
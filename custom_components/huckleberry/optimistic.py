@@ -0,0 +1,96 @@
+"""Optimistic state for Huckleberry writes."""
+from __future__ import annotations
+
+import copy
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE
+
+from .firestore import DELETE_FIELD, PLANNERS, Write
+
+# Real-time category showing the child document of each written collection.
+# Growth is left out; its category is derived from the health document.
+WRITE_CATEGORIES: dict[str, str] = {
+    "sleep": "sleep_status",
+    "feed": "feed_status",
+    "diaper": "diaper_data",
+}
+
+
+@dataclass
+class PendingWrite:
+    """A write whose predicted document is shown until a listener confirms it.
+
+    Times are time.monotonic() seconds.
+    """
+
+    child_uid: str
+    category: str
+    # Predicted document, published in place of the confirmed one
+    document: dict[str, Any]
+    # Document to fall back to if the write fails or is never confirmed
+    fallback: Any
+    started: float
+    write_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    # Set once the API accepted the write; snapshots before it predate the write
+    committed: bool = False
+    # A snapshot received while the write was in flight
+    in_flight_snapshot: bool = False
+    unsub_timeout: CALLBACK_TYPE | None = None
+
+
+def predict(
+    method: str, child_uid: str, document: Mapping[str, Any] | None, now: float, *args: Any
+) -> tuple[str, dict[str, Any]] | None:
+    """Return the category and document a write method will produce.
+
+    The prediction replays the method's planned Firestore writes on the
+    current document. Returns None for methods that do not change a
+    real-time document or would not write anything.
+    """
+    planner, _ = PLANNERS[method]
+    writes = planner(child_uid, document, now, *args)
+    for collection, category in WRITE_CATEGORIES.items():
+        path = f"{collection}/{child_uid}"
+        if any(write.path == path for write in writes):
+            return category, apply_writes(document, writes, path)
+    return None
+
+
+def apply_writes(
+    document: Mapping[str, Any] | None, writes: list[Write], path: str
+) -> dict[str, Any]:
+    """Return document with the writes to path applied."""
+    result: dict[str, Any] = copy.deepcopy(dict(document or {}))
+    for write in writes:
+        if write.path != path:
+            continue
+        if write.mode == "set":
+            result = copy.deepcopy(write.data)
+        elif write.mode == "merge":
+            _merge(result, write.data)
+        else:
+            for dotted, value in write.data.items():
+                *parents, leaf = dotted.split(".")
+                target = result
+                for part in parents:
+                    if not isinstance(target.get(part), dict):
+                        target[part] = {}
+                    target = target[part]
+                if value is DELETE_FIELD:
+                    target.pop(leaf, None)
+                else:
+                    target[leaf] = copy.deepcopy(value)
+    return result
+
+
+def _merge(target: dict[str, Any], data: Mapping[str, Any]) -> None:
+    """Merge nested data into target in place, like a Firestore merge set."""
+    for key, value in data.items():
+        if isinstance(value, Mapping) and value and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
 from .entity import HuckleberryBaseEntity
@@ -27,6 +30,8 @@ async def async_setup_entry(
     children = data["children"]
 
     entities: list[SensorEntity] = [HuckleberryChildrenSensor(coordinator, children)]
+    if coordinator.write_journal is not None:
+        entities.append(HuckleberryWriteQueueSensor(coordinator, entry.entry_id))
 
     # Add individual child profile sensor for each child
     for child in children:
@@ -100,6 +105,40 @@ class HuckleberryChildrenSensor(CoordinatorEntity, SensorEntity):
         return self.coordinator.last_update_success
 
 
+class HuckleberryWriteQueueSensor(SensorEntity):
+    """Diagnostic sensor showing the writes waiting for Huckleberry to be reachable."""
+
+    _attr_icon = "mdi:tray-full"
+    _attr_native_unit_of_measurement = "writes"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, coordinator, entry_id: str) -> None:
+        """Initialize the sensor."""
+        self._journal = coordinator.write_journal
+
+        self._attr_name = "Huckleberry Write Queue"
+        self._attr_unique_id = f"{entry_id}_write_queue"
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever the queue changes."""
+        self.async_on_remove(self._journal.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of queued writes."""
+        return len(self._journal)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return entity specific state attributes."""
+        oldest: datetime | None = None
+        if (head := self._journal.head) is not None:
+            oldest = dt_util.utc_from_timestamp(head.time)
+        return {"oldest_queued": oldest.isoformat() if oldest else None}
+
+
 class HuckleberryChildProfileSensor(HuckleberryBaseEntity, SensorEntity):
     """Sensor showing individual child profile information."""
 
@@ -145,6 +184,7 @@ class HuckleberryGrowthSensor(HuckleberryBaseEntity, SensorEntity):
     """Sensor showing child growth measurements."""
 
     _attr_icon = "mdi:human-male-height"
+    _categories = ("growth_data",)
 
     def __init__(self, coordinator, child: dict[str, Any]) -> None:
         """Initialize the sensor."""
@@ -214,6 +254,7 @@ class HuckleberryDiaperSensor(HuckleberryBaseEntity, SensorEntity):
     """Sensor showing last diaper change information."""
 
     _attr_icon = "mdi:baby"
+    _categories = ("diaper_data",)
 
     def __init__(self, coordinator, child: dict[str, Any]) -> None:
         """Initialize the sensor."""
@@ -279,6 +320,7 @@ class HuckleberrySleepSensor(HuckleberryBaseEntity, SensorEntity):
     """Representation of a Huckleberry sleep sensor."""
 
     _attr_icon = "mdi:sleep"
+    _categories = ("sleep_status",)
     _attr_device_class = SensorDeviceClass.ENUM
     _attr_options = ["sleeping", "paused", "none"]
 
@@ -368,6 +410,7 @@ class HuckleberryFeedingSensor(HuckleberryBaseEntity, SensorEntity):
     """Representation of a Huckleberry feeding sensor."""
 
     _attr_icon = "mdi:baby-bottle"
+    _categories = ("feed_status",)
     _attr_device_class = SensorDeviceClass.ENUM
     _attr_options = ["feeding", "paused", "none"]
 
@@ -438,6 +481,7 @@ class HuckleberryLastFeedingSideSensor(HuckleberryBaseEntity, SensorEntity):
     """Sensor showing the last feeding side."""
 
     _attr_icon = "mdi:baby-bottle-outline"
+    _categories = ("feed_status",)
     _attr_device_class = SensorDeviceClass.ENUM
     _attr_options = ["Left", "Right", "Unknown"]
 
@@ -492,6 +536,7 @@ class HuckleberryPreviousSleepStartSensor(HuckleberryBaseEntity, SensorEntity):
     """Sensor showing the start time of the previous sleep session."""
 
     _attr_icon = "mdi:sleep"
+    _categories = ("sleep_status",)
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
     def __init__(self, coordinator, child: dict[str, Any]) -> None:
@@ -548,6 +593,7 @@ class HuckleberryPreviousSleepEndSensor(HuckleberryBaseEntity, SensorEntity):
     """Sensor showing the end time of the previous sleep session."""
 
     _attr_icon = "mdi:sleep-off"
+    _categories = ("sleep_status",)
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
     def __init__(self, coordinator, child: dict[str, Any]) -> None:
@@ -608,6 +654,7 @@ class HuckleberryPreviousFeedSensor(HuckleberryBaseEntity, SensorEntity):
     """Sensor showing the start time of the previous feeding session."""
 
     _attr_icon = "mdi:baby-bottle-outline"
+    _categories = ("feed_status",)
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
     def __init__(self, coordinator, child: dict[str, Any]) -> None:
@@ -0,0 +1,218 @@
+"""Huckleberry session refresh scheduling."""
+from __future__ import annotations
+
+import logging
+import random
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import Any, Literal
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from huckleberry_api import HuckleberryAPI
+
+from .const import (
+    DOMAIN,
+    SESSION_REFRESH_JITTER,
+    SESSION_REFRESH_LEAD,
+    SESSION_REFRESH_STAGGER,
+    SESSION_RETRY_BACKOFF,
+    SESSION_RETRY_BACKOFF_MAX,
+)
+from .executor import JobPriority, PriorityExecutor
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# How the session of a config entry was established at startup
+AuthMethod = Literal["cached", "refreshed", "password"]
+
+
+def refresh_session(api: HuckleberryAPI) -> None:
+    """Refresh the ID token, signing in again if there is no refresh token (blocking)."""
+    if api.refresh_token:
+        api.refresh_auth_token()
+    else:
+        api.authenticate()
+
+
+def entry_stagger(entry_id: str) -> float:
+    """Return a stable per-entry offset spreading refreshes of several entries."""
+    return float(zlib.crc32(entry_id.encode()) % SESSION_REFRESH_STAGGER)
+
+
+class TokenStore:
+    """Persist the tokens of a config entry across Home Assistant restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.session", private=True
+        )
+
+    async def async_restore(
+        self, api: HuckleberryAPI, executor: PriorityExecutor | None = None
+    ) -> AuthMethod:
+        """Establish the session of api, avoiding a password sign-in if possible.
+
+        A cached ID token that outlives the refresh lead is used as is, an
+        older one is refreshed. Password authentication is the fallback when
+        nothing is cached or the refresh fails. Blocking calls run on
+        executor, or on Home Assistant's executor if there is none.
+        """
+
+        async def run(target: Callable[[], Any]) -> None:
+            if executor is not None:
+                await executor.async_run(JobPriority.SESSION, target)
+            else:
+                await self._hass.async_add_executor_job(target)
+
+        if cached := await self._store.async_load():
+            api.id_token = cached["id_token"]
+            api.refresh_token = cached["refresh_token"]
+            api.user_uid = cached["user_uid"]
+            api.token_expires_at = cached["token_expires_at"]
+            if api.token_expires_at - time.time() > SESSION_REFRESH_LEAD:
+                return "cached"
+            try:
+                await run(api.refresh_auth_token)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.warning("Cached Huckleberry session expired, signing in again: %s", err)
+            else:
+                await self.async_save(api)
+                return "refreshed"
+
+        await run(api.authenticate)
+        await self.async_save(api)
+        return "password"
+
+    async def async_save(self, api: HuckleberryAPI) -> None:
+        """Store the current tokens of api."""
+        await self._store.async_save(
+            {
+                "id_token": api.id_token,
+                "refresh_token": api.refresh_token,
+                "user_uid": api.user_uid,
+                "token_expires_at": api.token_expires_at,
+            }
+        )
+
+    async def async_remove(self) -> None:
+        """Delete the stored tokens."""
+        await self._store.async_remove()
+
+
+class SessionRefreshScheduler:
+    """Refresh the ID token once, shortly before it expires.
+
+    The refresh is timed from HuckleberryAPI.token_expires_at, moved earlier
+    by a random jitter and a per-entry stagger so that several config
+    entries do not all refresh on the same tick. Failed refreshes are
+    retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: HuckleberryAPI,
+        on_refresh: Callable[[], Awaitable[None]],
+        stagger: float = 0.0,
+        token_store: TokenStore | None = None,
+        executor: PriorityExecutor | None = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        on_refresh is awaited after every successful refresh, which is also
+        written to token_store if one is given. Refreshes run on executor, or
+        on Home Assistant's executor if there is none.
+        """
+        self._hass = hass
+        self._api = api
+        self._on_refresh = on_refresh
+        self._stagger = stagger
+        self._token_store = token_store
+        self._executor = executor
+        self._unsub: CALLBACK_TYPE | None = None
+        self._running = False
+        self.next_refresh: datetime | None = None
+        self.failures = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Schedule the refresh of the current token."""
+        self._running = True
+        expires_at = self._api.token_expires_at
+        if not isinstance(expires_at, (int, float)):
+            # Expiry unknown, look again shortly
+            self._async_schedule(SESSION_RETRY_BACKOFF)
+            return
+
+        delay = (
+            expires_at
+            - time.time()
+            - SESSION_REFRESH_LEAD
+            - self._stagger
+            - random.uniform(0, SESSION_REFRESH_JITTER)
+        )
+        self._async_schedule(max(delay, 0))
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the scheduled refresh."""
+        self._running = False
+        self._async_cancel()
+
+    @callback
+    def _async_cancel(self) -> None:
+        """Cancel the pending timer."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self.next_refresh = None
+
+    @callback
+    def _async_schedule(self, delay: float) -> None:
+        """Schedule the next refresh in delay seconds."""
+        self._async_cancel()
+        self.next_refresh = dt_util.utcnow() + timedelta(seconds=delay)
+        self._unsub = async_call_later(self._hass, delay, self._async_refresh)
+
+    async def _async_refresh(self, _now: datetime) -> None:
+        """Refresh the session and schedule the next refresh."""
+        self._unsub = None
+        try:
+            if self._executor is not None:
+                await self._executor.async_run(JobPriority.SESSION, refresh_session, self._api)
+            else:
+                await self._hass.async_add_executor_job(refresh_session, self._api)
+        except Exception as err:  # pylint: disable=broad-except
+            if not self._running:
+                return
+            self.failures += 1
+            delay = min(
+                SESSION_RETRY_BACKOFF * 2 ** (self.failures - 1), SESSION_RETRY_BACKOFF_MAX
+            )
+            _LOGGER.error(
+                "Failed to refresh Huckleberry session (attempt %d), retrying in %ds: %s",
+                self.failures,
+                delay,
+                err,
+            )
+            self._async_schedule(delay)
+            return
+
+        _LOGGER.debug("Huckleberry session refreshed")
+        if not self._running:
+            return
+        self.failures = 0
+        self.async_start()
+        if self._token_store is not None:
+            await self._token_store.async_save(self._api)
+        await self._on_refresh()
@@ -0,0 +1,169 @@
+"""Immutable snapshots of the coordinator's real-time data."""
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY
+
+STORAGE_VERSION = 1
+
+# Document fields the entities render, per real-time category. A snapshot
+# that leaves all of them unchanged does not need to be published.
+# Categories missing here are compared as a whole.
+CONSUMED_FIELDS: dict[str, tuple[str, ...]] = {
+    "sleep_status": (
+        "timer.active",
+        "timer.paused",
+        "timer.timestamp",
+        "timer.timerStartTime",
+        "timer.timerEndTime",
+        "prefs.lastSleep",
+        # Legacy computed structure
+        "last_updated",
+        "sleep_duration",
+        "sleep_start",
+    ),
+    "feed_status": (
+        "timer.active",
+        "timer.paused",
+        "timer.activeSide",
+        "timer.lastSide",
+        "timer.timestamp",
+        "timer.feedStartTime",
+        "timer.leftDuration",
+        "timer.rightDuration",
+        "prefs.lastNursing",
+        "prefs.lastSide",
+    ),
+    "diaper_data": ("prefs.lastDiaper",),
+}
+
+_MISSING = object()
+
+
+def project(category: str, document: Any) -> Any:
+    """Return a copy of a listener document holding only the consumed fields.
+
+    The projection keeps the document's nesting, so it compares by value and
+    can stand in for the document wherever only those fields are read.
+    Categories without a field list are returned unchanged.
+    """
+    fields = CONSUMED_FIELDS.get(category)
+    if fields is None or not isinstance(document, Mapping):
+        return document
+
+    projection: dict[str, Any] = {}
+    for path in fields:
+        *parents, leaf = path.split(".")
+        value: Any = document
+        for part in (*parents, leaf):
+            value = value.get(part, _MISSING) if isinstance(value, Mapping) else _MISSING
+            if value is _MISSING:
+                break
+        if value is _MISSING:
+            continue
+        target = projection
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return projection
+
+
+class CoordinatorSnapshot(Mapping[str, Mapping[str, Any]]):
+    """Read-only view of the real-time data of every child.
+
+    A snapshot is never mutated once published. ``replace`` returns a new
+    snapshot that reuses every untouched child entry of this one, so a
+    publish only allocates the changed child's entry (plus the outer map of
+    one pointer per child) instead of copying any documents.
+    """
+
+    __slots__ = ("_children",)
+
+    def __init__(self, children: Mapping[str, Mapping[str, Any]] | None = None) -> None:
+        """Initialize the snapshot from a mapping of child_uid to child data."""
+        self._children: dict[str, Mapping[str, Any]] = {
+            child_uid: MappingProxyType(dict(entry))
+            for child_uid, entry in (children or {}).items()
+        }
+
+    @classmethod
+    def of(cls, data: Mapping[str, Mapping[str, Any]]) -> CoordinatorSnapshot:
+        """Return data as a snapshot, wrapping it only if it is not one already."""
+        return data if isinstance(data, cls) else cls(data)
+
+    def replace(self, changes: Mapping[tuple[str, str], Any]) -> CoordinatorSnapshot:
+        """Return a new snapshot with the given (child_uid, key) values replaced."""
+        by_child: dict[str, dict[str, Any]] = {}
+        for (child_uid, key), value in changes.items():
+            by_child.setdefault(child_uid, {})[key] = value
+
+        children = dict(self._children)
+        for child_uid, values in by_child.items():
+            entry = dict(children.get(child_uid, {}))
+            entry.update(values)
+            children[child_uid] = MappingProxyType(entry)
+
+        snapshot = CoordinatorSnapshot.__new__(CoordinatorSnapshot)
+        snapshot._children = children
+        return snapshot
+
+    def __getitem__(self, child_uid: str) -> Mapping[str, Any]:
+        """Return the read-only data of a child."""
+        return self._children[child_uid]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over child uids."""
+        return iter(self._children)
+
+    def __len__(self) -> int:
+        """Return the number of children."""
+        return len(self._children)
+
+    def __repr__(self) -> str:
+        """Return the representation."""
+        return f"CoordinatorSnapshot({list(self._children)})"
+
+
+class SnapshotStore:
+    """Persist the children and consumed fields of the latest snapshot.
+
+    Only projections are written, so the file stays small and a restart can
+    render the last known state before any listener has delivered.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot"
+        )
+
+    async def async_load(self) -> dict[str, dict[str, Any]]:
+        """Return the stored child and documents per child_uid."""
+        return await self._store.async_load() or {}
+
+    async def async_save(self, snapshot: CoordinatorSnapshot) -> None:
+        """Write snapshot now."""
+        await self._store.async_save(_compact(snapshot))
+
+    @callback
+    def async_schedule_save(self, snapshot: CoordinatorSnapshot) -> None:
+        """Write snapshot after SNAPSHOT_SAVE_DELAY, superseding pending writes."""
+        self._store.async_delay_save(lambda: _compact(snapshot), SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the stored snapshot."""
+        await self._store.async_remove()
+
+
+def _compact(snapshot: CoordinatorSnapshot) -> dict[str, dict[str, Any]]:
+    """Return the children and document projections of snapshot."""
+    return {
+        child_uid: {key: project(key, value) for key, value in entry.items()}
+        for child_uid, entry in snapshot.items()
+    }
@@ -38,6 +38,8 @@ async def async_setup_entry(
 class HuckleberrySleepSwitch(HuckleberryBaseEntity, SwitchEntity):  # pylint: disable=abstract-method
     """Switch to start/stop sleep tracking."""
 
+    _categories = ("sleep_status",)
+
     def __init__(self, coordinator, api, child: dict) -> None:
         """Initialize the switch."""
         super().__init__(coordinator, child)
@@ -59,10 +61,8 @@ class HuckleberrySleepSwitch(HuckleberryBaseEntity, SwitchEntity):  # pylint: di
         """Start sleep tracking."""
         _LOGGER.info("Starting sleep tracking for %s", self.child_name)
         try:
-            await self.hass.async_add_executor_job(
-                self._api.start_sleep, self.child_uid
-            )
-            # Real-time listener will update state automatically
+            await self.coordinator.async_write("start_sleep", self.child_uid)
+            # Shown optimistically until the real-time listener confirms it
         except Exception as err:
             _LOGGER.error("Failed to start sleep tracking: %s", err)
             raise
@@ -71,10 +71,8 @@ class HuckleberrySleepSwitch(HuckleberryBaseEntity, SwitchEntity):  # pylint: di
         """Stop sleep tracking."""
         _LOGGER.info("Stopping sleep tracking for %s", self.child_name)
         try:
-            await self.hass.async_add_executor_job(
-                self._api.complete_sleep, self.child_uid
-            )
-            # Real-time listener will update state automatically
+            await self.coordinator.async_write("complete_sleep", self.child_uid)
+            # Shown optimistically until the real-time listener confirms it
         except Exception as err:
             _LOGGER.error("Failed to stop sleep tracking: %s", err)
             raise
@@ -106,6 +104,8 @@ class HuckleberrySleepSwitch(HuckleberryBaseEntity, SwitchEntity):  # pylint: di
 class HuckleberryFeedingSwitch(HuckleberryBaseEntity, SwitchEntity):  # pylint: disable=abstract-method
     """Switch to start/stop breast feeding tracking for specific side."""
 
+    _categories = ("feed_status",)
+
     def __init__(self, coordinator, api, child: dict, side: str) -> None:
         """Initialize the switch."""
         super().__init__(coordinator, child)
@@ -133,10 +133,8 @@ class HuckleberryFeedingSwitch(HuckleberryBaseEntity, SwitchEntity):  # pylint:
         """Start feeding tracking on this side."""
         _LOGGER.info("Starting %s breast feeding for %s", self._side, self.child_name)
         try:
-            await self.hass.async_add_executor_job(
-                self._api.start_feeding, self.child_uid, self._side
-            )
-            # Real-time listener will update state automatically
+            await self.coordinator.async_write("start_feeding", self.child_uid, self._side)
+            # Shown optimistically until the real-time listener confirms it
         except Exception as err:
             _LOGGER.error("Failed to start feeding tracking: %s", err)
             raise
@@ -145,10 +143,8 @@ class HuckleberryFeedingSwitch(HuckleberryBaseEntity, SwitchEntity):  # pylint:
         """Complete feeding tracking and save to history."""
         _LOGGER.info("Completing %s breast feeding for %s", self._side, self.child_name)
         try:
-            await self.hass.async_add_executor_job(
-                self._api.complete_feeding, self.child_uid
-            )
-            # Real-time listener will update state automatically
+            await self.coordinator.async_write("complete_feeding", self.child_uid)
+            # Shown optimistically until the real-time listener confirms it
         except Exception as err:
             _LOGGER.error("Failed to complete feeding tracking: %s", err)
             raise
@@ -0,0 +1,168 @@
+"""Durable queue of Huckleberry writes made while the API is unreachable."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+from google.api_core import exceptions as api_exceptions
+import requests
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from huckleberry_api import HuckleberryAPI
+
+from .batch import BatchOperation, run_batch
+from .const import DOMAIN
+from .firestore import FirestoreWriter
+
+STORAGE_VERSION = 1
+
+# Errors raised before the write was sent, so it can be retried as is. A
+# timeout may hit a commit Firestore already applied, and the replay would
+# then write a second interval, so timeouts are not offline errors.
+OFFLINE_ERRORS: tuple[type[BaseException], ...] = (
+    aiohttp.ClientConnectorError,
+    # HuckleberryAPI only uses requests to sign in and refresh its token,
+    # which happens before the write
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    # Firestore rejects the request without applying it
+    api_exceptions.ServiceUnavailable,
+)
+
+# Errors the Firestore client retries a commit on; they are all rejections
+_RETRIED_ERRORS = (api_exceptions.ResourceExhausted, api_exceptions.ServiceUnavailable)
+
+
+def is_offline_error(err: BaseException) -> bool:
+    """Return True if err means the write could not reach Huckleberry."""
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status == 503
+    if isinstance(err, api_exceptions.RetryError):
+        # Out of retries; every attempt was rejected
+        return isinstance(err.cause, _RETRIED_ERRORS)
+    return isinstance(err, OFFLINE_ERRORS)
+
+
+@dataclass(frozen=True)
+class QueuedWrite:
+    """A HuckleberryAPI write method call waiting to be replayed."""
+
+    write_id: str
+    # Unix time of the call; the replay writes it instead of the current time
+    time: float
+    method: str
+    child_uid: str
+    args: tuple[Any, ...]
+
+    def as_row(self) -> list[Any]:
+        """Return the journal row of the write."""
+        return [self.write_id, self.time, self.method, self.child_uid, list(self.args)]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> QueuedWrite:
+        """Return the write of a journal row."""
+        write_id, when, method, child_uid, args = row
+        return cls(write_id, when, method, child_uid, tuple(args))
+
+
+class WriteJournal:
+    """Ordered queue of writes, persisted before they are acknowledged.
+
+    The journal is a list of positional rows saved through a Store, which
+    replaces the file atomically, so a crash leaves either the previous or
+    the new queue on disk.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the journal."""
+        self._store: Store[list[list[Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.writes"
+        )
+        self._writes: deque[QueuedWrite] = deque()
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    def __len__(self) -> int:
+        """Return the number of queued writes."""
+        return len(self._writes)
+
+    def __iter__(self) -> Iterator[QueuedWrite]:
+        """Iterate over the queued writes, oldest first."""
+        return iter(self._writes)
+
+    @property
+    def head(self) -> QueuedWrite | None:
+        """Return the oldest queued write."""
+        return self._writes[0] if self._writes else None
+
+    def has_child(self, child_uid: str) -> bool:
+        """Return True if writes of the child are queued."""
+        return any(write.child_uid == child_uid for write in self._writes)
+
+    async def async_load(self) -> None:
+        """Load the writes queued by the previous run."""
+        rows = await self._store.async_load() or []
+        self._writes = deque(QueuedWrite.from_row(row) for row in rows)
+
+    async def async_append(self, write: QueuedWrite) -> None:
+        """Queue a write and persist the journal."""
+        self._writes.append(write)
+        self._async_notify()
+        await self._async_save()
+
+    async def async_extend(self, writes: list[QueuedWrite]) -> None:
+        """Queue several writes in order and persist the journal once."""
+        self._writes.extend(writes)
+        self._async_notify()
+        await self._async_save()
+
+    async def async_pop(self) -> None:
+        """Remove the oldest write and persist the journal."""
+        self._writes.popleft()
+        self._async_notify()
+        await self._async_save()
+
+    async def async_remove(self) -> None:
+        """Delete the stored journal."""
+        await self._store.async_remove()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the queue depth."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify the listeners of a queue change."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def _async_save(self) -> None:
+        """Persist the current queue."""
+        await self._store.async_save([write.as_row() for write in self._writes])
+
+
+def replay_write(api: HuckleberryAPI, write: QueuedWrite) -> None:
+    """Perform a queued write at its original time with the Firestore client (blocking).
+
+    Raises ValueError if the write is no longer possible.
+    """
+    operation = BatchOperation(write.method, write.child_uid, write.method, write.args)
+    [result] = run_batch(api, [operation], write.time)
+    if result["status"] == "failed":
+        raise ValueError(result["error"])
+
+
+async def async_replay_write(writer: FirestoreWriter, write: QueuedWrite) -> None:
+    """Perform a queued write at its original time over the Firestore REST API."""
+    await writer.async_call(write.method, write.child_uid, *write.args, now=write.time)
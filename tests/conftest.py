@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import sys
+import time
 import socket
 from unittest.mock import MagicMock, patch
 
@@ -52,6 +53,10 @@ def mock_huckleberry_api():
     """Mock the Huckleberry API."""
     mock = MagicMock()
     mock.authenticate = MagicMock()
+    mock.id_token = "id_token"
+    mock.refresh_token = "refresh_token"
+    mock.user_uid = "user_uid"
+    mock.token_expires_at = time.time() + 3600
     mock.get_children = MagicMock(
         return_value=[
             {
@@ -76,6 +81,10 @@ def mock_huckleberry_api_multiple_children():
     """Mock the Huckleberry API with multiple children."""
     mock = MagicMock()
     mock.authenticate = MagicMock()
+    mock.id_token = "id_token"
+    mock.refresh_token = "refresh_token"
+    mock.user_uid = "user_uid"
+    mock.token_expires_at = time.time() + 3600
     mock.get_children = MagicMock(
         return_value=[
             {
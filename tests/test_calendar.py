@@ -1,11 +1,19 @@
 """Test calendar platform."""
+import asyncio
+import threading
+
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock, AsyncMock, patch
+from google.api_core.exceptions import ServiceUnavailable
 from homeassistant.components.calendar import CalendarEvent
 from homeassistant.util import dt as dt_util
 
+from huckleberry_api import HuckleberryAPI
+
 from custom_components.huckleberry.calendar import HuckleberryCalendar
+from custom_components.huckleberry.event_cache import EventCache, event_size
+from custom_components.huckleberry.executor import JobPriority
 
 
 @pytest.fixture
@@ -21,6 +29,9 @@ def mock_coordinator():
     """Create a mock coordinator."""
     coordinator = MagicMock()
     coordinator.data = {}
+    coordinator.executor.async_run = AsyncMock(
+        side_effect=lambda priority, target, *args: target(*args)
+    )
     return coordinator
 
 
@@ -44,8 +55,10 @@ def child_data():
 
 @pytest.fixture
 def calendar(mock_api, mock_coordinator, child_data, mock_entry):
-    """Create a calendar instance."""
-    return HuckleberryCalendar(mock_coordinator, child_data, mock_api)
+    """Create a calendar instance, without prefetching."""
+    return HuckleberryCalendar(
+        mock_coordinator, child_data, mock_api, EventCache(prefetch_bytes=0)
+    )
 
 
 def test_calendar_attributes(calendar, child_data):
@@ -77,3 +90,320 @@ async def test_async_get_events(calendar, hass):
 
         assert isinstance(events, list)
         assert len(events) == 0  # All mocked to return empty lists
+
+
+def _event(start: datetime, summary: str = "💤 Sleep (1h)") -> CalendarEvent:
+    """Return an instant event."""
+    return CalendarEvent(start=start, end=start, summary=summary)
+
+
+@pytest.mark.asyncio
+async def test_fetched_ranges_served_from_cache(calendar, hass):
+    """Test only the missing sub-ranges of a query are fetched."""
+    calendar.hass = hass
+    day = dt_util.start_of_local_day() - timedelta(days=10)
+    fetched: list[tuple[datetime, datetime]] = []
+
+    def fetch_sleep(start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        fetched.append((start_date, end_date))
+        return [
+            _event(day + timedelta(days=offset, hours=12))
+            for offset in range(7)
+            if start_date <= day + timedelta(days=offset, hours=12) < end_date
+        ]
+
+    with patch.object(
+        calendar, "_fetch_sleep_events", side_effect=fetch_sleep
+    ), patch.object(
+        calendar, "_fetch_feed_events", return_value=[]
+    ), patch.object(
+        calendar, "_fetch_diaper_events", return_value=[]
+    ), patch.object(
+        calendar, "_fetch_health_events", side_effect=RuntimeError("unavailable")
+    ):
+        # Ranges with a failed category are not cached
+        events = await calendar.async_get_events(hass, day, day + timedelta(days=2))
+        assert len(events) == 2
+        assert calendar._cache.stats["ranges"] == 0
+
+        calendar._fetch_health_events.side_effect = None
+        calendar._fetch_health_events.return_value = []
+        await calendar.async_get_events(hass, day, day + timedelta(days=2))
+        events = await calendar.async_get_events(hass, day, day + timedelta(days=2))
+        assert len(events) == 2
+        assert len(fetched) == 2
+
+        # Only the days after the cached ones are fetched
+        events = await calendar.async_get_events(hass, day, day + timedelta(days=7))
+        assert [event.start for event in events] == [
+            day + timedelta(days=offset, hours=12) for offset in range(7)
+        ]
+        assert fetched[-1] == (day + timedelta(days=2), day + timedelta(days=7))
+
+    stats = calendar._cache.stats
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["events"] == 7
+    assert stats["bytes"] > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_queries_not_cached(calendar, hass):
+    """Test a range whose Firestore query fails is not cached as empty."""
+    calendar.hass = hass
+    day = dt_util.start_of_local_day() - timedelta(days=5)
+    client = calendar._api._get_firestore_client.return_value
+    entries = client.collection.return_value.document.return_value.collection.return_value
+    regular = entries.where.return_value.where.return_value.order_by.return_value
+    regular.stream.side_effect = ServiceUnavailable("unreachable")
+    # Multi-entry documents
+    entries.where.return_value.stream.return_value = []
+
+    # The library reports the failed query as an empty result
+    assert HuckleberryAPI.get_sleep_intervals(calendar._api, "test_child_uid", 0, 1) == []
+
+    assert await calendar.async_get_events(hass, day, day + timedelta(days=1)) == []
+    assert calendar._cache.stats["ranges"] == 0
+
+    diaper = MagicMock()
+    diaper.to_dict.return_value = {
+        "start": (day + timedelta(hours=9)).timestamp(),
+        "mode": "poo",
+        "pooColor": "yellow",
+    }
+    regular.stream.side_effect = lambda: iter([diaper])
+    events = await calendar.async_get_events(hass, day, day + timedelta(days=1))
+    # Every collection returns the document in this test
+    [diaper_event] = [event for event in events if "Diaper" in event.summary]
+    assert "Color: yellow" in diaper_event.description
+    assert calendar._cache.stats["ranges"] == 1
+
+
+@pytest.mark.asyncio
+async def test_categories_fetched_concurrently_and_merged(calendar, hass):
+    """Test the four categories are fetched at once and merged in start order."""
+    calendar.hass = hass
+
+    async def async_run(priority, target, *args):
+        return await hass.async_add_executor_job(target, *args)
+
+    calendar.coordinator.executor.async_run = async_run
+    # Only passes once all four fetches are running at the same time
+    barrier = threading.Barrier(4, timeout=5)
+    day = dt_util.start_of_local_day() - timedelta(days=3)
+
+    def fetcher(*hours: int):
+        def fetch(start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+            barrier.wait()
+            return [_event(day + timedelta(hours=hour), f"at {hour}") for hour in hours]
+
+        return fetch
+
+    # Plain functions, as the test harness runs mocks in the event loop
+    calendar._fetch_sleep_events = fetcher(1, 13)
+    calendar._fetch_feed_events = fetcher(9, 3)
+    calendar._fetch_diaper_events = fetcher(2, 4, 22)
+    calendar._fetch_health_events = fetcher()
+    events = await calendar.async_get_events(hass, day, day + timedelta(days=1))
+
+    assert [event.summary for event in events] == [
+        f"at {hour}" for hour in (1, 2, 3, 4, 9, 13, 22)
+    ]
+    fetches = calendar._cache.stats["fetches"]
+    assert all(stats["fetches"] == 1 for stats in fetches.values())
+
+
+@pytest.mark.asyncio
+async def test_completed_sessions_added_from_realtime_documents(calendar, hass):
+    """Test completed sessions reach the cached view without fetching, and edits are reconciled."""
+    calendar.hass = hass
+    calendar.async_write_ha_state = MagicMock()
+    calendar.coordinator.pending_writes = {}
+    today = dt_util.start_of_local_day()
+    tomorrow = today + timedelta(days=1)
+    fetches = []
+
+    def fetch_diapers(start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        fetches.append((start_date, end_date))
+        return diapers
+
+    diapers: list[CalendarEvent] = []
+    calendar._fetch_sleep_events = lambda start_date, end_date: []
+    calendar._fetch_feed_events = lambda start_date, end_date: []
+    calendar._fetch_diaper_events = fetch_diapers
+    calendar._fetch_health_events = lambda start_date, end_date: []
+    assert await calendar.async_get_events(hass, today, tomorrow) == []
+
+    sleep_start = (today + timedelta(hours=1)).timestamp()
+    child_data = calendar.coordinator.data[calendar.child_uid] = {
+        "sleep_status": {"prefs": {"lastSleep": {"start": sleep_start, "duration": 5400}}},
+        "feed_status": {
+            "prefs": {
+                "lastNursing": {
+                    "start": sleep_start + 7200,
+                    "leftDuration": 600,
+                    "rightDuration": 300,
+                }
+            }
+        },
+    }
+    # An optimistic session is only added once confirmed
+    calendar.coordinator.pending_writes = {(calendar.child_uid, "feed_status"): MagicMock()}
+    calendar._async_add_realtime_event("sleep_status")
+    calendar._async_add_realtime_event("feed_status")
+    # Delivered again with every later snapshot of the document
+    calendar._async_add_realtime_event("sleep_status")
+
+    events = await calendar.async_get_events(hass, today, tomorrow)
+    assert [event.summary for event in events] == ["💤 Sleep (1h 30m)"]
+    assert len(fetches) == 1
+
+    calendar.coordinator.pending_writes = {}
+    calendar._async_add_realtime_event("feed_status")
+    events = await calendar.async_get_events(hass, today, tomorrow)
+    assert [event.summary for event in events] == ["💤 Sleep (1h 30m)", "🍼 Feed (L:10m R:5m)"]
+    assert len(fetches) == 1
+    assert calendar._cache.stats["appended"] == 2
+    assert calendar.async_write_ha_state.call_count == 2
+
+    # A diaper logged on another device is picked up by the reconciliation
+    diapers = [_event(today + timedelta(hours=2), "💧 Diaper (Pee)")]
+    child_data["sleep_status"]["prefs"]["lastSleep"]["duration"] = 7200
+    await calendar._async_reconcile()
+    events = await calendar.async_get_events(hass, today, tomorrow)
+    assert [event.summary for event in events] == [
+        "💤 Sleep (2h)",
+        "💧 Diaper (Pee)",
+        "🍼 Feed (L:10m R:5m)",
+    ]
+    # The day before is fetched for the entity state
+    assert fetches == [(today, tomorrow), (today, tomorrow), (today - timedelta(days=1), today)]
+
+    # The fetched entry has details the real-time document lacks, so it is kept
+    child_data["diaper_data"] = {
+        "prefs": {"lastDiaper": {"start": (today + timedelta(hours=2)).timestamp(), "mode": "pee"}}
+    }
+    calendar._async_add_realtime_event("diaper_data")
+    events = await calendar.async_get_events(hass, today, tomorrow)
+    assert events[1] is diapers[0]
+
+
+@pytest.mark.asyncio
+async def test_state_window_fetched_without_view(calendar, hass):
+    """Test the reconciliation caches the days around now for the entity state."""
+    calendar.hass = hass
+    calendar.async_write_ha_state = MagicMock()
+    calendar.coordinator.pending_writes = {}
+    today = dt_util.start_of_local_day()
+    napping = dt_util.now() - timedelta(minutes=30)
+    nap = CalendarEvent(start=napping, end=napping + timedelta(hours=1), summary="💤 Sleep (1h)")
+    fetches = []
+
+    def fetch_sleeps(start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        fetches.append((start_date, end_date))
+        return [nap]
+
+    calendar._fetch_sleep_events = fetch_sleeps
+    calendar._fetch_feed_events = lambda start_date, end_date: []
+    calendar._fetch_diaper_events = lambda start_date, end_date: []
+    calendar._fetch_health_events = lambda start_date, end_date: []
+    assert calendar.event is None
+
+    await calendar._async_reconcile()
+    assert calendar.event is nap
+    assert fetches == [(today - timedelta(days=1), today + timedelta(days=1))]
+    calendar.async_write_ha_state.assert_called_once()
+
+    # Refreshed by every reconciliation, so it never expires unseen
+    await calendar._async_reconcile()
+    assert len(fetches) == 2
+    assert calendar._cache.stats["ranges"] == 1
+
+
+@pytest.mark.asyncio
+async def test_adjacent_windows_prefetched(calendar, hass):
+    """Test the windows around a viewed range are prefetched within the byte budget."""
+    calendar.hass = hass
+    week = timedelta(days=7)
+    viewed = dt_util.start_of_local_day() - 4 * week
+    fetched = []
+
+    def fetch_sleep(start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        fetched.append((start_date, end_date))
+        return [_event(start_date + timedelta(hours=12))]
+
+    calendar._fetch_sleep_events = fetch_sleep
+    calendar._fetch_feed_events = lambda start_date, end_date: []
+    calendar._fetch_diaper_events = lambda start_date, end_date: []
+    calendar._fetch_health_events = lambda start_date, end_date: []
+    size = event_size(_event(viewed))
+    # Room for two more ranges besides the viewed one
+    calendar._cache = EventCache(prefetch_bytes=3 * size)
+
+    async def view(start: datetime) -> None:
+        await calendar.async_get_events(hass, start, start + week)
+        await asyncio.gather(*calendar._prefetches.values())
+
+    await view(viewed)
+    assert fetched == [
+        (viewed, viewed + week),
+        (viewed - week, viewed),
+        (viewed + week, viewed + 2 * week),
+    ]
+    stats = calendar._cache.stats
+    assert stats["prefetched"] == 2
+
+    # Navigating to a prefetched week hits the cache; the budget is spent
+    await view(viewed + week)
+    assert len(fetched) == 3
+    assert calendar._cache.stats["hits"] == 1
+
+    # The future is not prefetched
+    calendar._cache = EventCache()
+    fetched.clear()
+    await view(dt_util.start_of_local_day() - timedelta(days=1))
+    assert len(fetched) == 2
+
+
+@pytest.mark.asyncio
+async def test_view_reuses_running_prefetch(calendar, hass):
+    """Test prefetches run at the lowest priority and are awaited, not repeated, by a view."""
+    calendar.hass = hass
+    calendar._cache = EventCache()
+    week = timedelta(days=7)
+    viewed = dt_util.start_of_local_day() - 4 * week
+    fetched = []
+    priorities = set()
+    release_prefetch = asyncio.Event()
+
+    async def async_run(priority, target, *args):
+        priorities.add(priority)
+        if priority is JobPriority.PREFETCH:
+            await release_prefetch.wait()
+        return target(*args)
+
+    def fetch_sleep(start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        fetched.append((start_date, end_date))
+        return []
+
+    calendar.coordinator.executor.async_run = async_run
+    calendar._fetch_sleep_events = fetch_sleep
+    calendar._fetch_feed_events = lambda start_date, end_date: []
+    calendar._fetch_diaper_events = lambda start_date, end_date: []
+    calendar._fetch_health_events = lambda start_date, end_date: []
+
+    await calendar.async_get_events(hass, viewed, viewed + week)
+    assert priorities == {JobPriority.HISTORY}
+    assert len(calendar._prefetches) == 2
+
+    # Navigating to the next week waits for its prefetch
+    view = asyncio.ensure_future(calendar.async_get_events(hass, viewed + week, viewed + 2 * week))
+    await asyncio.sleep(0)
+    assert not view.done()
+    release_prefetch.set()
+    await view
+    await asyncio.gather(*calendar._prefetches.values())
+
+    assert JobPriority.PREFETCH in priorities
+    assert fetched.count((viewed + week, viewed + 2 * week)) == 1
+    assert calendar._cache.stats["hits"] == 1
@@ -4,7 +4,8 @@ import pytest
 from homeassistant import config_entries, data_entry_flow
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
 from homeassistant.core import HomeAssistant
-from custom_components.huckleberry.const import DOMAIN
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from custom_components.huckleberry.const import CONF_COALESCE_WINDOW, DOMAIN
 
 async def test_flow_user_init(hass: HomeAssistant):
     """Test the initialization of the form in the user step."""
@@ -105,3 +106,31 @@ async def test_flow_user_no_children(hass: HomeAssistant, mock_huckleberry_api):
 
     assert result["type"] == data_entry_flow.FlowResultType.FORM
     assert result["errors"] == {"base": "no_children"}
+
+
+async def test_options_flow(hass: HomeAssistant, mock_huckleberry_api):
+    """Test updating the coalescing window through the options flow."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_EMAIL: "test@example.com", CONF_PASSWORD: "test_password"},
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI",
+        return_value=mock_huckleberry_api,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        assert result["type"] == data_entry_flow.FlowResultType.FORM
+        assert result["step_id"] == "init"
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input={CONF_COALESCE_WINDOW: 0.5}
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_COALESCE_WINDOW] == 0.5
@@ -0,0 +1,747 @@
+"""Test the Huckleberry data update coordinator."""
+import asyncio
+import random
+import threading
+import time
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from google.api_core import exceptions as api_exceptions
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.huckleberry.const import (
+    CONF_BACKGROUND_SETUP,
+    CONF_COALESCE_WINDOW,
+    CONF_DEDUPE_WINDOW,
+    DOMAIN,
+    FALLBACK_POLL_INTERVAL,
+    LISTENER_SETUP_CONCURRENCY,
+    LISTENER_WATCHDOG_INTERVAL,
+    OPTIMISTIC_CONFIRM_TIMEOUT,
+    SNAPSHOT_SAVE_DELAY,
+    WRITE_REPLAY_BACKOFF,
+)
+from custom_components.huckleberry.diagnostics import async_get_config_entry_diagnostics
+from custom_components.huckleberry.executor import PriorityExecutor
+
+
+async def _setup_entry(
+    hass: HomeAssistant,
+    api: MagicMock,
+    options: dict | None = None,
+    entry_id: str | None = None,
+) -> MockConfigEntry:
+    """Set up a config entry backed by the given mock API."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id=entry_id,
+        data={CONF_EMAIL: "test@example.com", CONF_PASSWORD: "test_password"},
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+
+    with patch("custom_components.huckleberry.HuckleberryAPI", return_value=api):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    return entry
+
+
+async def _flush_updates(hass: HomeAssistant) -> None:
+    """Let the coalescing window close and the queued updates publish."""
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=5))
+    await hass.async_block_till_done()
+
+
+def _listener_callback(setup_mock: MagicMock, child_uid: str):
+    """Return the callback the coordinator registered for a child."""
+    for call in setup_mock.call_args_list:
+        if call.args[0] == child_uid:
+            return call.args[1]
+    raise AssertionError(f"No listener registered for {child_uid}")
+
+
+async def test_category_update_only_notifies_subscribers(
+    hass: HomeAssistant, mock_huckleberry_api_multiple_children
+):
+    """Test a diaper change for one child only notifies that child's diaper listeners."""
+    api = mock_huckleberry_api_multiple_children
+    entry = await _setup_entry(hass, api)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    child_2_diaper = MagicMock()
+    child_1_diaper = MagicMock()
+    child_2_sleep = MagicMock()
+    broadcast = MagicMock()
+    coordinator.async_add_category_listener("child_2", "diaper_data", child_2_diaper)
+    coordinator.async_add_category_listener("child_1", "diaper_data", child_1_diaper)
+    coordinator.async_add_category_listener("child_2", "sleep_status", child_2_sleep)
+    remove_broadcast = coordinator.async_add_listener(broadcast)
+
+    diaper_callback = _listener_callback(api.setup_diaper_listener, "child_2")
+    diaper_callback({"prefs": {"lastDiaper": {"start": 1700000000, "mode": "pee"}}})
+    await _flush_updates(hass)
+
+    child_2_diaper.assert_called_once()
+    child_1_diaper.assert_not_called()
+    child_2_sleep.assert_not_called()
+    broadcast.assert_not_called()
+    remove_broadcast()
+
+    state = hass.states.get("sensor.second_child_last_diaper")
+    assert state is not None
+    assert state.attributes.get("mode") == "pee"
+
+
+async def test_category_listener_removal(hass: HomeAssistant, mock_huckleberry_api):
+    """Test a removed category listener is no longer notified."""
+    entry = await _setup_entry(hass, mock_huckleberry_api)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    listener = MagicMock()
+    remove = coordinator.async_add_category_listener("child_1", "sleep_status", listener)
+    remove()
+
+    sleep_callback = _listener_callback(mock_huckleberry_api.setup_realtime_listener, "child_1")
+    sleep_callback({"timer": {"active": True, "paused": False}})
+    await _flush_updates(hass)
+
+    listener.assert_not_called()
+    assert hass.states.get("sensor.test_child_sleep_status").state == "sleeping"
+
+
+async def test_burst_is_coalesced_into_one_publish(hass: HomeAssistant, mock_huckleberry_api):
+    """Test snapshots arriving within the window are merged, keeping the latest."""
+    entry = await _setup_entry(hass, mock_huckleberry_api, {CONF_COALESCE_WINDOW: 1.0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    listener = MagicMock()
+    coordinator.async_add_category_listener("child_1", "sleep_status", listener)
+
+    sleep_callback = _listener_callback(mock_huckleberry_api.setup_realtime_listener, "child_1")
+    sleep_callback({"timer": {"active": True, "paused": True}})
+    sleep_callback({"timer": {"active": True, "paused": False}})
+    await hass.async_block_till_done()
+
+    # Nothing is published until the window closes
+    listener.assert_not_called()
+    assert hass.states.get("sensor.test_child_sleep_status").state == "none"
+
+    await _flush_updates(hass)
+
+    listener.assert_called_once()
+    assert hass.states.get("sensor.test_child_sleep_status").state == "sleeping"
+    assert coordinator.update_stats == {
+        "received": 2,
+        "suppressed": 0,
+        "coalesced": 1,
+        "published": 1,
+    }
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["update_stats"]["coalesced"] == 1
+    assert diagnostics["session"]["next_refresh"] is not None
+    assert diagnostics["entry"]["data"][CONF_PASSWORD] == "**REDACTED**"
+
+
+async def test_zero_window_publishes_immediately(hass: HomeAssistant, mock_huckleberry_api):
+    """Test a zero coalescing window publishes each snapshot as it arrives."""
+    entry = await _setup_entry(hass, mock_huckleberry_api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    feed_callback = _listener_callback(mock_huckleberry_api.setup_feed_listener, "child_1")
+    feed_callback({"timer": {"active": True, "paused": False, "activeSide": "left"}})
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.test_child_feeding_status").state == "feeding"
+    assert coordinator.update_stats["published"] == 1
+
+
+async def test_unrelated_field_change_is_suppressed(hass: HomeAssistant, mock_huckleberry_api):
+    """Test snapshots only touching fields no entity reads are not published."""
+    entry = await _setup_entry(hass, mock_huckleberry_api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    listener = MagicMock()
+    coordinator.async_add_category_listener("child_1", "diaper_data", listener)
+    diaper_callback = _listener_callback(mock_huckleberry_api.setup_diaper_listener, "child_1")
+
+    last_diaper = {"start": 1700000000, "mode": "poo"}
+    diaper_callback({"prefs": {"lastDiaper": last_diaper, "local_timestamp": 1}})
+    # Heartbeat style write from another caregiver's app
+    diaper_callback({"prefs": {"lastDiaper": dict(last_diaper), "local_timestamp": 2}})
+    await hass.async_block_till_done()
+
+    assert listener.call_count == 1
+    assert coordinator.update_stats["suppressed"] == 1
+
+    diaper_callback({"prefs": {"lastDiaper": {"start": 1700000600, "mode": "pee"}}})
+    await hass.async_block_till_done()
+
+    assert listener.call_count == 2
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["update_stats"]["suppression_rate"] == round(1 / 3, 3)
+
+
+async def test_listeners_set_up_concurrently_with_bound(
+    hass: HomeAssistant, mock_huckleberry_api_multiple_children
+):
+    """Test listener registration fans out without exceeding the concurrency limit."""
+    api = mock_huckleberry_api_multiple_children
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def slow_setup(child_uid, callback):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    # Plain functions, the test harness runs Mock executor jobs inline
+    for method in ("setup_realtime_listener", "setup_feed_listener",
+                   "setup_health_listener", "setup_diaper_listener"):
+        setattr(api, method, slow_setup)
+
+    entry = await _setup_entry(hass, api)
+
+    assert entry.state.value == "loaded"
+    assert 1 < peak <= LISTENER_SETUP_CONCURRENCY
+
+
+async def test_listener_failure_reported_per_stream(
+    hass: HomeAssistant, mock_huckleberry_api_multiple_children
+):
+    """Test one failing registration does not abort the other listeners."""
+    api = mock_huckleberry_api_multiple_children
+
+    def failing_feed_setup(child_uid, callback):
+        if child_uid == "child_2":
+            raise ConnectionError("stream refused")
+
+    api.setup_feed_listener.side_effect = failing_feed_setup
+
+    entry = await _setup_entry(hass, api)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    assert entry.state.value == "loaded"
+    assert coordinator.listener_errors == {("child_2", "feed_status"): "stream refused"}
+    assert api.setup_diaper_listener.call_count == 3
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["listener_errors"] == [
+        {"child_uid": "child_2", "category": "feed_status", "error": "stream refused"}
+    ]
+
+
+async def test_all_listeners_failing_retries_setup(hass: HomeAssistant, mock_huckleberry_api):
+    """Test setup is retried when no listener could be registered."""
+    for method in ("setup_realtime_listener", "setup_feed_listener",
+                   "setup_health_listener", "setup_diaper_listener"):
+        getattr(mock_huckleberry_api, method).side_effect = ConnectionError("offline")
+
+    entry = await _setup_entry(hass, mock_huckleberry_api)
+
+    assert entry.state.value == "setup_retry"
+
+
+async def test_failed_setup_stops_executor(hass: HomeAssistant, mock_huckleberry_api):
+    """Test a setup failing before the coordinator exists stops the executor."""
+    with patch.object(
+        PriorityExecutor,
+        "async_shutdown",
+        autospec=True,
+        side_effect=PriorityExecutor.async_shutdown,
+    ) as shutdown, patch(
+        "custom_components.huckleberry.WriteJournal.async_load",
+        side_effect=ValueError("corrupt journal"),
+    ):
+        entry = await _setup_entry(hass, mock_huckleberry_api)
+
+    assert entry.state.value == "setup_error"
+    shutdown.assert_awaited_once()
+
+
+async def test_watchdog_resubscribes_only_stalled_stream(
+    hass: HomeAssistant, mock_huckleberry_api
+):
+    """Test a dead stream is reopened alone and retried with backoff."""
+    api = mock_huckleberry_api
+    dead_watch = MagicMock(is_active=False)
+    api._listeners = MagicMock()
+    api._listeners.get.side_effect = (
+        lambda key: dead_watch if key == "sleep_child_1" else MagicMock(is_active=True)
+    )
+    api._listeners.pop.return_value = dead_watch
+
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + LISTENER_WATCHDOG_INTERVAL)
+    await hass.async_block_till_done()
+
+    dead_watch.unsubscribe.assert_called_once()
+    assert api.setup_realtime_listener.call_count == 2
+    assert api.setup_feed_listener.call_count == 1
+    health = coordinator.listener_health[("child_1", "sleep_status")]
+    assert health.reconnects == 1
+    assert health.failures == 1
+
+    # Still dead, but the backoff holds the next attempt back
+    async_fire_time_changed(hass, dt_util.utcnow() + 2 * LISTENER_WATCHDOG_INTERVAL)
+    await hass.async_block_till_done()
+    assert api.setup_realtime_listener.call_count == 2
+
+    # A snapshot proves the new stream healthy and resets the backoff
+    sleep_callback = api.setup_realtime_listener.call_args.args[1]
+    sleep_callback({"timer": {"active": True, "paused": False}})
+    await hass.async_block_till_done()
+    assert health.failures == 0
+    assert health.last_snapshot is not None
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert {
+        "child_uid": "child_1",
+        "category": "sleep_status",
+        "seconds_since_snapshot": 0,
+        "reconnects": 1,
+        "failures": 0,
+    } in diagnostics["listener_health"]
+
+
+async def test_initial_snapshots_count_as_heartbeats(
+    hass: HomeAssistant, mock_huckleberry_api
+):
+    """Test snapshots delivered while the listeners register are recorded."""
+    api = mock_huckleberry_api
+
+    def setup_realtime_listener(child_uid: str, callback) -> None:
+        callback({"timer": {"active": False, "paused": False}})
+
+    api.setup_realtime_listener.side_effect = setup_realtime_listener
+
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    assert coordinator.listener_health[("child_1", "sleep_status")].last_snapshot is not None
+    assert coordinator.listener_health[("child_1", "feed_status")].last_snapshot is None
+
+
+async def test_polling_only_while_streams_degraded(
+    hass: HomeAssistant, mock_huckleberry_api_multiple_children
+):
+    """Test the coordinator is push only until a stream fails, then polls it alone."""
+    api = mock_huckleberry_api_multiple_children
+    api.token_expires_at = time.time() + 3600
+
+    healthy = await _setup_entry(hass, api)
+    coordinator = hass.data[DOMAIN][healthy.entry_id]["coordinator"]
+    assert coordinator.update_interval is None
+
+    async_fire_time_changed(hass, dt_util.utcnow() + LISTENER_WATCHDOG_INTERVAL)
+    await hass.async_block_till_done()
+    api.maintain_session.assert_not_called()
+    await hass.config_entries.async_unload(healthy.entry_id)
+
+    def failing_feed_setup(child_uid, callback):
+        if child_uid == "child_2":
+            raise ConnectionError("stream refused")
+
+    api.setup_feed_listener.side_effect = failing_feed_setup
+    feed_document = MagicMock(exists=True)
+    feed_document.reference.path = "feed/child_2"
+    feed_document.to_dict.return_value = {"timer": {"active": True, "paused": False}}
+    client = api._get_firestore_client.return_value
+    client.collection.side_effect = lambda name: MagicMock(
+        document=lambda uid: MagicMock(path=f"{name}/{uid}")
+    )
+    client.get_all.return_value = [feed_document]
+
+    degraded = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][degraded.entry_id]["coordinator"]
+    assert coordinator.update_interval == FALLBACK_POLL_INTERVAL
+
+    async_fire_time_changed(hass, dt_util.utcnow() + FALLBACK_POLL_INTERVAL)
+    await hass.async_block_till_done()
+
+    polled = client.get_all.call_args.args[0]
+    assert [ref.path for ref in polled] == ["feed/child_2"]
+    assert hass.states.get("sensor.second_child_feeding_status").state == "feeding"
+    # Polled documents are no heartbeat of the dead stream
+    assert coordinator.listener_health[("child_2", "feed_status")].last_snapshot is None
+
+
+async def test_last_known_snapshot_restored_as_stale(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test entities start from the stored snapshot until listeners confirm it."""
+    store_key = f"{DOMAIN}.warm_entry.snapshot"
+    hass_storage[store_key] = {
+        "version": 1,
+        "key": store_key,
+        "data": {
+            "child_1": {"sleep_status": {"timer": {"active": True, "paused": False}}},
+            "removed_child": {"sleep_status": {"timer": {"active": True}}},
+        },
+    }
+
+    entry = await _setup_entry(
+        hass, mock_huckleberry_api, {CONF_COALESCE_WINDOW: 0}, entry_id="warm_entry"
+    )
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    assert hass.states.get("sensor.test_child_sleep_status").state == "sleeping"
+    assert coordinator.stale_keys == {("child_1", "sleep_status")}
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["stale"] == [{"child_uid": "child_1", "category": "sleep_status"}]
+
+    sleep_callback = _listener_callback(mock_huckleberry_api.setup_realtime_listener, "child_1")
+    sleep_callback({"timer": {"active": False}, "prefs": {"sweetspot": {"big": "doc"}}})
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.test_child_sleep_status").state == "none"
+    assert not coordinator.stale_keys
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+    stored = hass_storage[store_key]["data"]
+    assert list(stored) == ["child_1"]
+    assert stored["child_1"]["child"]["name"] == "Test Child"
+    assert stored["child_1"]["sleep_status"] == {"timer": {"active": False}}
+
+
+async def test_background_setup_forwards_platforms_first(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test entities come up from cached children before the API is reached."""
+    store_key = f"{DOMAIN}.background_entry.snapshot"
+    hass_storage[store_key] = {
+        "version": 1,
+        "key": store_key,
+        "data": {
+            "child_1": {
+                "child": {"uid": "child_1", "name": "Test Child"},
+                "sleep_status": {"timer": {"active": True, "paused": False}},
+            },
+        },
+    }
+    api = mock_huckleberry_api
+    connected = threading.Event()
+    children = api.get_children.return_value
+    # Plain function, the test harness runs Mock executor jobs inline
+    api.get_children = lambda: connected.wait(5) and children
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="background_entry",
+        data={CONF_EMAIL: "test@example.com", CONF_PASSWORD: "test_password"},
+        options={CONF_BACKGROUND_SETUP: True, CONF_COALESCE_WINDOW: 0},
+    )
+    entry.add_to_hass(hass)
+    with patch("custom_components.huckleberry.HuckleberryAPI", return_value=api):
+        # Not waiting for the background setup, it blocks on get_children
+        await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    assert entry.state.value == "loaded"
+    assert coordinator.initializing
+    assert hass.states.get("sensor.test_child_sleep_status").state == "sleeping"
+    assert hass.states.get("sensor.test_child_last_diaper").state == "unavailable"
+    api.setup_realtime_listener.assert_not_called()
+
+    connected.set()
+    await asyncio.gather(*entry._background_tasks)
+    await hass.async_block_till_done()
+
+    assert not coordinator.initializing
+    api.setup_realtime_listener.assert_called_once()
+    assert hass.states.get("sensor.test_child_last_diaper").state != "unavailable"
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["session"]["auth_method"] == "password"
+
+
+async def test_switch_state_is_optimistic_until_confirmed(
+    hass: HomeAssistant, mock_huckleberry_api
+):
+    """Test a switch flips on write and the listener snapshot reconciles it."""
+    api = mock_huckleberry_api
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    on_sleep = _listener_callback(api.setup_realtime_listener, "child_1")
+    on_sleep({"timer": {"active": False, "paused": False}})
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        "switch", "turn_on", {"entity_id": "switch.test_child_sleep_tracking"}, blocking=True
+    )
+
+    # Shown before any snapshot confirms the write
+    assert hass.states.get("switch.test_child_sleep_tracking").state == "on"
+    (pending,) = coordinator.pending_writes.values()
+    assert pending.committed
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["pending_writes"][0]["write_id"] == pending.write_id
+
+    on_sleep({"timer": {"active": True, "paused": False, "timerStartTime": 1}})
+    await hass.async_block_till_done()
+
+    assert coordinator.pending_writes == {}
+    assert coordinator.data["child_1"]["sleep_status"]["timer"]["timerStartTime"] == 1
+    assert coordinator.write_stats["confirmed"] == 1
+    assert hass.states.get("switch.test_child_sleep_tracking").state == "on"
+
+
+async def test_optimistic_state_rolled_back(hass: HomeAssistant, mock_huckleberry_api):
+    """Test predictions are withdrawn on API errors and missing confirmations."""
+    api = mock_huckleberry_api
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    on_feed = _listener_callback(api.setup_feed_listener, "child_1")
+    on_feed({"timer": {"active": False, "paused": False}})
+    await hass.async_block_till_done()
+
+    api.start_feeding.side_effect = RuntimeError("offline")
+    with pytest.raises(RuntimeError):
+        await hass.services.async_call(
+            "switch", "turn_on", {"entity_id": "switch.test_child_feeding_left"}, blocking=True
+        )
+    assert hass.states.get("switch.test_child_feeding_left").state == "off"
+    assert coordinator.write_stats["rolled_back"] == 1
+
+    api.start_feeding.side_effect = None
+    await hass.services.async_call(
+        "switch", "turn_on", {"entity_id": "switch.test_child_feeding_right"}, blocking=True
+    )
+    assert hass.states.get("switch.test_child_feeding_right").state == "on"
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=OPTIMISTIC_CONFIRM_TIMEOUT + 1)
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get("switch.test_child_feeding_right").state == "off"
+    assert coordinator.pending_writes == {}
+    assert coordinator.write_stats["rolled_back"] == 2
+
+
+async def test_offline_writes_queued_and_replayed(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test writes are journaled while offline and replayed in order at their original time."""
+    api = mock_huckleberry_api
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    on_feed = _listener_callback(api.setup_feed_listener, "child_1")
+    on_feed({"timer": {"active": False, "paused": False}})
+    await hass.async_block_till_done()
+
+    api.start_feeding.side_effect = requests.exceptions.ConnectionError("offline")
+    client = api._get_firestore_client.return_value
+    client.document.side_effect = lambda path: MagicMock(path=path)
+    client.get_all.return_value = []
+    batch = client.batch.return_value
+    batch.commit.side_effect = requests.exceptions.ConnectionError("offline")
+    called = time.time()
+    await hass.services.async_call(
+        "switch", "turn_on", {"entity_id": "switch.test_child_feeding_left"}, blocking=True
+    )
+    # Queued behind the first write without trying Huckleberry
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "child_1")})
+    await hass.services.async_call(
+        DOMAIN, "log_diaper_pee", {"device_id": device.id}, blocking=True
+    )
+    await hass.async_block_till_done()
+    api.log_diaper.assert_not_called()
+
+    assert hass.states.get("switch.test_child_feeding_left").state == "on"
+    assert hass.states.get("sensor.huckleberry_write_queue").state == "2"
+    stored = hass_storage[f"{DOMAIN}.{entry.entry_id}.writes"]["data"]
+    assert [row[2] for row in stored] == ["start_feeding", "log_diaper"]
+
+    # The second write tried a replay right away
+    assert batch.commit.call_count == 1
+    batch.reset_mock(side_effect=True)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=WRITE_REPLAY_BACKOFF + 1))
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.huckleberry_write_queue").state == "0"
+    assert hass_storage[f"{DOMAIN}.{entry.entry_id}.writes"]["data"] == []
+    assert batch.commit.call_count == 2
+    (feed_ref, feed), (diaper_ref, _) = (call.args for call in batch.set.call_args_list)
+    assert feed_ref.path == "feed/child_1"
+    assert called <= feed["timer"]["timerStartTime"] < called + 5
+    assert diaper_ref.path.startswith("diaper/child_1/intervals/")
+    # Shown until the listener confirms the replayed write
+    assert hass.states.get("switch.test_child_feeding_left").state == "on"
+    assert all(pending.committed for pending in coordinator.pending_writes.values())
+
+
+async def test_queued_writes_only_hold_back_their_child(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api_multiple_children
+):
+    """Test other children write directly and a queued child's next write replays at once."""
+    api = mock_huckleberry_api_multiple_children
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0, CONF_DEDUPE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    client = api._get_firestore_client.return_value
+    client.document.side_effect = lambda path: MagicMock(path=path)
+    client.get_all.return_value = []
+    batch = client.batch.return_value
+
+    api.log_diaper.side_effect = requests.exceptions.ConnectionError("offline")
+    await coordinator.async_write("log_diaper", "child_1", "pee")
+    api.log_diaper.side_effect = None
+    await coordinator.async_write("log_diaper", "child_2", "pee")
+    assert [call.args[0] for call in api.log_diaper.call_args_list] == ["child_1", "child_2"]
+    assert len(coordinator.write_journal) == 1
+
+    # Huckleberry is back; the next write of child 1 does not wait for the backoff
+    await coordinator.async_write("log_diaper", "child_1", "dry")
+    await hass.async_block_till_done()
+
+    assert len(coordinator.write_journal) == 0
+    assert hass_storage[f"{DOMAIN}.{entry.entry_id}.writes"]["data"] == []
+    assert batch.commit.call_count == 2
+    assert api.log_diaper.call_count == 2
+
+
+async def test_exhausted_client_retries_queue_write(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test a write is queued when the Firestore client runs out of retries."""
+    api = mock_huckleberry_api
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    api.log_diaper.side_effect = api_exceptions.RetryError(
+        "Timeout of 300.0s exceeded", api_exceptions.ServiceUnavailable("unreachable")
+    )
+
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "child_1")})
+    await hass.services.async_call(
+        DOMAIN, "log_diaper_pee", {"device_id": device.id}, blocking=True
+    )
+
+    assert hass.states.get("sensor.huckleberry_write_queue").state == "1"
+    stored = hass_storage[f"{DOMAIN}.{entry.entry_id}.writes"]["data"]
+    assert [row[2] for row in stored] == ["log_diaper"]
+
+
+async def test_timed_out_write_not_queued(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test a write that may have been applied is not queued for a second commit."""
+    api = mock_huckleberry_api
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    api.log_diaper.side_effect = api_exceptions.DeadlineExceeded("commit timed out")
+
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, "child_1")})
+    with pytest.raises(api_exceptions.DeadlineExceeded):
+        await hass.services.async_call(
+            DOMAIN, "log_diaper_pee", {"device_id": device.id}, blocking=True
+        )
+
+    assert hass.states.get("sensor.huckleberry_write_queue").state == "0"
+    assert f"{DOMAIN}.{entry.entry_id}.writes" not in hass_storage
+
+
+async def test_offline_batches_queued_in_order(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test batches are journaled while offline and behind queued writes."""
+    api = mock_huckleberry_api
+    entry = await _setup_entry(hass, api, {CONF_COALESCE_WINDOW: 0})
+    client = api._get_firestore_client.return_value
+    client.document.side_effect = lambda path: MagicMock(path=path)
+    client.get_all.return_value = []
+    commit = client.batch.return_value.commit
+    commit.side_effect = requests.exceptions.ConnectionError("offline")
+
+    async def run_batch(*operations: str) -> list[str]:
+        response = await hass.services.async_call(
+            DOMAIN,
+            "batch",
+            {
+                "child_uid": "child_1",
+                "operations": [{"operation": operation} for operation in operations],
+            },
+            blocking=True,
+            return_response=True,
+        )
+        return [result["status"] for result in response["results"]]
+
+    assert await run_batch("start_sleep", "log_diaper_pee") == ["queued", "queued"]
+    # Queued behind the first batch, which is replayed right away
+    assert await run_batch("log_diaper_dry") == ["queued"]
+    await hass.async_block_till_done()
+    assert commit.call_count == 2
+    stored = hass_storage[f"{DOMAIN}.{entry.entry_id}.writes"]["data"]
+    assert [(row[2], row[4][:1]) for row in stored] == [
+        ("start_sleep", []),
+        ("log_diaper", ["pee"]),
+        ("log_diaper", ["dry"]),
+    ]
+
+    commit.side_effect = None
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=WRITE_REPLAY_BACKOFF + 1))
+    await hass.async_block_till_done()
+
+    assert hass_storage[f"{DOMAIN}.{entry.entry_id}.writes"]["data"] == []
+    # One commit per replayed operation
+    assert commit.call_count == 5
+
+
+async def test_writes_ordered_per_child_and_parallel_across_children(
+    hass: HomeAssistant, mock_huckleberry_api_multiple_children
+):
+    """Stress test the write lanes with interleaved writes for three children."""
+    api = mock_huckleberry_api_multiple_children
+    entry = await _setup_entry(hass, api, {CONF_DEDUPE_WINDOW: 0})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    children = ["child_1", "child_2", "child_3"]
+    writes_per_child = 25
+    # Only passes once the first write of every child is in flight at the same time
+    barrier = threading.Barrier(len(children), timeout=5)
+    lock = threading.Lock()
+    in_flight: dict[str, int] = dict.fromkeys(children, 0)
+    peak_per_child: dict[str, int] = dict.fromkeys(children, 0)
+    landed: dict[str, list[int]] = {child_uid: [] for child_uid in children}
+
+    def log_diaper(child_uid: str, *args: Any) -> None:
+        number = int(args[-1])
+        with lock:
+            in_flight[child_uid] += 1
+            peak_per_child[child_uid] = max(peak_per_child[child_uid], in_flight[child_uid])
+        if number == 0:
+            barrier.wait()
+        time.sleep(random.uniform(0, 0.002))
+        with lock:
+            landed[child_uid].append(number)
+            in_flight[child_uid] -= 1
+
+    api.log_diaper.side_effect = log_diaper
+
+    await asyncio.gather(
+        *(
+            coordinator.async_write(
+                "log_diaper", child_uid, "pee", None, None, None, None, False, str(number)
+            )
+            for number in range(writes_per_child)
+            for child_uid in children
+        )
+    )
+
+    assert landed == {child_uid: list(range(writes_per_child)) for child_uid in children}
+    assert peak_per_child == dict.fromkeys(children, 1)
@@ -0,0 +1,135 @@
+"""Test the Huckleberry calendar event cache."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.util import dt as dt_util
+
+from custom_components.huckleberry.const import CALENDAR_CACHE_MAX_AGE
+from custom_components.huckleberry.event_cache import EventCache, event_size
+
+
+def _day_events(day: int) -> dict[str, list[CalendarEvent]]:
+    """Return one sleep event at noon of a past day."""
+    start = dt_util.start_of_local_day() - timedelta(days=30 - day, hours=-12)
+    return {"sleep": [CalendarEvent(start=start, end=start, summary=f"Sleep {day}")]}
+
+
+def _day_range(day: int) -> tuple[float, float]:
+    """Return the timestamps of a past day."""
+    start = dt_util.start_of_local_day() - timedelta(days=30 - day)
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+def test_least_recently_used_ranges_evicted_by_size():
+    """Test ranges are evicted least recently used first once over the byte budget."""
+    size = event_size(_day_events(0)["sleep"][0])
+    cache = EventCache(max_bytes=2 * size)
+    for day in range(2):
+        cache.store(*_day_range(day), _day_events(day))
+    # Day 0 is read, so day 1 is the least recently used
+    with patch("custom_components.huckleberry.event_cache.time.monotonic", return_value=1e9):
+        cache.events(*_day_range(0))
+    cache.store(*_day_range(2), _day_events(2))
+
+    assert cache.missing(*_day_range(0)) == []
+    assert cache.missing(*_day_range(1)) == [_day_range(1)]
+    assert cache.missing(*_day_range(2)) == []
+    assert cache.bytes == 2 * size
+    assert cache.stats["evictions"] == 1
+
+
+def test_ranges_expire():
+    """Test ranges are fetched again once expired."""
+    cache = EventCache(max_age=600)
+    past = _day_range(0)
+    cache.store(*past, _day_events(0))
+    assert cache.missing(*past) == []
+
+    monotonic = "custom_components.huckleberry.event_cache.time.monotonic"
+    now = cache._ranges[0].fetched
+    with patch(monotonic, return_value=now + 599):
+        assert cache.missing(*past) == []
+    with patch(monotonic, return_value=now + 601):
+        assert cache.missing(*past) == [past]
+    assert cache.bytes == 0
+
+
+def test_recent_ranges_read_within_max_age():
+    """Test only recently read ranges are reconciled, and refetching is not a read."""
+    cache = EventCache(max_age=600)
+    for day in (28, 29):
+        cache.store(*_day_range(day), _day_events(day))
+    monotonic = "custom_components.huckleberry.event_cache.time.monotonic"
+    now = cache._ranges[0].used
+    with patch(monotonic, return_value=now + 500):
+        cache.events(*_day_range(29))
+    with patch(monotonic, return_value=now + 550):
+        for covered in cache.recent(_day_range(28)[0]):
+            cache.store(covered.start, covered.end, {}, used=covered.used)
+
+    with patch(monotonic, return_value=now + 650):
+        assert [(covered.start, covered.end) for covered in cache.recent(0)] == [_day_range(29)]
+        assert cache.missing(*_day_range(28)) == []
+    assert [covered.used for covered in cache._ranges] == [now, now + 500]
+
+
+def test_events_added_to_covered_ranges():
+    """Test events are added inside cached ranges only, keeping the cached one of a start."""
+    cache = EventCache()
+    cache.store(*_day_range(0), _day_events(0))
+    [event] = _day_events(0)["sleep"]
+    edited = CalendarEvent(start=event.start, end=event.end, summary="Sleep edited")
+    later_start = event.start + timedelta(hours=1)
+    later = CalendarEvent(start=later_start, end=later_start, summary="Sleep later")
+    outside_start = event.start + timedelta(days=1)
+    outside = CalendarEvent(start=outside_start, end=outside_start, summary="Sleep outside")
+
+    assert cache.add("sleep", later)
+    assert not cache.add("sleep", later)
+    assert not cache.add("sleep", edited)
+    assert not cache.add("sleep", outside)
+    assert cache.events(*_day_range(0))["sleep"] == [event, later]
+    assert cache.bytes == event_size(event) + event_size(later)
+    assert cache.stats["appended"] == 1
+
+
+def test_current_or_next_event():
+    """Test the event in progress is found behind shorter later ones, else the next one."""
+    cache = EventCache()
+    start, end = _day_range(0)
+    day = dt_util.utc_from_timestamp(start)
+
+    def event(hour: int, hours: int, summary: str) -> CalendarEvent:
+        begin = day + timedelta(hours=hour)
+        return CalendarEvent(start=begin, end=begin + timedelta(hours=hours), summary=summary)
+
+    cache.store(
+        start,
+        end,
+        {
+            "sleep": [event(1, 10, "night"), event(14, 2, "nap")],
+            "diaper": [event(hour, 0, f"diaper {hour}") for hour in (2, 5, 9, 13)],
+            "feed": [event(12, 1, "feed")],
+        },
+    )
+
+    def at(hour: float) -> str | None:
+        found = cache.current_or_next((day + timedelta(hours=hour)).timestamp())
+        return found.summary if found else None
+
+    assert at(0) == "night"
+    assert at(6) == "night"
+    assert at(11) == "feed"
+    assert at(12.5) == "feed"
+    assert at(12.99) == "feed"
+    # Instant events are never in progress
+    assert at(13) == "nap"
+    assert at(15) == "nap"
+    assert at(20) is None
+
+    # Expired ranges are not looked up
+    monotonic = "custom_components.huckleberry.event_cache.time.monotonic"
+    with patch(monotonic, return_value=cache._ranges[0].fetched + CALENDAR_CACHE_MAX_AGE):
+        assert at(6) is None
+    assert cache.bytes == 0
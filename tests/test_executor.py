@@ -0,0 +1,44 @@
+"""Test the Huckleberry priority executor."""
+import asyncio
+import threading
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.huckleberry.executor import JobPriority, PriorityExecutor
+
+
+async def test_writes_overtake_history_reads(hass: HomeAssistant):
+    """Test history reads cannot occupy the workers reserved for writes."""
+    executor = PriorityExecutor(hass, max_workers=4)
+    release = threading.Event()
+    order: list[str] = []
+
+    def read_history(number: int) -> None:
+        release.wait(5)
+        order.append(f"history_{number}")
+
+    def write() -> str:
+        order.append("write")
+        return "written"
+
+    reads = [
+        asyncio.ensure_future(executor.async_run(JobPriority.HISTORY, read_history, number))
+        for number in range(4)
+    ]
+    await asyncio.sleep(0)
+
+    # History may only use the workers left after reserving one per higher priority
+    assert executor.running == 2
+    assert executor.queue_depth() == {"write": 0, "session": 0, "history": 2, "prefetch": 0}
+
+    assert await executor.async_run(JobPriority.WRITE, write) == "written"
+    assert order == ["write"]
+
+    release.set()
+    await asyncio.gather(*reads)
+    assert sorted(order[1:]) == [f"history_{number}" for number in range(4)]
+    assert executor.stats["history"]["completed"] == 4
+    assert executor.stats["history"]["peak_queued"] == 2
+    assert executor.stats["write"]["completed"] == 1
+
+    await executor.async_shutdown()
@@ -0,0 +1,228 @@
+"""Test the Huckleberry Firestore REST writer."""
+import time
+from collections.abc import AsyncGenerator
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.huckleberry.batch import async_run_batch, build_operation
+from custom_components.huckleberry.const import CONF_NATIVE_WRITES, DOMAIN
+from custom_components.huckleberry.firestore import (
+    FirestoreWriter,
+    decode_fields,
+    encode_fields,
+    field_path,
+)
+
+DOCUMENTS_PATH = "/v1/projects/simpleintervals/databases/(default)/documents"
+DATABASE = "projects/simpleintervals/databases/(default)/documents"
+
+
+class FirestoreStandIn:
+    """Local HTTP server answering Firestore document reads and commits."""
+
+    def __init__(self) -> None:
+        """Initialize the stand-in."""
+        self.documents: dict[str, dict] = {}
+        self.commits: list[dict] = []
+        self.authorization: list[str] = []
+        # Tokens other than this one are rejected, if set
+        self.valid_token: str | None = None
+        self.peers: set = set()
+        app = web.Application()
+        app.router.add_route("*", DOCUMENTS_PATH + "{path:.*}", self._handle)
+        self.server = TestServer(app, host="127.0.0.1")
+
+    @property
+    def base_url(self) -> str:
+        """Return the documents URL of the stand-in."""
+        return str(self.server.make_url(DOCUMENTS_PATH))
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.authorization.append(request.headers.get("Authorization"))
+        if self.valid_token and request.headers.get("Authorization") != f"Bearer {self.valid_token}":
+            return web.json_response({"error": {"code": 401}}, status=401)
+        self.peers.add(request.transport.get_extra_info("peername"))
+        path = request.match_info["path"]
+        if request.method == "POST" and path == ":commit":
+            self.commits.append(await request.json())
+            return web.json_response({"writeResults": []})
+        if (document := self.documents.get(path.lstrip("/"))) is None:
+            return web.json_response({"error": {"code": 404}}, status=404)
+        return web.json_response({"fields": encode_fields(document)})
+
+
+@pytest.fixture
+async def firestore(socket_enabled: None) -> AsyncGenerator[FirestoreStandIn, None]:
+    """Run a Firestore stand-in."""
+    stand_in = FirestoreStandIn()
+    await stand_in.server.start_server()
+    yield stand_in
+    await stand_in.server.close()
+
+
+def test_value_round_trip():
+    """Test Python values survive the REST encoding."""
+    data = {
+        "active": True,
+        "start": 1700000000,
+        "duration": 12.5,
+        "uuid": "abc",
+        "timerStartTime": None,
+        "details": {"sleepLocations": {"car": False}},
+        "tags": [1, "two"],
+    }
+
+    assert encode_fields(data)["start"] == {"integerValue": "1700000000"}
+    assert decode_fields(encode_fields(data)) == data
+    assert field_path("timer", "details", "10-20_minutes") == "timer.details.`10-20_minutes`"
+
+
+async def test_start_sleep_merges_timer(hass: HomeAssistant, firestore, mock_huckleberry_api):
+    """Test start_sleep commits a merge of the timer fields only."""
+    writer = FirestoreWriter(hass, mock_huckleberry_api, firestore.base_url)
+
+    await writer.async_call("start_sleep", "child_1", now=1700000000.0)
+
+    (commit,) = firestore.commits
+    (write,) = commit["writes"]
+    assert write["update"]["name"] == f"{DATABASE}/sleep/child_1"
+    timer = decode_fields(write["update"]["fields"])["timer"]
+    assert timer["active"] is True
+    assert timer["timerStartTime"] == 1700000000000.0
+    mask = write["updateMask"]["fieldPaths"]
+    assert "timer.active" in mask
+    assert "timer.details.startSleepCondition.`10-20_minutes`" in mask
+    assert "timer" not in mask
+    assert firestore.authorization == ["Bearer id_token"]
+
+
+async def test_token_refreshed_before_writes(
+    hass: HomeAssistant, firestore, mock_huckleberry_api
+):
+    """Test missing, expiring and rejected tokens are refreshed before writing."""
+    api = mock_huckleberry_api
+    tokens = iter(["token_1", "token_2", "token_3"])
+
+    def refresh_auth_token() -> None:
+        api.id_token = next(tokens)
+        api.token_expires_at = time.time() + 3600
+
+    api.refresh_auth_token.side_effect = refresh_auth_token
+    writer = FirestoreWriter(hass, api, firestore.base_url)
+
+    # Not connected yet
+    api.id_token = None
+    await writer.async_call("start_sleep", "child_1")
+    # A scheduled refresh was missed
+    api.token_expires_at = time.time() + 60
+    await writer.async_call("start_sleep", "child_1")
+    # Revoked before its expiry
+    firestore.valid_token = "token_3"
+    await writer.async_call("start_sleep", "child_1")
+
+    assert api.refresh_auth_token.call_count == 3
+    assert len(firestore.commits) == 3
+    assert firestore.authorization == [
+        "Bearer token_1",
+        "Bearer token_2",
+        "Bearer token_2",
+        "Bearer token_3",
+    ]
+
+
+async def test_complete_feeding_commits_atomically(
+    hass: HomeAssistant, firestore, mock_huckleberry_api
+):
+    """Test complete_feeding reads the timer and commits interval and timer together."""
+    firestore.documents["feed/child_1"] = {
+        "timer": {
+            "active": True,
+            "paused": False,
+            "timerStartTime": 1700000000.0,
+            "feedStartTime": 1700000000.0,
+            "activeSide": "left",
+            "leftDuration": 60.0,
+            "rightDuration": 0.0,
+        }
+    }
+    writer = FirestoreWriter(hass, mock_huckleberry_api, firestore.base_url)
+
+    await writer.async_call("complete_feeding", "child_1", now=1700000300.0)
+    await writer.async_call("pause_feeding", "child_2", now=1700000300.0)
+
+    # The missing document of child_2 means there is nothing to pause
+    (commit,) = firestore.commits
+    interval, feed = commit["writes"]
+    assert interval["update"]["name"].startswith(f"{DATABASE}/feed/child_1/intervals/1700000300000-")
+    assert "updateMask" not in interval
+    assert decode_fields(interval["update"]["fields"])["leftDuration"] == 360.0
+
+    assert feed["currentDocument"] == {"exists": True}
+    assert "timer.activeSide" in feed["updateMask"]["fieldPaths"]
+    fields = decode_fields(feed["update"]["fields"])
+    assert "activeSide" not in fields["timer"]
+    assert fields["timer"]["lastSide"] == "left"
+    assert fields["prefs"]["lastNursing"]["duration"] == 360.0
+    # Both requests reused one keep-alive connection
+    assert len(firestore.peers) == 1
+
+
+async def test_native_writes_bypass_executor(
+    hass: HomeAssistant, firestore, mock_huckleberry_api
+):
+    """Test services write through the REST writer when native writes are enabled."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_EMAIL: "test@example.com", CONF_PASSWORD: "test_password"},
+        options={CONF_NATIVE_WRITES: True},
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI", return_value=mock_huckleberry_api
+    ), patch(
+        "custom_components.huckleberry.firestore.FIRESTORE_BASE_URL", firestore.base_url
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        "log_diaper_pee",
+        {"device_id": "unknown", "child_uid": "child_1", "pee_amount": "big"},
+        blocking=True,
+    )
+
+    mock_huckleberry_api.log_diaper.assert_not_called()
+    (commit,) = firestore.commits
+    interval, diaper = commit["writes"]
+    assert decode_fields(interval["update"]["fields"])["quantity"] == {"pee": 100.0}
+    assert diaper["update"]["name"] == f"{DATABASE}/diaper/child_1"
+
+
+async def test_batch_is_one_commit(hass: HomeAssistant, firestore, mock_huckleberry_api):
+    """Test a bedtime routine is read once per document and committed together."""
+    firestore.documents["feed/child_1"] = {
+        "timer": {"active": True, "paused": True, "timerStartTime": 1700000000.0, "leftDuration": 600.0}
+    }
+    writer = FirestoreWriter(hass, mock_huckleberry_api, firestore.base_url)
+    operations = [
+        build_operation({"operation": "complete_feeding"}, "child_1"),
+        build_operation({"operation": "log_diaper_both", "poo_amount": "medium"}, "child_1"),
+        build_operation({"operation": "start_sleep"}, "child_1"),
+    ]
+
+    results = await async_run_batch(writer, operations, 1700000900.0)
+
+    assert [result["writes"] for result in results] == [2, 2, 1]
+    (commit,) = firestore.commits
+    assert [write["update"]["name"].split("/documents/")[1].split("/intervals/")[0] for write in commit["writes"]] == [
+        "feed/child_1", "feed/child_1", "diaper/child_1", "diaper/child_1", "sleep/child_1",
+    ]
+    # One document read, one commit
+    assert len(firestore.authorization) == 2
@@ -0,0 +1,157 @@
+"""Test the Huckleberry history import."""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from custom_components.huckleberry.const import DOMAIN
+from custom_components.huckleberry.history_import import EVENT_IMPORT_PROGRESS
+
+HISTORY_CSV = """type,start,end,duration,left_duration,right_duration,mode,poo_amount,weight
+sleep,2024-01-01T20:00:00+00:00,2024-01-02T06:00:00+00:00,,,,,,
+feed,2024-01-02T06:30:00+00:00,,,300,420,,,
+diaper,2024-01-02T07:00:00+00:00,,,,,soggy,,
+diaper,1704182400,,,,,poo,medium,
+growth,2024-01-02T09:00:00+00:00,,,,,,,4.2
+"""
+
+
+async def test_import_history(hass: HomeAssistant, mock_huckleberry_api, tmp_path):
+    """Test a file is imported in chunks and resumed after a failed commit."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / "history.csv").write_text(HISTORY_CSV)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_EMAIL: "test@example.com",
+            CONF_PASSWORD: "test_password",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI",
+        return_value=mock_huckleberry_api,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    client = mock_huckleberry_api._get_firestore_client.return_value
+    client.document.side_effect = lambda path: MagicMock(path=path)
+    batch = client.batch.return_value
+    # The second chunk fails to commit
+    batch.commit.side_effect = [None, RuntimeError("unavailable"), None, None]
+    events = async_capture_events(hass, EVENT_IMPORT_PROGRESS)
+
+    async def import_history(**data) -> None:
+        await hass.services.async_call(
+            DOMAIN,
+            "import_history",
+            {"child_uid": "child_1", "path": "history.csv", "chunk_size": 2, **data},
+            blocking=True,
+        )
+        await asyncio.gather(*entry._background_tasks)
+
+    with patch("custom_components.huckleberry.history_import.IMPORT_CHUNK_INTERVAL", 0):
+        await import_history()
+        assert [event.data["status"] for event in events] == ["running", "failed"]
+        assert events[-1].data["processed"] == 2
+
+        await import_history()
+
+    assert [event.data["status"] for event in events[2:]] == ["running", "running", "completed"]
+    progress = events[-1].data
+    assert progress["processed"] == 5
+    assert progress["imported"] == 4
+    assert progress["failed"] == 1
+    assert progress["errors"] == ["record 3: unknown diaper mode 'soggy'"]
+
+    paths = [call.args[0].path for call in batch.set.call_args_list]
+    assert [path.rsplit("/", 1)[0] for path in paths] == [
+        "sleep/child_1/intervals",
+        "feed/child_1/intervals",
+        # Retried after the failed commit
+        "diaper/child_1/intervals",
+        "diaper/child_1/intervals",
+        "health/child_1/data",
+    ]
+    assert paths[2] == paths[3]
+    sleep = batch.set.call_args_list[0].args[1]
+    assert sleep["duration"] == 36000
+    # Historical entries leave the latest entries of the child documents alone
+    batch.update.assert_not_called()
+
+
+async def test_import_history_validation(
+    hass: HomeAssistant, mock_huckleberry_api, tmp_path
+):
+    """Test unknown children and units are rejected, and setup failures end the import."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / "history.jsonl").write_text(
+        '{"type": "growth", "start": 1704182400, "weight": 4.2, "units": "stone"}\n'
+        '{"type": "growth", "start": 1704182400, "weight": 4.2, "child_uid": "child_9"}\n'
+        '{"type": "growth", "start": 1704182400, "weight": 9.3, "units": "imperial"}\n'
+    )
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_EMAIL: "test@example.com",
+            CONF_PASSWORD: "test_password",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI",
+        return_value=mock_huckleberry_api,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    client = mock_huckleberry_api._get_firestore_client.return_value
+    client.document.side_effect = lambda path: MagicMock(path=path)
+    events = async_capture_events(hass, EVENT_IMPORT_PROGRESS)
+
+    async def import_history(child_uid: str = "child_1") -> None:
+        await hass.services.async_call(
+            DOMAIN,
+            "import_history",
+            {"child_uid": child_uid, "path": "history.jsonl"},
+            blocking=True,
+        )
+        await asyncio.gather(*entry._background_tasks)
+
+    with pytest.raises(HomeAssistantError):
+        await import_history("child_9")
+
+    # An unreadable checkpoint fails the import instead of leaving it running
+    with patch(
+        "custom_components.huckleberry.history_import.Store.async_load",
+        side_effect=ValueError("corrupt checkpoint"),
+    ):
+        await import_history()
+    assert events[-1].data["status"] == "failed"
+    assert events[-1].data["error"] == "corrupt checkpoint"
+
+    with patch("custom_components.huckleberry.history_import.IMPORT_CHUNK_INTERVAL", 0):
+        await import_history()
+    progress = events[-1].data
+    assert progress["status"] == "completed"
+    assert progress["imported"] == 1
+    assert progress["errors"] == [
+        "record 1: units value must be one of ['imperial', 'metric']",
+        "record 2: unknown child 'child_9'",
+    ]
+    [(ref, growth)] = (call.args for call in client.batch.return_value.set.call_args_list)
+    assert ref.path.startswith("health/child_1/data/")
+    assert growth["weightUnits"] == "lbs"
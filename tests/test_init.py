@@ -1,10 +1,45 @@
 """Test Huckleberry component setup."""
+import time
+from typing import Any
 from unittest.mock import patch
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
 from custom_components.huckleberry.const import DOMAIN
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+ENTRY_ID = "test_entry"
+SESSION_STORE_KEY = f"{DOMAIN}.{ENTRY_ID}.session"
+
+
+def _cached_session(expires_in: float) -> dict[str, Any]:
+    """Return stored session data expiring in expires_in seconds."""
+    return {
+        "version": 1,
+        "minor_version": 1,
+        "key": SESSION_STORE_KEY,
+        "data": {
+            "id_token": "cached_id_token",
+            "refresh_token": "cached_refresh_token",
+            "user_uid": "user_uid",
+            "token_expires_at": time.time() + expires_in,
+        },
+    }
+
+
+async def _setup(hass: HomeAssistant, api) -> MockConfigEntry:
+    """Set up a config entry with a fixed entry_id."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id=ENTRY_ID,
+        data={CONF_EMAIL: "test@example.com", CONF_PASSWORD: "test_password"},
+    )
+    entry.add_to_hass(hass)
+    with patch("custom_components.huckleberry.HuckleberryAPI", return_value=api):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    return entry
+
+
 async def test_setup_entry(hass: HomeAssistant, mock_huckleberry_api):
     """Test setting up the integration."""
     entry = MockConfigEntry(
@@ -25,3 +60,60 @@ async def test_setup_entry(hass: HomeAssistant, mock_huckleberry_api):
 
     assert entry.state.value == "loaded"
     assert len(hass.states.async_all()) > 0
+
+
+async def test_setup_reuses_cached_session(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test a still valid stored token skips the password sign-in."""
+    hass_storage[SESSION_STORE_KEY] = _cached_session(3600)
+
+    entry = await _setup(hass, mock_huckleberry_api)
+
+    assert entry.state.value == "loaded"
+    mock_huckleberry_api.authenticate.assert_not_called()
+    mock_huckleberry_api.refresh_auth_token.assert_not_called()
+    assert mock_huckleberry_api.id_token == "cached_id_token"
+    assert hass.data[DOMAIN][ENTRY_ID]["auth_method"] == "cached"
+
+
+async def test_setup_refreshes_expiring_cached_session(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test an expiring stored token is refreshed instead of signing in."""
+    hass_storage[SESSION_STORE_KEY] = _cached_session(60)
+
+    def refresh():
+        mock_huckleberry_api.id_token = "refreshed_id_token"
+        mock_huckleberry_api.token_expires_at = time.time() + 3600
+
+    mock_huckleberry_api.refresh_auth_token.side_effect = refresh
+
+    await _setup(hass, mock_huckleberry_api)
+
+    mock_huckleberry_api.authenticate.assert_not_called()
+    assert hass.data[DOMAIN][ENTRY_ID]["auth_method"] == "refreshed"
+    assert hass_storage[SESSION_STORE_KEY]["data"]["id_token"] == "refreshed_id_token"
+
+
+async def test_setup_falls_back_to_password(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_huckleberry_api
+):
+    """Test a failing refresh falls back to email and password."""
+    hass_storage[SESSION_STORE_KEY] = _cached_session(-60)
+    mock_huckleberry_api.refresh_auth_token.side_effect = ConnectionError("revoked")
+
+    def authenticate():
+        mock_huckleberry_api.id_token = "new_id_token"
+
+    mock_huckleberry_api.authenticate.side_effect = authenticate
+
+    entry = await _setup(hass, mock_huckleberry_api)
+
+    mock_huckleberry_api.authenticate.assert_called_once()
+    assert hass.data[DOMAIN][ENTRY_ID]["auth_method"] == "password"
+    assert hass_storage[SESSION_STORE_KEY]["data"]["id_token"] == "new_id_token"
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert SESSION_STORE_KEY not in hass_storage
@@ -0,0 +1,93 @@
+"""Test Huckleberry multiplexed listeners."""
+from unittest.mock import MagicMock, patch
+
+from google.cloud.firestore_v1.watch import ChangeType
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.huckleberry.const import (
+    CONF_COALESCE_WINDOW,
+    CONF_MULTIPLEX_LISTENERS,
+    DOMAIN,
+)
+
+
+def _change(child_uid: str, data: dict, change_type=ChangeType.MODIFIED) -> MagicMock:
+    """Build a Firestore document change."""
+    change = MagicMock()
+    change.type = change_type
+    change.document.id = child_uid
+    change.document.exists = True
+    change.document.to_dict.return_value = data
+    return change
+
+
+def _firestore_client() -> tuple[MagicMock, dict]:
+    """Return a fake Firestore client capturing snapshot callbacks per collection."""
+    client = MagicMock()
+    callbacks: dict[str, list] = {}
+
+    def collection(name):
+        collection_ref = MagicMock()
+
+        def where(filter):  # pylint: disable=redefined-builtin
+            query = MagicMock()
+
+            def on_snapshot(callback):
+                callbacks.setdefault(name, []).append(callback)
+                return MagicMock()
+
+            query.on_snapshot.side_effect = on_snapshot
+            return query
+
+        collection_ref.where.side_effect = where
+        return collection_ref
+
+    client.collection.side_effect = collection
+    return client, callbacks
+
+
+async def test_multiplexed_listener_demultiplexes_children(
+    hass: HomeAssistant, mock_huckleberry_api_multiple_children
+):
+    """Test one watch per collection feeds every child's data."""
+    api = mock_huckleberry_api_multiple_children
+    client, callbacks = _firestore_client()
+    api._get_firestore_client.return_value = client
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_EMAIL: "test@example.com", CONF_PASSWORD: "test_password"},
+        options={CONF_MULTIPLEX_LISTENERS: True, CONF_COALESCE_WINDOW: 0},
+    )
+    entry.add_to_hass(hass)
+    with patch("custom_components.huckleberry.HuckleberryAPI", return_value=api):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    # Four streams for three children, no per-document listeners
+    assert {name: len(cbs) for name, cbs in callbacks.items()} == {
+        "sleep": 1, "feed": 1, "health": 1, "diaper": 1,
+    }
+    api.setup_realtime_listener.assert_not_called()
+    api.setup_feed_listener.assert_not_called()
+
+    callbacks["sleep"][0](
+        [],
+        [
+            _change("child_1", {"timer": {"active": True, "paused": False}}),
+            _change("child_3", {"timer": {"active": True, "paused": True}}),
+            _change("child_2", {"timer": {"active": True}}, ChangeType.REMOVED),
+        ],
+        None,
+    )
+    callbacks["health"][0](
+        [], [_change("child_2", {"prefs": {"lastGrowthEntry": {"weight": 4.2, "start": 1}}})], None
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.first_child_sleep_status").state == "sleeping"
+    assert hass.states.get("sensor.second_child_sleep_status").state == "none"
+    assert hass.states.get("sensor.third_child_sleep_status").state == "paused"
+    assert hass.states.get("sensor.second_child_growth").attributes["weight"] == 4.2
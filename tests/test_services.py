@@ -1,7 +1,9 @@
 """Test Huckleberry services."""
 from unittest.mock import patch, MagicMock
+
+from freezegun.api import FrozenDateTimeFactory
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from custom_components.huckleberry.const import DOMAIN
+from custom_components.huckleberry.const import DEFAULT_DEDUPE_WINDOW, DOMAIN
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
@@ -169,3 +171,211 @@ async def test_service_explicit_child_uid(hass: HomeAssistant, mock_huckleberry_
         DOMAIN, "start_sleep", {"device_id": device_id, "child_uid": "explicit_child_uid"}, blocking=True
     )
     mock_huckleberry_api.start_sleep.assert_called_with("explicit_child_uid")
+
+async def test_duplicate_calls_collapsed(
+    hass: HomeAssistant, mock_huckleberry_api, freezer: FrozenDateTimeFactory
+):
+    """Test identical calls within the dedupe window make a single write."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_EMAIL: "test@example.com",
+            CONF_PASSWORD: "test_password",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI",
+        return_value=mock_huckleberry_api,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    device_id = "dummy_device_id"
+
+    for _ in range(2):
+        await hass.services.async_call(
+            DOMAIN,
+            "log_diaper_pee",
+            {"device_id": device_id, "child_uid": "child_1", "pee_amount": "little"},
+            blocking=True,
+        )
+    assert mock_huckleberry_api.log_diaper.call_count == 1
+
+    # A different payload or child is a separate write
+    await hass.services.async_call(
+        DOMAIN,
+        "log_diaper_pee",
+        {"device_id": device_id, "child_uid": "child_1", "pee_amount": "big"},
+        blocking=True,
+    )
+    await hass.services.async_call(
+        DOMAIN,
+        "log_diaper_pee",
+        {"device_id": device_id, "child_uid": "child_2", "pee_amount": "little"},
+        blocking=True,
+    )
+    assert mock_huckleberry_api.log_diaper.call_count == 3
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert coordinator.write_stats["deduplicated"] == 1
+
+    # Once the window has passed the call is performed again
+    freezer.tick(DEFAULT_DEDUPE_WINDOW)
+    await hass.services.async_call(
+        DOMAIN,
+        "log_diaper_pee",
+        {"device_id": device_id, "child_uid": "child_1", "pee_amount": "little"},
+        blocking=True,
+    )
+    assert mock_huckleberry_api.log_diaper.call_count == 4
+
+async def test_toggle_back_not_collapsed(hass: HomeAssistant, mock_huckleberry_api):
+    """Test a call repeated after a different write of the child is performed."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_EMAIL: "test@example.com",
+            CONF_PASSWORD: "test_password",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI",
+        return_value=mock_huckleberry_api,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    device_id = "dummy_device_id"
+
+    for service in ("start_sleep", "complete_sleep", "start_sleep"):
+        await hass.services.async_call(
+            DOMAIN,
+            service,
+            {"device_id": device_id, "child_uid": "child_1"},
+            blocking=True,
+        )
+    assert mock_huckleberry_api.start_sleep.call_count == 2
+    assert mock_huckleberry_api.complete_sleep.call_count == 1
+
+    for service in ("pause_feeding", "resume_feeding", "pause_feeding"):
+        await hass.services.async_call(
+            DOMAIN,
+            service,
+            {"device_id": device_id, "child_uid": "child_1"},
+            blocking=True,
+        )
+    assert mock_huckleberry_api.pause_feeding.call_count == 2
+    assert mock_huckleberry_api.resume_feeding.call_count == 1
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert coordinator.write_stats["deduplicated"] == 0
+
+async def test_batch_service(hass: HomeAssistant, mock_huckleberry_api):
+    """Test a batch is planned in order and committed once."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_EMAIL: "test@example.com",
+            CONF_PASSWORD: "test_password",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI",
+        return_value=mock_huckleberry_api,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    client = mock_huckleberry_api._get_firestore_client.return_value
+    feed = MagicMock(exists=True)
+    feed.reference.path = "feed/child_1"
+    feed.to_dict.return_value = {
+        "timer": {"active": True, "paused": False, "timerStartTime": 1.0, "activeSide": "left"}
+    }
+    client.get_all.return_value = [feed]
+    client.document.side_effect = lambda path: MagicMock(path=path)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "batch",
+        {
+            "child_uid": "child_1",
+            "operations": [
+                {"operation": "complete_feeding"},
+                {"operation": "pause_feeding"},
+                {"operation": "log_diaper_both", "poo_amount": "medium"},
+                {"operation": "start_sleep", "child_uid": "child_2"},
+                {"operation": "log_growth"},
+            ],
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert [(result["operation"], result["child_uid"], result["status"]) for result in response["results"]] == [
+        ("complete_feeding", "child_1", "committed"),
+        # The feed timer is no longer active once complete_feeding is planned
+        ("pause_feeding", "child_1", "skipped"),
+        ("log_diaper_both", "child_1", "committed"),
+        ("start_sleep", "child_2", "committed"),
+        ("log_growth", "child_1", "failed"),
+    ]
+    batch = client.batch.return_value
+    batch.commit.assert_called_once()
+    assert batch.set.call_count == 3
+    assert batch.update.call_count == 2
+    mock_huckleberry_api.complete_feeding.assert_not_called()
+
+
+async def test_batch_reports_partially_committed(hass: HomeAssistant, mock_huckleberry_api):
+    """Test a failing later commit reports which operations were written."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_EMAIL: "test@example.com",
+            CONF_PASSWORD: "test_password",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.huckleberry.HuckleberryAPI",
+        return_value=mock_huckleberry_api,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    client = mock_huckleberry_api._get_firestore_client.return_value
+    client.get_all.return_value = []
+    client.document.side_effect = lambda path: MagicMock(path=path)
+    batch = client.batch.return_value
+    batch.commit.side_effect = [None, RuntimeError("unavailable")]
+
+    # Each diaper log takes two writes, so every commit holds one operation
+    with patch("custom_components.huckleberry.batch.MAX_BATCH_WRITES", 2):
+        response = await hass.services.async_call(
+            DOMAIN,
+            "batch",
+            {
+                "child_uid": "child_1",
+                "operations": [
+                    {"operation": "log_diaper_pee"},
+                    {"operation": "log_diaper_poo"},
+                    {"operation": "log_diaper_dry"},
+                ],
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    assert [result["status"] for result in response["results"]] == [
+        "committed",
+        "failed",
+        "not_attempted",
+    ]
+    assert response["results"][1]["error"] == "unavailable"
+    assert batch.commit.call_count == 2
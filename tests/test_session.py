@@ -0,0 +1,71 @@
+"""Test the Huckleberry session refresh scheduler."""
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.huckleberry.const import (
+    SESSION_REFRESH_JITTER,
+    SESSION_REFRESH_LEAD,
+    SESSION_REFRESH_STAGGER,
+    SESSION_RETRY_BACKOFF,
+)
+from custom_components.huckleberry.session import SessionRefreshScheduler, entry_stagger
+
+
+async def test_refresh_scheduled_before_expiry(hass: HomeAssistant):
+    """Test the refresh is timed from the token expiry, jitter and stagger."""
+    api = MagicMock()
+    api.token_expires_at = time.time() + 3600
+    scheduler = SessionRefreshScheduler(hass, api, AsyncMock(), stagger=120)
+
+    scheduler.async_start()
+    delay = (scheduler.next_refresh - dt_util.utcnow()).total_seconds()
+    scheduler.async_stop()
+
+    latest = 3600 - SESSION_REFRESH_LEAD - 120
+    assert latest - SESSION_REFRESH_JITTER - 1 <= delay <= latest
+    assert scheduler.next_refresh is None
+
+
+async def test_failed_refresh_retried_with_backoff(hass: HomeAssistant):
+    """Test a failing refresh backs off and a later success reschedules."""
+    api = MagicMock()
+    api.token_expires_at = time.time()
+    api.refresh_auth_token.side_effect = ConnectionError("offline")
+    on_refresh = AsyncMock()
+    scheduler = SessionRefreshScheduler(hass, api, on_refresh)
+
+    scheduler.async_start()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+
+    assert scheduler.failures == 1
+    on_refresh.assert_not_called()
+    delay = (scheduler.next_refresh - dt_util.utcnow()).total_seconds()
+    assert SESSION_RETRY_BACKOFF - 1 <= delay <= SESSION_RETRY_BACKOFF
+
+    def refresh():
+        api.token_expires_at = time.time() + 3600
+
+    api.refresh_auth_token.side_effect = refresh
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SESSION_RETRY_BACKOFF + 1))
+    await hass.async_block_till_done()
+
+    assert api.refresh_auth_token.call_count == 2
+    assert scheduler.failures == 0
+    on_refresh.assert_awaited_once()
+    assert scheduler.next_refresh > dt_util.utcnow() + timedelta(minutes=30)
+    scheduler.async_stop()
+
+
+def test_entries_are_staggered():
+    """Test config entries get stable, distinct refresh offsets."""
+    offsets = {entry_stagger(f"entry_{index}") for index in range(5)}
+
+    assert len(offsets) > 1
+    assert all(0 <= offset < SESSION_REFRESH_STAGGER for offset in offsets)
+    assert entry_stagger("entry_0") == entry_stagger("entry_0")
@@ -0,0 +1,52 @@
+"""Test Huckleberry coordinator snapshots."""
+import pytest
+
+from custom_components.huckleberry.snapshot import CoordinatorSnapshot, project
+
+
+def test_replace_shares_untouched_children():
+    """Test replace only allocates the changed child's entry."""
+    prefs = {"lastSleep": {"start": 1700000000, "duration": 3600}}
+    snapshot = CoordinatorSnapshot({
+        "child_1": {"child": {"uid": "child_1"}, "sleep_status": {"prefs": prefs}},
+        "child_2": {"child": {"uid": "child_2"}},
+    })
+
+    updated = snapshot.replace({("child_2", "diaper_data"): {"prefs": {}}})
+
+    assert updated is not snapshot
+    assert updated["child_1"] is snapshot["child_1"]
+    assert updated["child_1"]["sleep_status"]["prefs"] is prefs
+    assert updated["child_2"]["diaper_data"] == {"prefs": {}}
+    assert updated["child_2"]["child"] is snapshot["child_2"]["child"]
+    # The previous snapshot is left untouched
+    assert "diaper_data" not in snapshot["child_2"]
+
+
+def test_snapshot_is_read_only():
+    """Test consumers cannot mutate a published snapshot."""
+    snapshot = CoordinatorSnapshot({"child_1": {"child": {"uid": "child_1"}}})
+
+    with pytest.raises(TypeError):
+        snapshot["child_1"]["sleep_status"] = {}  # type: ignore[index]
+    with pytest.raises(TypeError):
+        snapshot["child_2"] = {}  # type: ignore[index]
+
+    assert dict(snapshot) == {"child_1": {"child": {"uid": "child_1"}}}
+    assert CoordinatorSnapshot.of(snapshot) is snapshot
+
+
+def test_project_keeps_only_consumed_fields():
+    """Test projection drops fields that no entity renders."""
+    document = {
+        "timer": {"active": True, "paused": False, "uuid": "abc", "details": {"x": 1}},
+        "prefs": {"lastSleep": {"start": 1, "duration": 2}, "sweetspot": {"big": "doc"}},
+    }
+
+    assert project("sleep_status", document) == {
+        "timer": {"active": True, "paused": False},
+        "prefs": {"lastSleep": {"start": 1, "duration": 2}},
+    }
+    assert project("diaper_data", {"prefs": {"local_timestamp": 5}}) == {}
+    growth = {"weight": 5.0, "weight_units": "kg"}
+    assert project("growth_data", growth) is growth